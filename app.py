@@ -1,11 +1,22 @@
 
+import time
+START = time.perf_counter()
+
 from PySide2.QtWidgets import QApplication
 from src.mainwindow import MainWindow
+from src.topology import loadTopology, TopologyError
+import src.instrumentation as instrumentation
 import sys
 
 if __name__ == '__main__':
 
+    instrumentation.enableFromEnvironment()
+    try:
+        topology = loadTopology()
+    except TopologyError as e:
+        sys.exit(str(e))
     app = QApplication(sys.argv)
-    mainWindow = MainWindow()
+    mainWindow = MainWindow(topology)
     mainWindow.show()
+    print('Time to first window: {:.0f} ms'.format((time.perf_counter() - START) * 1000))
     sys.exit(app.exec_())
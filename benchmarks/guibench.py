@@ -0,0 +1,145 @@
+"""
+Benchmarks of the GUI hot paths, on synthetic projects of growing size. Runs without a display:
+
+    python benchmarks/guibench.py -o before.json
+    python benchmarks/guibench.py --sizes 10 100 --repeat 5 -o after.json
+
+Every operation is timed on a real MainWindow, rendered offscreen, and the best time of --repeat runs is kept.
+Results are written as JSON, so two runs can be compared for regressions.
+"""
+import os
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PySide2
+from PySide2.QtWidgets import QApplication
+
+from src.mainwindow import MainWindow
+from src.workorder import WorkOrder
+
+SIZES = (10, 100, 1000, 10000)
+SINGLE_OPS = 50  # Number of work orders added and deleted one at a time, per size
+
+
+def timed(function, *args):
+    """
+    Returns the seconds taken by function(*args), events included.
+    """
+    start = time.perf_counter()
+    function(*args)
+    QApplication.processEvents()
+    return time.perf_counter() - start
+
+
+def addSingle(window, number, planetNum):
+    """
+    Adds one work order the way the work order dialog does. Returns the times of Planet.addSlice (through
+    MainWindow.addToPlanets) and TableView.addRowFor, and the work order.
+    """
+    wo = WorkOrder()
+    wo.number = number
+    wo.pieces = 1
+    wo.side = 1
+    wo.planetNum = planetNum
+    wo.machineNum = 1
+    window.woIDs.register(number)
+
+    sliceTime = timed(window.addToPlanets, wo)
+    window.machines[0].addWorkOrder(wo)
+    rowTime = timed(window.results.addRowFor, wo)
+    return sliceTime, rowTime, wo
+
+
+def benchmarkSize(window, size, directory):
+    """
+    Times every operation once on a project of size work orders. Returns a dict of operation -> seconds.
+    """
+    path = os.path.join(directory, 'bench' + str(size) + '.proj')
+    times = {}
+
+    window.reInit(True)
+    times['addRandomWorkOrders'] = timed(window.addRandomWorkOrders, size)
+    times['saveFile'] = timed(window.saveFile, path)
+    times['toggleTheme'] = timed(window.toggleTheme)
+    window.toggleTheme()
+
+    # Single adds and deletes, on planet 5 (not used by addRandomWorkOrders)
+    window.registry.planet(1, 5).setEnabled(SINGLE_OPS)
+    sliceTimes, rowTimes, added = [], [], []
+    for i in range(SINGLE_OPS):
+        sliceTime, rowTime, wo = addSingle(window, size + 1 + i, 5)
+        sliceTimes.append(sliceTime)
+        rowTimes.append(rowTime)
+        added.append(wo)
+    times['Planet.addSlice'] = sum(sliceTimes) / SINGLE_OPS
+    times['TableView.addRowFor'] = sum(rowTimes) / SINGLE_OPS
+    times['deleteWorkOrder'] = sum(timed(window.deleteWorkOrder, wo) for wo in added) / SINGLE_OPS
+
+    times['reInit'] = timed(window.reInit, True)
+    times['loadFile'] = timed(window.loadFile, path)
+    window.reInit(True)
+    return times
+
+
+def run(sizes, repeat):
+    """
+    Runs the benchmarks for every size, keeping the best time of repeat runs. Returns the results as a dict.
+    """
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    # Work in a temporary directory, so that autosave journals don't trigger the recovery prompt or pile up
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            window = MainWindow()
+            window.show()
+            window.registry.ensureCharts(1)
+            app.processEvents()
+
+            results = {}
+            for size in sizes:
+                runs = [benchmarkSize(window, size, directory) for _ in range(repeat)]
+                results[str(size)] = {op: min(run[op] for run in runs) for op in runs[0]}
+                print(size, 'work orders:', ', '.join('{} {:.4f}s'.format(op, secs)
+                                                    for op, secs in results[str(size)].items()), file=sys.stderr)
+            window.close()
+        finally:
+            os.chdir(cwd)
+
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pyside2': PySide2.__version__,
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Times the GUI hot paths on synthetic projects.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='numbers of work orders to test')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per size; the best time is kept')
+    parser.add_argument('-o', '--output', help='JSON file to write the results to (default: standard output)')
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as out:
+            json.dump(report, out, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
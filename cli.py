@@ -0,0 +1,178 @@
+"""
+Headless batch calculator: loads .proj files and writes the time columns of every work order as CSV or JSON,
+without Qt.
+
+    python cli.py shift/*.proj -o times.csv --jobs 4
+
+With --sequence, writes the planned run order of every machine instead, with its projected machine hours against
+the order of the work orders (see src/sequencer.py).
+"""
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import argparse
+import csv
+import json
+import sys
+
+import src.projectfile as projectfile
+from src.machine import Machine
+from src.workorder import WorkOrder
+from src.timecalc import MachineTimes, calculateTimes, parseTime
+from src.sequencer import sequenceMachine
+
+FIELDS = ('file', 'machine', 'workOrder', 'pieces', 'side', 'planet', 'yield') + \
+         tuple(column + 'Hours' for column in MachineTimes.COLUMNS)
+SEQUENCE_FIELDS = ('file', 'machine', 'runs', 'naiveOrder', 'plannedOrder', 'naiveHours', 'plannedHours',
+                   'savedHours')
+
+
+def loadMachines(project):
+    """
+    Builds a Machine, with its work orders, for each machine saved in a project dict (see projectfile).
+    Returns a dict of machine number -> Machine.
+    """
+    machines = {}
+    for tab in sorted(key for key in project if key != 'techID'):
+        entry = project[tab]
+        machine = Machine()
+        for key in projectfile.TIME_KEYS:
+            setattr(machine, key, parseTime(entry[key]))
+        for key in ('cdn',) + projectfile.RUN_KEYS:
+            setattr(machine, key, entry[key])
+
+        workOrders = sorted(entry['workOrders'].items(), key=lambda item: int(item[0][4:]))
+        for name, (pieces, side, planetNum, yld) in workOrders:
+            wo = WorkOrder()
+            wo.name = name
+            wo.pieces = pieces
+            wo.side = side
+            wo.planetNum = planetNum
+            wo.machineNum = tab + 1
+            if yld is not None:
+                wo.setYield(yld)
+            machine.addWorkOrder(wo)
+
+        machines[tab + 1] = machine
+    return machines
+
+
+def processFile(path):
+    """
+    Calculates the times of every work order of the project at path. Returns a list of row dicts (see FIELDS).
+    """
+    rows = []
+    machines = loadMachines(projectfile.loadProject(path))
+    for machineNum, machine in machines.items():
+        times = calculateTimes(machine)
+        for wo in times.workOrders:
+            row = {
+                'file': path,
+                'machine': machineNum,
+                'workOrder': wo.number,
+                'pieces': wo.pieces,
+                'side': wo.side,
+                'planet': wo.planetNum,
+                'yield': wo.yld,
+            }
+            for column in MachineTimes.COLUMNS:
+                row[column + 'Hours'] = times.get(column, wo)
+            rows.append(row)
+    return rows
+
+
+def sequenceFile(path):
+    """
+    Plans the run order of every machine of the project at path. Returns a list of row dicts (see SEQUENCE_FIELDS).
+    """
+    rows = []
+    machines = loadMachines(projectfile.loadProject(path))
+    for machineNum, machine in machines.items():
+        if not machine.workOrders:
+            continue
+        report = sequenceMachine(machine)
+        rows.append({
+            'file': path,
+            'machine': machineNum,
+            'runs': len(report.runs),
+            'naiveOrder': ', '.join(run.name() for run in report.naiveRuns),
+            'plannedOrder': ', '.join(run.name() for run in report.runs),
+            'naiveHours': report.naiveHours,
+            'plannedHours': report.hours,
+            'savedHours': report.savedHours(),
+        })
+    return rows
+
+
+def safeProcessFile(path, sequence=False):
+    """
+    Same as processFile (or sequenceFile if sequence), but returns (rows, error message) instead of raising, so one
+    bad file doesn't stop a batch.
+    """
+    try:
+        return (sequenceFile(path) if sequence else processFile(path)), None
+    except (OSError, projectfile.ProjectFileError) as e:
+        return [], str(e)
+    except Exception as e:  # Whatever else is wrong with this file, the other files are still processed
+        return [], type(e).__name__ + ': ' + str(e)
+
+
+def writeCSV(rows, out, fields=FIELDS):
+    writer = csv.DictWriter(out, fieldnames=fields)
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def writeJSON(rows, out, fields=FIELDS):
+    json.dump(rows, out, indent=2)
+    out.write('\n')
+
+
+def parseArgs(argv):
+    parser = argparse.ArgumentParser(description='Calculates the times of every work order in .proj files.')
+    parser.add_argument('files', nargs='+', help='project files to calculate')
+    parser.add_argument('-o', '--output', help='file to write to (default: standard output)')
+    parser.add_argument('-f', '--format', choices=('csv', 'json'),
+                        help='output format (default: from the output file extension, else csv)')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='number of processes to spread files across')
+    parser.add_argument('-s', '--sequence', action='store_true',
+                        help='write the planned run order of each machine instead of the work order times')
+    args = parser.parse_args(argv)
+
+    if args.format is None:
+        args.format = 'json' if args.output and args.output.lower().endswith('.json') else 'csv'
+    if args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+    return args
+
+
+def main(argv=None):
+    args = parseArgs(argv)
+    process = partial(safeProcessFile, sequence=args.sequence)
+
+    if args.jobs > 1 and len(args.files) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(process, args.files))
+    else:
+        results = [process(path) for path in args.files]
+
+    rows = []
+    failed = False
+    for path, (fileRows, error) in zip(args.files, results):
+        if error:
+            print('Skipping ' + path + ': ' + error, file=sys.stderr)
+            failed = True
+        rows.extend(fileRows)
+
+    write = writeJSON if args.format == 'json' else writeCSV
+    fields = SEQUENCE_FIELDS if args.sequence else FIELDS
+    if args.output:
+        with open(args.output, 'w', newline='') as out:
+            write(rows, out, fields)
+    else:
+        write(rows, sys.stdout, fields)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
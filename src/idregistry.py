@@ -0,0 +1,87 @@
+import heapq
+
+
+class WorkOrderIDRegistry:
+
+    def __init__(self):
+        """
+        Keeps track of the work order numbers used in the whole project. Membership checks are O(1), and finding the
+        next free number is amortized O(1), reusing the numbers of deleted work orders first.
+        """
+        self.used = set()
+        self.freed = []  # Min-heap of released numbers. May contain numbers that were registered again since.
+        self.cursor = 1  # Every number below cursor is either used or in freed
+
+    def __contains__(self, number):
+        return number in self.used
+
+    def __len__(self):
+        return len(self.used)
+
+    def register(self, number):
+        """
+        Marks number as used. Returns False if it already was.
+        """
+        if number in self.used:
+            return False
+        self.used.add(number)
+        return True
+
+    def release(self, number):
+        """
+        Marks number as free again, so it can be reused.
+        """
+        if number in self.used:
+            self.used.remove(number)
+            if number < self.cursor:
+                heapq.heappush(self.freed, number)
+
+    def peekNext(self):
+        """
+        Returns the lowest free number, without registering it.
+        """
+        while self.freed and self.freed[0] in self.used:
+            heapq.heappop(self.freed)
+        if self.freed:
+            return self.freed[0]
+
+        while self.cursor in self.used:
+            self.cursor += 1
+        return self.cursor
+
+    def allocate(self):
+        """
+        Registers and returns the lowest free number.
+        """
+        number = self.peekNext()
+        self.register(number)
+        return number
+
+    def reserveRange(self, count):
+        """
+        Registers count consecutive free numbers after every number given out so far, and returns the first one.
+        Used for bulk imports, so that their numbers stay contiguous.
+        """
+        start = self.cursor
+        end = start
+        while end - start < count:
+            if end in self.used:
+                start = end + 1
+            end += 1
+
+        # Numbers skipped between the cursor and start are still free
+        for number in range(self.cursor, start):
+            if number not in self.used:
+                heapq.heappush(self.freed, number)
+
+        self.used.update(range(start, start + count))
+        self.cursor = start + count
+        return start
+
+    def clear(self):
+        """
+        Frees every number.
+        """
+        self.used.clear()
+        self.freed.clear()
+        self.cursor = 1
@@ -0,0 +1,119 @@
+"""
+Opt-in timing of the app's main slots.
+
+The slots are wrapped once, at class level, by instrument(). While instrumentation is disabled the wrappers only
+check a flag. It is enabled by setting the TIMEMGMT_PROFILE environment variable ("1" to time the slots,
+"cprofile" to also record a cProfile capture), or with the hidden Ctrl+Shift+P shortcut of the main window.
+A summary of call counts and latencies is written as JSON on exit, to TIMEMGMT_PROFILE_OUT or profile.json.
+"""
+import cProfile
+import functools
+import json
+import os
+import time
+
+ENV_VAR = 'TIMEMGMT_PROFILE'
+OUTPUT_ENV_VAR = 'TIMEMGMT_PROFILE_OUT'
+DEFAULT_OUTPUT = 'profile.json'
+
+
+class Instrumentation:
+
+    def __init__(self):
+        """
+        Collects the call count, cumulative and max latency of every instrumented slot.
+        """
+        self.enabled = False
+        self.profiler = None
+        self.stats = {}  # name -> [calls, total seconds, max seconds]
+        self.outputPath = os.environ.get(OUTPUT_ENV_VAR) or DEFAULT_OUTPUT
+
+    def enable(self, profile=False):
+        """
+        Starts timing the instrumented slots. If profile, also records everything in a cProfile capture.
+        """
+        self.enabled = True
+        if profile and self.profiler is None:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def disable(self):
+        """
+        Stops timing. What was recorded so far is kept, and still dumped.
+        """
+        self.enabled = False
+        if self.profiler is not None:
+            self.profiler.disable()
+
+    def record(self, name, secs):
+        stats = self.stats.get(name)
+        if stats is None:
+            self.stats[name] = [1, secs, secs]
+        else:
+            stats[0] += 1
+            stats[1] += secs
+            if secs > stats[2]:
+                stats[2] = secs
+
+    def summary(self):
+        """
+        Returns the recorded stats as a dict of name -> counts and latencies in milliseconds, slowest total first.
+        """
+        summary = {}
+        for name, (calls, total, longest) in sorted(self.stats.items(), key=lambda item: -item[1][1]):
+            summary[name] = {
+                'calls': calls,
+                'totalMs': total * 1000,
+                'meanMs': total * 1000 / calls,
+                'maxMs': longest * 1000,
+            }
+        return summary
+
+    def dump(self, path=None):
+        """
+        Writes the summary as JSON to path (outputPath by default), and the cProfile capture, if any, next to it
+        with a .prof extension. Does nothing if nothing was recorded.
+        """
+        path = path or self.outputPath
+        if self.stats:
+            with open(path, 'w') as f:
+                json.dump(self.summary(), f, indent=2)
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(os.path.splitext(path)[0] + '.prof')
+
+
+INSTRUMENTATION = Instrumentation()
+
+
+def wrap(name, method):
+    """
+    Returns method wrapped so that its latency is recorded under name while instrumentation is enabled.
+    """
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if not INSTRUMENTATION.enabled:
+            return method(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            INSTRUMENTATION.record(name, time.perf_counter() - start)
+    return wrapper
+
+
+def instrument(cls, *names):
+    """
+    Wraps the given methods of cls, so they are timed while instrumentation is enabled.
+    """
+    for name in names:
+        setattr(cls, name, wrap(cls.__name__ + '.' + name, getattr(cls, name)))
+
+
+def enableFromEnvironment():
+    """
+    Enables instrumentation if the TIMEMGMT_PROFILE environment variable asks for it.
+    """
+    value = os.environ.get(ENV_VAR, '').lower()
+    if value and value not in ('0', 'false', 'no'):
+        INSTRUMENTATION.enable(profile=value == 'cprofile')
@@ -0,0 +1,347 @@
+"""
+Append-only change journal, used for autosave and crash recovery.
+
+Every change is appended to "<project>.<pid>.journal" as one small binary record: a one byte record type followed
+by its fixed-width payload (see RECORDS). The journal applies to the full snapshot
+"<project>.<pid>.journal.snapshot", written in the project file format. Every COMPACT_EVERY records the snapshot is
+rewritten and the journal emptied, so replaying it always stays cheap. The process ID of the app in the names keeps
+instances working on the same project (such as two untitled ones started in the same directory) from writing over
+each other's journal.
+
+The journal is deleted on a clean shutdown: if one is still there on startup, the app was not closed properly,
+and the project can be recovered with recover(). Every running app lists its journal, with its process ID, in the
+session file SESSIONS_PATH, so that the journals of other instances still running are never taken for stale ones,
+and stale journals are found wherever their project is.
+"""
+import glob
+import math
+import os
+import struct
+
+import src.projectfile as projectfile
+from src.timecalc import formatTime
+
+ADD_WO = 1
+EDIT_WO = 2
+DELETE_WO = 3
+PLANET = 4
+MACHINE_TIME = 5
+MACHINE_RUN = 6
+TECH_ID = 7
+
+RECORDS = {
+    ADD_WO: struct.Struct('<BIBBii'),  # machine index, number, planet number, side, pieces, yield
+    EDIT_WO: struct.Struct('<BIBBii'),  # same as ADD_WO
+    DELETE_WO: struct.Struct('<BI'),  # machine index, number
+    PLANET: struct.Struct('<BBi'),  # machine index, planet number, pieces (-1 if disabled)
+    MACHINE_TIME: struct.Struct('<BBi'),  # machine index, index in projectfile.TIME_KEYS, seconds (-1 if not set)
+    MACHINE_RUN: struct.Struct('<Bidddd'),  # machine index, cdn (-1 if not set), test, coating, loading, setup runs
+    TECH_ID: struct.Struct('<q'),  # tech ID (-1 if not set)
+}
+
+COMPACT_EVERY = 500
+SUFFIX = '.journal'
+SESSIONS_PATH = os.path.join(os.path.expanduser('~'), '.planettimemgmt-sessions')
+
+# Journals started by this app and not discarded yet
+OPEN_PATHS = set()
+
+
+class Journal:
+
+    def __init__(self, projectPath):
+        """
+        Journal of the project at projectPath. Nothing is written until start is called.
+        """
+        self.projectPath = projectPath
+        self.path = journalPathFor(projectPath)
+        self.snapshotPath = self.path + '.snapshot'
+        self.file = None
+        self.records = 0
+        self.suspended = False
+
+        # Copy of the project as a dict (see projectfile), kept up to date by every record. Written as the snapshot.
+        self.project = {'techID': None}
+
+    def start(self, project):
+        """
+        Starts journaling from project (a full project dict): writes it as the snapshot, and empties the journal.
+        """
+        if not self.file:
+            self.path = journalPathFor(self.projectPath)
+            self.snapshotPath = self.path + '.snapshot'
+        self.project = project
+        self.compact()
+
+    def moveTo(self, projectPath, project):
+        """
+        Deletes this journal's files, and starts again next to projectPath.
+        """
+        self.discard()
+        self.projectPath = projectPath
+        self.start(project)
+
+    def compact(self):
+        """
+        Writes the current project as the snapshot, then empties the journal.
+        """
+        if self.file:
+            self.file.close()
+        tmpPath = self.snapshotPath + '.tmp'
+        projectfile.saveProject(tmpPath, self.project)
+        os.replace(tmpPath, self.snapshotPath)
+        if not self.file:
+            OPEN_PATHS.add(self.path)
+            registerSession(self.path)
+        self.file = open(self.path, 'wb')
+        self.records = 0
+
+    def discard(self):
+        """
+        Closes the journal and deletes its files. Called on a clean shutdown.
+        """
+        if self.file:
+            self.file.close()
+            self.file = None
+            OPEN_PATHS.discard(self.path)
+            unregisterSession(self.path)
+        discardJournal(self.path)
+
+    def append(self, recordType, *values):
+        """
+        Appends one record, and applies it to the project copy. Compacts the journal if it got long.
+        """
+        if self.suspended or not self.file:
+            return
+        self.file.write(bytes([recordType]) + RECORDS[recordType].pack(*values))
+        self.file.flush()
+        applyRecord(self.project, recordType, values)
+
+        self.records += 1
+        if self.records >= COMPACT_EVERY:
+            self.compact()
+
+    def addWorkOrder(self, workOrder):
+        self.append(ADD_WO, *workOrderValues(workOrder))
+
+    def editWorkOrder(self, workOrder):
+        self.append(EDIT_WO, *workOrderValues(workOrder))
+
+    def deleteWorkOrder(self, workOrder, machineNum=None):
+        """
+        Records workOrder being deleted from machine machineNum, by default the one it is on.
+        """
+        self.append(DELETE_WO, (machineNum or workOrder.machineNum) - 1, workOrder.number)
+
+    def setPlanet(self, tab, planetNum, pieces):
+        """
+        Records planet planetNum of machine tab being enabled with pieces, or disabled if pieces is None.
+        """
+        self.append(PLANET, tab, planetNum, -1 if pieces is None else int(pieces))
+
+    def setTime(self, tab, key, secs):
+        """
+        Records machine tab's time key (one of projectfile.TIME_KEYS) being set to secs since midnight, or unset if
+        None.
+        """
+        self.append(MACHINE_TIME, tab, projectfile.TIME_KEYS.index(key), -1 if secs is None else secs)
+
+    def setRunParameters(self, tab, machine):
+        """
+        Records the current run parameters of machine, which is machine tab.
+        """
+        runs = [math.nan if value is None else value for value in
+                (machine.testRun, machine.coatingRun, machine.loadingRun, machine.setupRun)]
+        self.append(MACHINE_RUN, tab, -1 if machine.cdn is None else machine.cdn, *runs)
+
+    def setTechID(self, techID):
+        self.append(TECH_ID, -1 if techID is None else techID)
+
+
+def workOrderValues(workOrder):
+    """
+    Returns the values of an ADD_WO or EDIT_WO record for workOrder.
+    """
+    yld = -1 if workOrder.yld is None else workOrder.yld
+    return workOrder.machineNum - 1, workOrder.number, workOrder.planetNum, workOrder.side, workOrder.pieces, yld
+
+
+def emptyMachine():
+    """
+    Returns the project dict entry of a machine with nothing set.
+    """
+    machine = {key: None for key in projectfile.TIME_KEYS + ('cdn',) + projectfile.RUN_KEYS}
+    machine['workOrders'] = {}
+    machine['planets'] = {}
+    return machine
+
+
+def applyRecord(project, recordType, values):
+    """
+    Applies one record to a project dict.
+    """
+    if recordType == TECH_ID:
+        project['techID'] = None if values[0] == -1 else values[0]
+        return
+
+    tab = values[0]
+    if tab not in project:
+        project[tab] = emptyMachine()
+    machine = project[tab]
+
+    if recordType in (ADD_WO, EDIT_WO):
+        _, number, planetNum, side, pieces, yld = values
+        machine['workOrders']['WO #' + str(number)] = [pieces, side, planetNum, None if yld == -1 else yld]
+    elif recordType == DELETE_WO:
+        machine['workOrders'].pop('WO #' + str(values[1]), None)
+    elif recordType == PLANET:
+        _, planetNum, pieces = values
+        machine['planets'][planetNum] = None if pieces == -1 else pieces
+    elif recordType == MACHINE_TIME:
+        _, keyIndex, secs = values
+        machine[projectfile.TIME_KEYS[keyIndex]] = None if secs == -1 else formatTime(secs)
+    elif recordType == MACHINE_RUN:
+        _, cdn, *runs = values
+        machine['cdn'] = None if cdn == -1 else cdn
+        for key, run in zip(projectfile.RUN_KEYS, runs):
+            machine[key] = None if math.isnan(run) else run
+
+
+def journalPathFor(projectPath):
+    """
+    Returns the path of a journal of the project at projectPath that no other journal uses: it holds the process
+    ID of this app, and a count if this app already journals the same project.
+    """
+    tag = str(os.getpid())
+    path = projectPath + '.' + tag + SUFFIX
+    count = 1
+    while path in OPEN_PATHS:
+        count += 1
+        path = projectPath + '.' + tag + '-' + str(count) + SUFFIX
+    return path
+
+
+def discardJournal(path):
+    """
+    Deletes the journal at path and its snapshot.
+    """
+    for filePath in (path, path + '.snapshot'):
+        if os.path.exists(filePath):
+            os.remove(filePath)
+
+
+def findUnclean(directory):
+    """
+    Returns the paths of the journals left by sessions that were not closed properly: those in the session file
+    whose app is not running anymore, and those in directory that no session lists.
+    """
+    sessions = readSessions()
+    paths = set(sessions) | {os.path.abspath(path) for path in glob.glob(os.path.join(directory, '*' + SUFFIX))}
+    return sorted(path for path in paths
+                  if os.path.exists(path + '.snapshot') and not (path in sessions and isRunning(sessions[path])))
+
+
+def readSessions():
+    """
+    Returns the journals listed in the session file: path -> process ID of the app writing it.
+    """
+    sessions = {}
+    try:
+        with open(SESSIONS_PATH, encoding='utf-8') as f:
+            for line in f:
+                pid, _, path = line.rstrip('\n').partition(' ')
+                if pid.isdigit() and path:
+                    sessions[path] = int(pid)
+    except OSError:
+        pass
+    return sessions
+
+
+def writeSessions(sessions):
+    """
+    Rewrites the session file with sessions (see readSessions). Entries of apps not running anymore are dropped
+    once their journal is gone.
+    """
+    lines = [str(pid) + ' ' + path + '\n' for path, pid in sorted(sessions.items())
+             if os.path.exists(path) or isRunning(pid)]
+    tmpPath = SESSIONS_PATH + '.' + str(os.getpid()) + '.tmp'
+    try:
+        with open(tmpPath, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+        os.replace(tmpPath, SESSIONS_PATH)
+    except OSError:
+        pass  # Without a session file, journals are still found next to their project
+
+
+def registerSession(path):
+    """
+    Lists the journal at path in the session file, as written by this app.
+    """
+    sessions = readSessions()
+    sessions[os.path.abspath(path)] = os.getpid()
+    writeSessions(sessions)
+
+
+def unregisterSession(path):
+    """
+    Takes the journal at path off the session file.
+    """
+    sessions = readSessions()
+    if sessions.pop(os.path.abspath(path), None) is not None:
+        writeSessions(sessions)
+
+
+def isRunning(pid):
+    """
+    Returns True if a process with this ID is running.
+    """
+    if pid == os.getpid():
+        return True
+    if os.name == 'nt':  # os.kill would terminate the process on Windows
+        import ctypes
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Running, as another user
+    return True
+
+
+def recover(path):
+    """
+    Rebuilds the project of the journal at path: loads its snapshot, then replays every complete record.
+    Returns the project dict.
+    """
+    project = projectfile.loadProject(path + '.snapshot')
+
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    offset = 0
+    while offset < len(data):
+        recordType = data[offset]
+        record = RECORDS.get(recordType)
+        if record is None or offset + 1 + record.size > len(data):
+            break  # Unknown type, or a record cut short by the crash
+        applyRecord(project, recordType, record.unpack_from(data, offset + 1))
+        offset += 1 + record.size
+
+    return project
+
+
+def projectPathOf(path):
+    """
+    Returns the path of the project that the journal at path belongs to. Journals written by older versions have
+    no process ID in their name.
+    """
+    projectPath = path[:-len(SUFFIX)]
+    root, tag = os.path.splitext(projectPath)
+    if tag[1:].replace('-', '').isdigit():
+        return root
+    return projectPath
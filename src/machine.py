@@ -1,14 +1,137 @@
+from src.workorderstore import WorkOrderStore
+
+DAY = 24 * 3600
+
+
+class Parameter:
+
+    def __init__(self, name):
+        """
+        Time or run parameter of a Machine (None if not set). Times are in seconds since midnight. Setting it clears
+        the machine's cached durations and calculated times.
+        """
+        self.name = name
+
+    def __get__(self, machine, owner):
+        if machine is None:
+            return self
+        return machine.parameters[self.name]
+
+    def __set__(self, machine, value):
+        machine.parameters[self.name] = value
+        machine.invalidate()
+
 
 class Machine:
 
+    # The run parameters (hours) are the machine's totals for running all its work orders, in the order of their
+    # numbers: one test run, and the loading, setup and coating runs of every load, side setup and coating run that
+    # order takes. The results split each total between the work orders by their share of the pieces (see
+    # timecalc), and the sequencer prices each load, setup and run of another order at its share of the total.
+    startTime = Parameter('startTime')
+    endTime = Parameter('endTime')
+    loadTime = Parameter('loadTime')
+    unloadTime = Parameter('unloadTime')
+    cdn = Parameter('cdn')
+    testRun = Parameter('testRun')
+    coatingRun = Parameter('coatingRun')
+    loadingRun = Parameter('loadingRun')
+    setupRun = Parameter('setupRun')
+
     def __init__(self):
-        self.startTime = None
-        self.endTime = None
-        self.loadTime = None
-        self.unloadTime = None
-        self.cdn = None
-        self.testRun = None
-        self.coatingRun = None
-        self.loadingRun = None
-        self.setupRun = None
-        self.workOrders = []
+        self.parameters = {
+            'startTime': None, 'endTime': None, 'loadTime': None, 'unloadTime': None,
+            'cdn': None, 'testRun': None, 'coatingRun': None, 'loadingRun': None, 'setupRun': None,
+        }
+        self.durations = {}  # (from, to) -> seconds, cached until a time changes
+        self.calculated = None  # MachineTimes of the work orders, cached by timecalc.getTimes until anything changes
+        self.workOrders = WorkOrderStore()
+
+        # Running total of the pieces of workOrders. Kept up to date by add/update/removeWorkOrder.
+        self.totalPieces = 0
+
+        # Pieces each work order last contributed to the total, so edits and deletes can be undone in O(1)
+        self.contributions = {}
+
+    def invalidate(self):
+        """
+        Clears everything cached from the parameters and work orders. Called whenever one of them changes.
+        """
+        self.durations.clear()
+        self.calculated = None
+
+    def duration(self, fromTime, toTime):
+        """
+        Returns the seconds from time fromTime to time toTime (e.g. 'startTime', 'endTime'), or None if either one
+        is not set. A toTime earlier in the day than fromTime is on the next day (i.e. the run crosses midnight).
+        """
+        key = (fromTime, toTime)
+        if key not in self.durations:
+            start = self.parameters[fromTime]
+            end = self.parameters[toTime]
+            self.durations[key] = None if start is None or end is None else (end - start) % DAY
+        return self.durations[key]
+
+    def runSeconds(self):
+        """
+        Returns the seconds between the start and end times, or None if either one is not set.
+        """
+        return self.duration('startTime', 'endTime')
+
+    def loadSeconds(self):
+        """
+        Returns the seconds between the load time and the start time, or None if either one is not set.
+        """
+        return self.duration('loadTime', 'startTime')
+
+    def unloadSeconds(self):
+        """
+        Returns the seconds between the end time and the unload time, or None if either one is not set.
+        """
+        return self.duration('endTime', 'unloadTime')
+
+    def addWorkOrder(self, workOrder):
+        """
+        Adds workOrder to this machine and adds its pieces to the total.
+        """
+        self.workOrders.add(workOrder)
+        self.addContribution(workOrder)
+
+    def updateWorkOrder(self, workOrder):
+        """
+        Updates the total after workOrder's pieces were edited.
+        """
+        self.removeContribution(workOrder)
+        self.addContribution(workOrder)
+
+    def removeWorkOrder(self, workOrder):
+        """
+        Removes workOrder from this machine and removes its pieces from the total.
+        """
+        self.removeContribution(workOrder)
+        self.workOrders.remove(workOrder)
+
+    def clearWorkOrders(self):
+        """
+        Removes all work orders from this machine and resets the total.
+        """
+        self.workOrders.clear()
+        self.contributions.clear()
+        self.totalPieces = 0
+        self.invalidate()
+
+    def addContribution(self, workOrder):
+        """
+        Adds workOrder's current pieces to the total, and remembers them.
+        """
+        pieces = workOrder.pieces
+        self.contributions[id(workOrder)] = pieces
+        self.totalPieces += pieces
+        self.calculated = None
+
+    def removeContribution(self, workOrder):
+        """
+        Removes the pieces workOrder last contributed from the total.
+        """
+        self.totalPieces -= self.contributions.pop(id(workOrder))
+        self.calculated = None
@@ -0,0 +1,164 @@
+from PySide2.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout, QLabel, QTimeEdit, QPushButton, QLineEdit, \
+    QGroupBox, QFrame, QScrollArea, QSpacerItem, QSizePolicy
+from PySide2.QtGui import QFont
+from PySide2.QtCore import Qt
+from src.widgetregistry import PlanetWidgets
+
+
+class MachineTab(QWidget):
+
+    PLANET_WIDTH = 235
+    PLANET_HEIGHT = 305
+
+    def __init__(self, machineNum, planetCount, parent=None):
+        """
+        Page of one machine in the main window's tabs: its time and run parameter fields, an Add Work Order
+        button, and one box per planet, side by side (scrolling when they don't all fit).
+        Pages are built from the topology when their machine is first needed, rather than laid out in Designer.
+        """
+        QWidget.__init__(self, parent)
+        self.machineNum = machineNum
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 0)
+        layout.addLayout(self.buildControls())
+
+        line = QFrame(self)
+        line.setFrameShape(QFrame.HLine)
+        line.setFrameShadow(QFrame.Sunken)
+        layout.addWidget(line)
+
+        self.planets = []  # PlanetWidgets, by planet number
+        layout.addWidget(self.buildPlanets(planetCount))
+
+    def buildControls(self):
+        """
+        Creates the row of time fields, the Add Work Order button and the run parameter fields.
+        """
+        self.startTime, self.stButton, startRow = self.timeField("Start Time:")
+        self.loadTime, self.ltButton, loadRow = self.timeField("Load Time:")
+        self.endTime, self.etButton, endRow = self.timeField(" End Time:")
+        self.unloadTime, self.utButton, unloadRow = self.timeField("Unload Time:")
+
+        times = QVBoxLayout()
+        for left, right in ((startRow, loadRow), (endRow, unloadRow)):
+            row = QHBoxLayout()
+            row.addLayout(left)
+            row.addItem(QSpacerItem(40, 10, QSizePolicy.Expanding, QSizePolicy.Minimum))
+            row.addLayout(right)
+            times.addLayout(row)
+
+        self.addWorkOrderButton = QPushButton("➕  Add Work Order", self)
+        self.addWorkOrderButton.setMinimumSize(210, 60)
+        font = QFont()
+        font.setPointSize(11)
+        self.addWorkOrderButton.setFont(font)
+        self.addWorkOrderButton.setCursor(Qt.PointingHandCursor)
+
+        self.cdn, cdnRow = self.runField("CDN #:")
+        self.loadingRun, loadingRow = self.runField("Loading Run (Hrs):")
+        self.testRun, testRow = self.runField("Test Run (Hrs):")
+        self.setupTestRun, setupRow = self.runField("Setup Test Run (Hrs):")
+        self.coatRun, coatRow = self.runField("Coating Run (Hrs):")
+
+        self.validateButton = QPushButton("Lock", self)
+        self.validateButton.setMinimumSize(160, 35)
+        self.validateButton.setCursor(Qt.PointingHandCursor)
+        self.validateButton.setCheckable(True)
+
+        runs = QHBoxLayout()
+        for top, bottom in ((cdnRow, loadingRow), (testRow, setupRow), (coatRow, None)):
+            column = QVBoxLayout()
+            column.addLayout(top)
+            if bottom is not None:
+                column.addLayout(bottom)
+            else:
+                column.addWidget(self.validateButton)
+            runs.addLayout(column)
+
+        controls = QHBoxLayout()
+        controls.addLayout(times)
+        controls.addItem(QSpacerItem(40, 20, QSizePolicy.Expanding, QSizePolicy.Minimum))
+        controls.addWidget(self.addWorkOrderButton)
+        controls.addItem(QSpacerItem(40, 20, QSizePolicy.Expanding, QSizePolicy.Minimum))
+        controls.addLayout(runs)
+        return controls
+
+    def timeField(self, text):
+        """
+        Returns a time edit, its check button, and a layout with them and their label.
+        """
+        label = QLabel(text, self)
+        label.setMaximumSize(77, 35)
+        timeBox = QTimeEdit(self)
+        button = QPushButton("✓", self)
+        button.setFixedSize(28, 28)
+        font = QFont()
+        font.setPointSize(12)
+        button.setFont(font)
+        button.setCheckable(True)
+
+        row = QHBoxLayout()
+        row.addWidget(label)
+        row.addWidget(timeBox)
+        row.addWidget(button)
+        return timeBox, button, row
+
+    def runField(self, text):
+        """
+        Returns a run parameter text field, and a layout with it and its label.
+        """
+        label = QLabel(text, self)
+        label.setMaximumHeight(35)
+        field = QLineEdit(self)
+        field.setFixedWidth(62)
+        field.setAlignment(Qt.AlignCenter)
+
+        row = QHBoxLayout()
+        row.addItem(QSpacerItem(40, 20, QSizePolicy.Expanding, QSizePolicy.Minimum))
+        row.addWidget(label)
+        row.addWidget(field)
+        return field, row
+
+    def buildPlanets(self, planetCount):
+        """
+        Creates one box per planet, with its info label and the container of its pie chart.
+        Returns the scroll area holding them.
+        """
+        content = QWidget()
+        row = QHBoxLayout(content)
+        row.setContentsMargins(0, 0, 0, 0)
+        for planetNum in range(1, planetCount + 1):
+            planetBox = QGroupBox("  Planet " + str(planetNum), content)
+            planetBox.setMinimumSize(self.PLANET_WIDTH, self.PLANET_HEIGHT)
+            planetBox.setMaximumWidth(self.PLANET_WIDTH + 8)
+
+            container = QWidget(planetBox)
+            container.setGeometry(2, 75, 239, 239)
+            infoSection = QLabel(planetBox)
+            infoSection.setGeometry(0, 20, 243, 49)
+            infoSection.setAlignment(Qt.AlignCenter)
+
+            row.addWidget(planetBox)
+            self.planets.append(PlanetWidgets(self.machineNum, planetNum, infoSection, planetBox, container))
+        row.addStretch()
+
+        scrollArea = QScrollArea(self)
+        scrollArea.setFrameShape(QFrame.NoFrame)
+        scrollArea.setWidgetResizable(True)
+        scrollArea.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        scrollArea.setWidget(content)
+        return scrollArea
+
+    def timeFields(self):
+        """
+        Returns (Machine attribute, time edit, check button) for each time of the machine.
+        """
+        return [('startTime', self.startTime, self.stButton), ('endTime', self.endTime, self.etButton),
+                ('loadTime', self.loadTime, self.ltButton), ('unloadTime', self.unloadTime, self.utButton)]
+
+    def runFields(self):
+        """
+        Returns the run parameter text fields, in the order: cdn, test run, coating run, loading run, setup run.
+        """
+        return [self.cdn, self.testRun, self.coatRun, self.loadingRun, self.setupTestRun]
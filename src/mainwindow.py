@@ -1,11 +1,10 @@
 
 # From installed packages
-from PySide2.QtWidgets import QApplication, QMainWindow, QFileDialog, QMessageBox, QDialog
+from PySide2.QtWidgets import QApplication, QMainWindow, QFileDialog, QMessageBox, QDialog, QAction, QWidget, \
+    QVBoxLayout
 from PySide2.QtGui import QPalette, QColor, Qt, QPainter
-from PySide2.QtCore import Slot, QTime, Signal
-from PySide2.QtCharts import QtCharts
+from PySide2.QtCore import Slot, QTime, Signal, QTimer
 from random import randrange
-import pickle
 import os
 
 # From local project
@@ -15,16 +14,32 @@ from gui.ui_mainwindow import Ui_MainWindow
 from src.workorder import WorkOrder
 from src.tableview import TableView
 from src.machine import Machine
-from src.planet import Planet
-
-# ---- NOTE: Keep "unused" imports: they are used by custom code that is only seen as a string. ---- #
+from src.widgetregistry import WidgetRegistry
+from src.machinetab import MachineTab
+from src.topology import loadTopology
+from src.idregistry import WorkOrderIDRegistry
+from src.selectionmodel import SelectionModel
+from src.placement import Bin, placeWorkOrders
+from src.placementdialog import PlacementDialog
+from src.sequencer import sequenceMachine
+import src.projectfile as projectfile
+import src.journal as journal
+import src.themes as themes
+from src.timecalc import parseTime, formatTime
+from src.instrumentation import INSTRUMENTATION, instrument
 
 
 class MainWindow(QMainWindow):
 
     themeChanged = Signal(int)
 
-    def __init__(self):
+    # Work orders that could not be loaded are listed in the error message, up to this many
+    MAX_LISTED_ERRORS = 20
+
+    def __init__(self, topology=None):
+        """
+        topology gives the machines and their planets (see src.topology). By default it is loaded from topology.json.
+        """
 
         # Initializing window and UI
         QMainWindow.__init__(self)
@@ -35,32 +50,112 @@ class MainWindow(QMainWindow):
         # Initializing Results Section
         headers = ['Machine', 'Planet', 'Labor (Hrs)', 'Machine Time (Hrs)', 'Setup (Hrs)', 'Test Run (Hrs)',
                    'Coating (Hrs)', 'Quantity', 'Yield', 'Scrap', '']
-        self.results = TableView(headers, self, 0, len(headers))
+        self.results = TableView(headers, self)
         self.results.setParent(self.ui.resultsContainer)
         # self.results.setFixedWidth(1265)
         self.results.setFixedWidth(self.ui.resultsContainer.width())
         self.results.setFixedHeight(self.ui.resultsContainer.height())
 
         # Initialize variables needed
-        self.machines = [Machine(), Machine(), Machine()]  # TODO: restructure to have planets w workorders in machines
+        self.topology = topology or loadTopology()
+        self.machines = [Machine() for _ in self.topology.machineNums()]  # Machine N is self.machines[N-1]
         self.techID = None
         self.theme = 1
-
-        # Initialize pie chart widgets and set theme
-        self.initPieCharts()
+        self.woIDs = WorkOrderIDRegistry()  # Work order numbers used in the whole project
+        self.projectPath = os.path.join(os.getcwd(), 'untitled.proj')
+        self.journal = journal.Journal(self.projectPath)  # Autosave, started once the UI is initialized
+        self.selections = {n: SelectionModel() for n in self.topology.machineNums()}  # Per machine
+
+        # One empty page per machine. A machine's widgets and pie charts are created the first time it is needed.
+        self.registry = WidgetRegistry(self.topology)
+        self.registry.buildTab = self.initMachineTab
+        self.registry.buildCharts = self.initPieCharts
+        self.ui.tabWidget.clear()
+        for machineNum in self.topology.machineNums():
+            self.ui.tabWidget.addTab(QWidget(), self.topology.machineName(machineNum))
+        self.ui.tabWidget.currentChanged.connect(lambda index: self.registry.ensureCharts(index + 1))
+        QTimer.singleShot(0, lambda: self.registry.ensureCharts(self.ui.tabWidget.currentIndex() + 1))
+
+        # Set style and theme. The style and stylesheet are the same for both themes, so they are only set once.
+        QApplication.instance().setStyle("Fusion")
+        QApplication.instance().setStyleSheet(themes.TOOLTIP_STYLE)
         self.toggleTheme()
+        self.results.setBG()
 
         # Connect Signals and Slots
-        self.ui.addWorkOrderButton.clicked.connect(lambda: self.showWOInitDialog())
         self.ui.planetConfigButton.clicked.connect(lambda: self.showPlanetConfigDialog())
         self.ui.randomButton.clicked.connect(lambda: self.loadRandomWorkOrders())
         self.ui.clearButton.clicked.connect(lambda: self.reInit())
         self.ui.themeButton.clicked.connect(lambda: self.toggleTheme())
         self.themeChanged.connect(lambda: self.results.setBG())
+        self.themeChanged.connect(self.changePlanetThemes)
         self.ui.actionSave.triggered.connect(self.browseForFile_save)
         self.ui.actionLoad.triggered.connect(self.browseForFile_load)
         self.ui.techIDbutton.toggled.connect(self.setTechID)
-        self.connectMachineSignals()
+
+        # Hidden shortcut turning slot timing on and off (see src.instrumentation)
+        profileAction = QAction(self)
+        profileAction.setShortcut('Ctrl+Shift+P')
+        profileAction.triggered.connect(self.toggleInstrumentation)
+        self.addAction(profileAction)
+
+        # Recover the last session if it wasn't closed properly, then start autosaving
+        self.recoverSession()
+        if not self.journal.file:
+            self.journal.start(self.buildProject())
+
+    def closeEvent(self, event):
+        """
+        On a clean shutdown, the autosave journal is not needed anymore.
+        """
+        self.journal.discard()
+        INSTRUMENTATION.dump()
+        QMainWindow.closeEvent(self, event)
+
+    def toggleInstrumentation(self):
+        """
+        Starts timing the main slots, or stops and writes what was recorded.
+        """
+        if INSTRUMENTATION.enabled:
+            INSTRUMENTATION.disable()
+            INSTRUMENTATION.dump()
+            self.statusBar().showMessage('Slot timings written to ' + INSTRUMENTATION.outputPath, 5000)
+        else:
+            INSTRUMENTATION.enable()
+            self.statusBar().showMessage('Timing slots', 5000)
+
+    def recoverSession(self):
+        """
+        If a session was not closed properly, offers to recover it from its journal (the latest one, if several
+        were). Journals of other instances still running are left alone.
+        """
+        paths = journal.findUnclean(os.getcwd())
+        if not paths:
+            return
+        path = max(paths, key=os.path.getmtime)
+
+        title = "Recover Project"
+        message = "The application was not closed properly. Recover the unsaved changes?"
+        buttons = QMessageBox.Yes | QMessageBox.No
+        message = QMessageBox(QMessageBox.Question, title, message, buttons=buttons, flags=Qt.Dialog)
+        result = message.exec_()
+
+        if result == QMessageBox.Yes:
+            try:
+                d = journal.recover(path)
+            except (OSError, projectfile.ProjectFileError):
+                d = None
+            if d:
+                self.projectPath = journal.projectPathOf(path)
+                self.journal.suspended = True
+                self.applyProject(d)
+                self.journal.suspended = False
+                self.journal.moveTo(self.projectPath, self.buildProject())
+
+        # Recovered or not, the stale journals are not needed anymore
+        for oldPath in paths:
+            if oldPath != self.journal.path:
+                journal.discardJournal(oldPath)
 
     @Slot(bool)
     def setTechID(self, checked):
@@ -73,6 +168,7 @@ class MainWindow(QMainWindow):
             txt = txtField.text()
             try:
                 self.techID = int(txt)
+                self.journal.setTechID(self.techID)
                 txtField.setReadOnly(True)
                 palette = QPalette()
                 palette.setColor(QPalette.Button, Qt.darkGreen)
@@ -91,6 +187,7 @@ class MainWindow(QMainWindow):
                 return
         else:
             self.techID = None
+            self.journal.setTechID(None)
             txtField.setReadOnly(False)
             palette = QPalette()
             if self.theme is 0:
@@ -103,118 +200,294 @@ class MainWindow(QMainWindow):
             txtField.setPalette(palette)
             self.ui.techIDbutton.setPalette(palette)
 
-    def initPieCharts(self):
-        """
-        Initializes pie chart widgets in 3 tabs.
-
-        Not static: needs the self variable, but it is hidden as a string.
-        Uses QtCharts, Planet, and QPainter imports.
-        """
-        for i in range(1, 2):  # Tab number: i
-            for j in range(1, 6):  # Planet number: j
-
-                # Generate the necessary widgets' names
-                pieNum = "pie" + str(j)
-                infoSect = "self.ui.infoP" + str(j)
-                planetBox = "self.ui.planet" + str(j) + "Box"
-                widName = pieNum + "Container"
-                selfSeries = "self.ui." + pieNum + "series"
-                if i in [2, 3]:
-                    selfSeries += "_" + str(i)
-                    widName += "_" + str(i)
-                    infoSect += "_" + str(i)
-                    planetBox += "_" + str(i)
-
-                # Initialize commonly used custom strs
-                selfChart = "self.ui." + pieNum + "chart"
-                selfChartView = selfChart + "View"
-
-                # Store custom lines to execute (a list is easier to maintain and edit)
-                codeList = [selfChart + " = QtCharts.QChart()",
-                            selfChart + ".setTheme(QtCharts.QChart.ChartThemeLight)",
-                            selfSeries + " = Planet(" + selfChart + ", self, " + infoSect + ", " + planetBox + ")",
-                            selfSeries + ".planetEnabled.connect(self.checkPlanetStatuses)",
-                            'self.themeChanged.connect(lambda theme, self=self: ' + selfSeries + '.changeTheme(theme))',
-                            selfSeries + ".notEnoughSpaceForWO.connect(self.noSpaceLeftFor)",
-                            selfChart + ".addSeries(" + selfSeries + ")",
-                            selfChart + ".setBackgroundVisible(False)",
-                            selfChart + ".legend().hide()",
-                            selfChartView + " = QtCharts.QChartView(" + selfChart + ")",
-                            selfChartView + ".setRenderHint(QPainter.Antialiasing)",
-                            selfChartView + ".setParent(self.ui." + widName + ")",
-                            selfChartView + ".resize(340, 340)",
-                            selfChartView + ".move(-52, -52)"]
-
-                # Convert list to string, placing newlines between each command
-                code = '\n'.join(codeList)
-
-                # Execute custom code
-                exec(code)
+    def initMachineTab(self, machineNum):
+        """
+        Creates the widgets of machine machineNum in its page, connects them, and shows the machine's current values.
+        """
+        tab = MachineTab(machineNum, self.topology.planetCount(machineNum))
+        page = self.ui.tabWidget.widget(machineNum - 1)
+        layout = QVBoxLayout(page)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(tab)
+
+        self.connectMachineSignals(tab)
+        self.syncMachineTab(tab)
+        return tab
+
+    def initPieCharts(self, planets):
+        """
+        Initializes pie chart widgets for the given PlanetWidgets (those of one machine tab).
+        QtCharts is only imported then, so that it doesn't slow down startup.
+        """
+        from PySide2.QtCharts import QtCharts
+        from src.planet import Planet
+
+        for widgets in planets:
+            chart = QtCharts.QChart()
+            chart.setTheme(QtCharts.QChart.ChartThemeLight)
+            planet = Planet(chart, self, widgets.infoSection, widgets.planetBox)
+            planet.machineNum = widgets.machineNum
+            planet.planetEnabled.connect(self.checkPlanetStatuses)
+            planet.planetEnabled.connect(lambda enabled, w=widgets: self.journal.setPlanet(
+                w.machineNum - 1, w.planetNum, w.planet.capacity() if enabled else None))
+            planet.planetResized.connect(lambda w=widgets: self.journal.setPlanet(
+                w.machineNum - 1, w.planetNum, w.planet.capacity()))
+            planet.notEnoughSpaceForWO.connect(self.noSpaceLeftFor)
+            chart.addSeries(planet)
+            chart.setBackgroundVisible(False)
+            chart.legend().hide()
+            chartView = QtCharts.QChartView(chart)
+            chartView.setRenderHint(QPainter.Antialiasing)
+            chartView.setParent(widgets.container)
+            chartView.resize(340, 340)
+            chartView.move(-52, -52)
+
+            widgets.planet = planet
+            widgets.chart = chart
+            widgets.chartView = chartView
 
     @Slot(WorkOrder)
     def noSpaceLeftFor(self, workOrder: WorkOrder):
         """
-        Gives user the option to change workorder's planet, or discard the order.
+        Places a new work order that doesn't fit on its planet on another one, preferably of the same machine,
+        after showing where. The work order's machine and planet numbers are changed to that planet's.
         """
-        title = "Error: No Space Left On Planet"
-        message = "There isn't enough space left on the selected planet to add this order.\n" \
-                  "An option could be placed here to change the work order's planet, but this hasn't been implemented "\
-                  "yet, so the only option at the moment is to discard it. If this is necessary functionality and " \
-                  "needs to be implemented, please let me know."
-        buttons = QMessageBox.Discard
-        message = QMessageBox(QMessageBox.Warning, title, message, buttons=buttons, flags=Qt.Dialog)
-        message.exec_()
-        self.deleteWorkOrder(workOrder)
+        bins = self.placementBins()
+        sameMachine = [target for target in bins if target.machineNum == workOrder.machineNum]
+        placement = placeWorkOrders([workOrder], sameMachine)
+        if placement.unplaced:
+            placement = placeWorkOrders([workOrder], [target for target in bins if target not in sameMachine])
+
+        if placement.unplaced:
+            title = "Error: No Space Left"
+            message = "There isn't enough space left on any enabled planet for this order. Enable another planet, " \
+                      "or grow its planet instead."
+            message = QMessageBox(QMessageBox.Warning, title, message, buttons=QMessageBox.Ok, flags=Qt.Dialog)
+            message.exec_()
+            return
+
+        if PlacementDialog(placement, self).exec_() != QDialog.Accepted:
+            return
+        target = placement.assignments[workOrder]
+        workOrder.machineNum = target.machineNum
+        workOrder.planetNum = target.planetNum
+        self.registry.planet(target.machineNum, target.planetNum).addSlice(workOrder)
+
+    def placementBins(self, workOrders=()):
+        """
+        Returns a Bin for every enabled planet, in machine and planet order. The given work orders, about to be
+        placed again, don't count as taking space on their current planet.
+        """
+        moving = set(workOrders)
+        bins = []
+        for machineNum in self.registry.machineNums():
+            if machineNum not in self.registry.chartsBuilt:
+                continue  # Planets of machines never shown can't be enabled
+            for widgets in self.registry.planetsOf(machineNum):
+                planet = widgets.planet
+                if not planet.enabled:
+                    continue
+                staying = [workOrder for workOrder in planet.orders if workOrder not in moving]
+                capacity = planet.capacity()
+                target = Bin(machineNum, widgets.planetNum, capacity - sum(workOrder.pieces for workOrder in staying),
+                             {workOrder.side for workOrder in staying})
+                target.capacity = capacity
+                bins.append(target)
+        return bins
+
+    def autoPlaceWorkOrders(self, workOrders):
+        """
+        Proposes a placement of workOrders on the enabled planets of every machine, keeping sides together and
+        wasting as little space as possible, and applies it if the user accepts it.
+        """
+        workOrders = list(workOrders)
+        if not workOrders:
+            return
+        placement = placeWorkOrders(workOrders, self.placementBins(workOrders))
+        if PlacementDialog(placement, self).exec_() == QDialog.Accepted:
+            self.applyPlacement(placement)
+
+    def applyPlacement(self, placement):
+        """
+        Moves every work order of placement to its new planet: each planet's slices are rebuilt once, and results
+        are recalculated once per machine.
+        """
+        moves = placement.moves()
+        if not moves:
+            return
+
+        # Take the work orders off their current planets
+        byPlanet = {}
+        for workOrder, target in moves:
+            self.deselectWorkOrder(workOrder)
+            byPlanet.setdefault((workOrder.machineNum, workOrder.planetNum), []).append(workOrder)
+        for (machineNum, planetNum), planetWOs in byPlanet.items():
+            self.registry.planet(machineNum, planetNum).deleteOrders(planetWOs)
+
+        # Move them to their new machine and planet
+        changedMachines = set()
+        byPlanet = {}
+        for workOrder, target in moves:
+            oldMachine = self.machines[workOrder.machineNum-1]
+            changedMachines.update((workOrder.machineNum, target.machineNum))
+            if workOrder.machineNum != target.machineNum:
+                oldMachine.removeWorkOrder(workOrder)
+                self.journal.deleteWorkOrder(workOrder)
+                workOrder.machineNum = target.machineNum
+                workOrder.planetNum = target.planetNum
+                self.machines[target.machineNum-1].addWorkOrder(workOrder)
+                self.journal.addWorkOrder(workOrder)
+            else:
+                workOrder.planetNum = target.planetNum
+                oldMachine.updateWorkOrder(workOrder)
+                self.journal.editWorkOrder(workOrder)
+            self.results.updateRowInfo(workOrder)
+            byPlanet.setdefault((target.machineNum, target.planetNum), []).append(workOrder)
+
+        for (machineNum, planetNum), planetWOs in byPlanet.items():
+            self.registry.planet(machineNum, planetNum).addSlices(planetWOs)
+        for machineNum in sorted(changedMachines):
+            self.updateResults(self.machines[machineNum-1])
 
     def deleteWorkOrder(self, workOrder):
         """
         Pretty self-explanatory name lol
         """
-        self.results.removeRow(workOrder.rowNum)
-        self.results.updateRowsFrom(workOrder.rowNum)
-        exec("self.ui.pie" + str(workOrder.planetNum) + "series.deleteSlice(workOrder.slice)")
+        self.deleteWorkOrders([workOrder])
+
+    def deleteWorkOrders(self, workOrders):
+        """
+        Deletes all the given work orders in one pass: their rows are removed at once, each planet's slices are
+        rebuilt once, and results are recalculated once per machine.
+        """
+        workOrders = list(workOrders)
+        if not workOrders:
+            return
 
-    @Slot(QtCharts.QPieSlice)
+        self.results.removeRowsFor(workOrders)
+        for workOrder in workOrders:
+            self.selections[workOrder.machineNum].discard(workOrder)
+
+        byPlanet = {}
+        for workOrder in workOrders:
+            byPlanet.setdefault((workOrder.machineNum, workOrder.planetNum), []).append(workOrder)
+        for (machineNum, planetNum), planetWOs in byPlanet.items():
+            self.registry.planet(machineNum, planetNum).deleteOrders(planetWOs)
+
+        changedMachines = set()
+        for workOrder in workOrders:
+            self.woIDs.release(workOrder.number)
+            machine = self.machines[workOrder.machineNum-1]
+            if id(workOrder) in machine.contributions:
+                machine.removeWorkOrder(workOrder)
+                self.journal.deleteWorkOrder(workOrder)
+                changedMachines.add(workOrder.machineNum)
+
+        for machineNum in sorted(changedMachines):
+            self.updateResults(self.machines[machineNum-1])
+
+    def clearMachine(self, machineNum):
+        """
+        Deletes every work order of machine machineNum, and disables its planets. Everything goes at once: the rows
+        are removed together, the planets are disabled without rebuilding their slices, and the machine's work
+        orders are cleared in one go.
+        """
+        machine = self.machines[machineNum-1]
+        workOrders = list(machine.workOrders)
+        self.clearSelection(machineNum)
+        self.results.removeRowsFor(workOrders)
+        for widgets in self.registry.planetsOf(machineNum):
+            if widgets.planet is not None:
+                widgets.planet.setDisabled()
+
+        for workOrder in workOrders:
+            workOrder.slice = None
+            self.woIDs.release(workOrder.number)
+            self.journal.deleteWorkOrder(workOrder)
+        machine.clearWorkOrders()
+        self.updateResults(machine)
+
+    @Slot(object)
     def ensureSingleWorkOrder_p(self, mySlice):
         """
-        For signals coming from planets, when a slice was just selected.
-        Ensures there is only one Work Order selected per machine: the one given.
-        Then selects the Work Order's row in the results section.
+        For signals coming from planets, when a slice was just clicked.
+        Selects the slice's Work Order, as the only one of its machine unless Ctrl is held, and its row in the
+        results section. Clicking a selected slice deselects it.
         """
         wo = mySlice.order
-        if not mySlice.selected:
-            self.deselectAllSlicesInTab(wo.machineNum, mySlice=mySlice, planetNum=wo.planetNum)
-            rowPos = wo.rowNum
-            self.results.selectRow(rowPos)
+        if wo not in self.selections[wo.machineNum]:
+            additive = self.additiveSelection()
+            self.selectWorkOrder(wo, additive)
+            self.results.selectRowFor(wo, additive)
         else:
-            pie = "self.ui.pie" + str(wo.planetNum) + "series"
-            exec(pie + ".clickSlice(mySlice)")
+            self.deselectWorkOrder(wo)
 
     @Slot(int, int)
     def ensureSingleWorkOrder_r(self, row, col):
         """
         For signals coming from the results section, when a cell of a row is selected.
-        Ensures there is only one Work Order selected per machine: the one given.
-        Then selects the corresponding slice in the pie charts
+        Selects the row's Work Order, as the only one of its machine unless Ctrl is held, and its slice in the pie
+        charts. Ctrl clicking a selected row deselects it.
         """
-        wo = self.results.rowNumToWOMapping[row]
-        self.deselectAllSlicesInTab(wo.machineNum, mySlice=wo.slice, planetNum=wo.planetNum)
+        wo = self.results.workOrderAt(row)
+        additive = self.additiveSelection()
+        if additive and wo in self.selections[wo.machineNum]:
+            self.deselectWorkOrder(wo)
+        else:
+            self.selectWorkOrder(wo, additive)
 
-    def deselectAllSlicesInTab(self, tab, mySlice=None, planetNum=None):
+    @staticmethod
+    def additiveSelection():
         """
-        Optional param is the one slice you do want selected.
-        Note: Not static. Uses self, but it is hidden as string.
+        Returns whether the current click adds to the selection (Ctrl is held) rather than replacing it.
         """
-        for j in range(1, 6):  # Planet number: j
-            pie = "self.ui.pie" + str(j) + "series"
+        return bool(QApplication.keyboardModifiers() & Qt.ControlModifier)
 
-            if tab in [2, 3]:
-                pie += "_" + str(tab)
+    def selectWorkOrder(self, workOrder, additive=False):
+        """
+        Selects workOrder's slice. Unless additive, whatever else was selected in its machine is deselected first.
+        Only the slices whose selection changes are touched.
+        """
+        if not additive:
+            self.clearSelection(workOrder.machineNum, keep=workOrder)
+        self.selections[workOrder.machineNum].add(workOrder)
+        planet = self.registry.planet(workOrder.machineNum, workOrder.planetNum)
+        if planet is not None:
+            planet.selectSlice(workOrder.slice)
+
+    def deselectWorkOrder(self, workOrder):
+        """
+        Deselects workOrder's slice, unless it is the small orders slice and another of its orders is still selected.
+        """
+        selection = self.selections[workOrder.machineNum]
+        selection.discard(workOrder)
+        mySlice = workOrder.slice
+        if mySlice is None or not mySlice.selected:
+            return
+        if any(order in selection for order in getattr(mySlice, 'orders', ())):
+            return
+        mySlice.parent().deselectSlice(mySlice)
 
-            exec(pie + ".deselectAll()")
+    def selectEmptySlice(self, planet):
+        """
+        Selects planet's empty slice, as the only selection of its machine.
+        """
+        self.clearSelection(planet.machineNum)
+        self.selections[planet.machineNum].emptyPlanet = planet
+        planet.selectSlice(planet.emptySlice)
 
-            if mySlice and j == planetNum:
-                exec(pie + ".clickSlice(mySlice)")
+    def clearSelection(self, machineNum, keep=None):
+        """
+        Deselects everything selected in machine machineNum, except keep's slice if given.
+        """
+        workOrders, emptyPlanet = self.selections[machineNum].clear()
+        keepSlice = keep.slice if keep is not None else None
+        for workOrder in workOrders:
+            mySlice = workOrder.slice
+            if mySlice is not None and mySlice is not keepSlice and mySlice.selected:
+                mySlice.parent().deselectSlice(mySlice)
+        if emptyPlanet is not None:
+            emptyPlanet.deselectSlice(emptyPlanet.emptySlice)
 
     @Slot()
     def browseForFile_save(self) -> None:
@@ -251,211 +524,177 @@ class MainWindow(QMainWindow):
 
     def saveFile(self, path):
         """
-        Saves data to file, at location "path".
+        Saves data to file, at location "path". Autosaving continues next to the saved file.
         """
-        # Create dictionary first. All we really care about is the work orders, so we'll just save the list of them.
+        d = self.buildProject()
+        projectfile.saveProject(path, d, len(self.machines))
+
+        self.projectPath = path
+        self.journal.moveTo(path, self.buildProject())
+
+    def buildProject(self):
+        """
+        Returns the whole project as a dict, in the format used by projectfile.
+        """
+        # All we really care about is the work orders, so we'll just save the list of them.
         d = {'techID': self.techID}
         for tab, machine in enumerate(self.machines):
-            if tab == 0:  # TODO: change
-                d[tab] = {}
-                d[tab]['workOrders'] = {}
-                for wo in machine.workOrders:
-                    d[tab]['workOrders'][wo.name] = [wo.pieces, wo.side, wo.planetNum, wo.yld]
-                d[tab]['startTime'] = machine.startTime
-                d[tab]['endTime'] = machine.endTime
-                d[tab]['loadTime'] = machine.loadTime
-                d[tab]['unloadTime'] = machine.unloadTime
-                d[tab]['cdn'] = machine.cdn
-                d[tab]['testRun'] = machine.testRun
-                d[tab]['coatingRun'] = machine.coatingRun
-                d[tab]['loadingRun'] = machine.loadingRun
-                d[tab]['setupRun'] = machine.setupRun
-
-                # Storing planets' sum values.
-                d[tab]['planets'] = {}
-
-                for planet in range(1, 6):
-                    pie = 'self.ui.pie' + str(planet) + 'series'
-                    if tab in (1, 2):
-                        pie += '_' + str(tab+1)
-                    exec('tmp = ' + pie + '.enabled', locals())
-                    if locals()['tmp']:
-                        exec('sum = ' + pie + '.sum()', locals())
-                        d[tab]['planets'][planet] = locals()['sum']
-                    else:
-                        d[tab]['planets'][planet] = None
-
-        # Now save to file.
-        with open(path, 'wb') as f:
-            pickle.dump(d, f)
+            d[tab] = {}
+            d[tab]['workOrders'] = {}
+            for wo in machine.workOrders:
+                d[tab]['workOrders'][wo.name] = [wo.pieces, wo.side, wo.planetNum, wo.yld]
+            d[tab]['startTime'] = formatTime(machine.startTime)
+            d[tab]['endTime'] = formatTime(machine.endTime)
+            d[tab]['loadTime'] = formatTime(machine.loadTime)
+            d[tab]['unloadTime'] = formatTime(machine.unloadTime)
+            d[tab]['cdn'] = machine.cdn
+            d[tab]['testRun'] = machine.testRun
+            d[tab]['coatingRun'] = machine.coatingRun
+            d[tab]['loadingRun'] = machine.loadingRun
+            d[tab]['setupRun'] = machine.setupRun
+
+            # Storing planets' sum values. Planets of machines whose charts were never created are disabled.
+            d[tab]['planets'] = dict.fromkeys(self.topology.planetNums(tab + 1))
+            for widgets in self.registry.planetsOf(tab + 1):
+                if widgets.planet is not None and widgets.planet.enabled:
+                    d[tab]['planets'][widgets.planetNum] = widgets.planet.sum()
+
+        return d
 
     def loadFile(self, path):
         """
          Attempts to load the file at path
         """
         error = False
+        skipped = []
         if path[-5:] == '.proj':
             try:
-                # Load dictionary from file
-                with open(path, 'rb') as f:
-                    p = pickle.Unpickler(f)
-                    d = p.load()
-
-                if not p:
-                    # file is empty
-                    error = True  # Checks if file is empty
-
-                else:
-                    self.techID = d['techID']
-                    self.ui.techID.setText(str(self.techID))
-                    self.ui.techIDbutton.setChecked(True)
-
-                    for tab in range(0, 1):  # TODO: Change
-                        machine = self.machines[tab]
-
-                        # Load all values
-                        startTime = d[tab]['startTime']
-                        endTime = d[tab]['endTime']
-                        loadTime = d[tab]['loadTime']
-                        unloadTime = d[tab]['unloadTime']
-                        cdn = d[tab]['cdn']
-                        testRun = d[tab]['testRun']
-                        coatingRun = d[tab]['coatingRun']
-                        loadingRun = d[tab]['loadingRun']
-                        setupRun = d[tab]['setupRun']
-
-                        # Check if they exist
-                        if startTime:
-                            machine.startTime = startTime
-
-                            time = QTime().fromString(startTime)
-                            tmp = 'self.ui.startTime'
-                            but = 'self.ui.stButton'
-                            if tab in (1, 2):
-                                tmp += '_' + str(tab+1)
-                                but += '_' + str(tab+1)
-                            exec(tmp + '.setTime(time)')
-                            exec(but + '.setChecked(True)')
-
-                        if endTime:
-                            machine.endTime = endTime
-
-                            time = QTime().fromString(endTime)
-                            tmp = 'self.ui.endTime'
-                            but = 'self.ui.etButton'
-                            if tab in (1, 2):
-                                tmp += '_' + str(tab+1)
-                                but += '_' + str(tab+1)
-                            exec(tmp + '.setTime(time)')
-                            exec(but + '.setChecked(True)')
-
-                        if loadTime:
-                            machine.loadTime = loadTime
-
-                            time = QTime().fromString(loadTime)
-                            tmp = 'self.ui.loadTime'
-                            but = 'self.ui.ltButton'
-                            if tab in (1, 2):
-                                tmp += '_' + str(tab+1)
-                                but += '_' + str(tab+1)
-                            exec(tmp + '.setTime(time)')
-                            exec(but + '.setChecked(True)')
-
-                        if unloadTime:
-                            machine.unloadTime = unloadTime
-
-                            time = QTime().fromString(unloadTime)
-                            tmp = 'self.ui.unloadTime'
-                            but = 'self.ui.utButton'
-                            if tab in (1, 2):
-                                tmp += '_' + str(tab+1)
-                                but += '_' + str(tab+1)
-                            exec(tmp + '.setTime(time)')
-                            exec(but + '.setChecked(True)')
-
-                        if cdn:  # If there's the cdn, the other 4 are there too
-                            machine.cdn = cdn
-                            machine.testRun = testRun
-                            machine.coatingRun = coatingRun
-                            machine.loadingRun = loadingRun
-                            machine.setupRun = setupRun
-
-                            cdnBox = 'self.ui.cdn'
-                            testBox = 'self.ui.testRun'
-                            coatBox = 'self.ui.coatRun'
-                            loadBox = 'self.ui.loadingRun'
-                            setupBox = 'self.ui.setupTestRun'
-                            vButton = 'self.ui.validateButton'
-
-                            if tab in (1, 2):
-                                cdnBox += '_' + str(tab+1)
-                                testBox += '_' + str(tab+1)
-                                coatBox += '_' + str(tab+1)
-                                loadBox += '_' + str(tab+1)
-                                setupBox += '_' + str(tab+1)
-                                vButton += '_' + str(tab+1)
-
-                            codeList = [
-                                cdnBox + '.setText(str(cdn))',
-                                testBox + '.setText(str(testRun))',
-                                coatBox + '.setText(str(coatingRun))',
-                                loadBox + '.setText(str(loadingRun))',
-                                setupBox + '.setText(str(setupRun))',
-                                vButton + '.setChecked(True)'
-                            ]
-
-                            code = '\n'.join(codeList)
-                            exec(code)
-
-                        # Initialize planets
-                        for planetNum in d[tab]['planets']:
-                            sum = d[tab]['planets'][planetNum]
-                            if sum:
-                                pie = 'self.ui.pie' + str(planetNum) + 'series'
-                                if tab in (1, 2):
-                                    pie += '_' + str(tab + 1)
-                                exec(pie + '.setEnabled(sum)')
-
-                        sortedWOList = []
-                        for woName in d[tab]['workOrders']:
-                            params = d[tab]['workOrders'][woName]
-
-                            wo = WorkOrder()
-                            wo.name = woName
-                            wo.machineNum = tab + 1
-                            wo.pieces = params[0]
-                            wo.side = params[1]
-                            wo.planetNum = params[2]
-                            if params[3]:
-                                wo.setYield(params[3])
-
-                            sortedWOList.append(wo)
-                        sortedWOList.sort(key=lambda workOrder: int(workOrder.name[4:]))
-
-                        unsuccessful = []
-                        for wo in sortedWOList:
-                            success = self.addToPlanets(wo)
-                            if success:
-                                self.results.addRowFor(wo)
-                                self.machines[wo.machineNum - 1].workOrders.append(wo)
-                            else:
-                                unsuccessful.append(wo)
-                        if unsuccessful:
-                            for wo in unsuccessful:
-                                print(wo.name)
-            except Exception as e:
-                raise e
+                # Load dictionary from file (older pickled projects are converted when read)
+                d = projectfile.loadProject(path)
+            except projectfile.ProjectFileError:
+                error = True
+
+            if not error:
+                self.journal.suspended = True
+                skipped = self.applyProject(d)
+                self.journal.suspended = False
+
+                self.projectPath = path
+                self.journal.moveTo(path, self.buildProject())
         else:
             # not a proj file
             error = True
 
-        if error:
+        if error or skipped:
             title = "Error Loading Project"
-            message = "Could not load the selected file successfully."
+            if error:
+                message = "Could not load the selected file successfully."
+            else:
+                names = [wo.name + " (Machine " + str(wo.machineNum) + ", Planet " + str(wo.planetNum) + ")"
+                         for wo in skipped[:self.MAX_LISTED_ERRORS]]
+                if len(skipped) > self.MAX_LISTED_ERRORS:
+                    names.append("... and " + str(len(skipped) - self.MAX_LISTED_ERRORS) + " more")
+                message = "These work orders could not be loaded:\n" + "\n".join(names)
             buttons = QMessageBox.Ok
             message = QMessageBox(QMessageBox.Warning, title, message, buttons=buttons, flags=Qt.Dialog)
             message.exec_()
 
+    def applyProject(self, d):
+        """
+        Loads a project dict (see projectfile) into the app.
+        Returns the work orders that could not be added (their planet doesn't exist or is full, or their number is
+        already taken).
+        """
+        if d['techID'] is not None:
+            self.ui.techID.setText(str(d['techID']))
+            self.ui.techIDbutton.setChecked(True)
+
+        skipped = []
+        for tab in range(len(self.machines)):
+            if tab not in d:
+                continue
+            machine = self.machines[tab]
+
+            # Load all values
+            startTime = parseTime(d[tab]['startTime'])
+            endTime = parseTime(d[tab]['endTime'])
+            loadTime = parseTime(d[tab]['loadTime'])
+            unloadTime = parseTime(d[tab]['unloadTime'])
+            cdn = d[tab]['cdn']
+            testRun = d[tab]['testRun']
+            coatingRun = d[tab]['coatingRun']
+            loadingRun = d[tab]['loadingRun']
+            setupRun = d[tab]['setupRun']
+
+            # Check if they exist. The machine's tab shows them once it is created, or right away if it already is.
+            if startTime is not None:
+                machine.startTime = startTime
+            if endTime is not None:
+                machine.endTime = endTime
+            if loadTime is not None:
+                machine.loadTime = loadTime
+            if unloadTime is not None:
+                machine.unloadTime = unloadTime
+
+            if cdn:  # If there's the cdn, the other 4 are there too
+                machine.cdn = cdn
+                machine.testRun = testRun
+                machine.coatingRun = coatingRun
+                machine.loadingRun = loadingRun
+                machine.setupRun = setupRun
+
+            if tab + 1 in self.registry.machines:
+                self.syncMachineTab(self.registry.machines[tab + 1])
+
+            # Initialize planets. Planets the topology doesn't have are skipped.
+            for planetNum in d[tab]['planets']:
+                sum = d[tab]['planets'][planetNum]
+                if sum and self.topology.hasPlanet(tab + 1, planetNum):
+                    self.registry.planet(tab + 1, planetNum).setEnabled(sum)
+
+            sortedWOList = []
+            for woName in d[tab]['workOrders']:
+                params = d[tab]['workOrders'][woName]
+
+                wo = WorkOrder()
+                wo.name = woName
+                wo.machineNum = tab + 1
+                wo.pieces = params[0]
+                wo.side = params[1]
+                wo.planetNum = params[2]
+                if params[3]:
+                    wo.setYield(params[3])
+
+                sortedWOList.append(wo)
+            sortedWOList.sort(key=lambda workOrder: workOrder.number)
+
+            # Add each planet's slices in one batch
+            unsuccessful = []
+            planetWOs = {}
+            for wo in sortedWOList:
+                if not self.topology.hasPlanet(wo.machineNum, wo.planetNum):
+                    unsuccessful.append(wo)
+                elif self.woIDs.register(wo.number):
+                    planetWOs.setdefault(wo.planetNum, []).append(wo)
+                else:
+                    unsuccessful.append(wo)
+
+            successful = []
+            for planetNum, wos in planetWOs.items():
+                added = self.registry.planet(tab + 1, planetNum).addSlices(wos)
+                successful.extend(added)
+                for wo in wos:
+                    if wo.slice is None:
+                        self.woIDs.release(wo.number)
+                        unsuccessful.append(wo)
+
+            successful.sort(key=lambda workOrder: workOrder.number)
+            for wo in successful:
+                machine.addWorkOrder(wo)
+            self.results.addRowsFor(successful)
+            skipped.extend(unsuccessful)
+        return skipped
+
     @Slot(bool)
     def checkPlanetStatuses(self, enabled):
         """
@@ -469,15 +708,9 @@ class MainWindow(QMainWindow):
         else:
             if self.ui.actionSave.isEnabled():
                 atLeastOneEnabled = False
-                for machine in range(1, 2):  # 3 tabs TODO: Change 1 to 3 when other tabs are implemented
-                    for planet in range(1, 6):  # 5 planets
-                        pie = "self.ui.pie" + str(planet) + "series"
-                        if machine in [2, 3]:
-                            pie += "_" + str(machine)
-                        if exec(pie + '.enabled'):
-                            atLeastOneEnabled = True
-                            break
-                    if atLeastOneEnabled:
+                for widgets in self.registry.allPlanets():
+                    if widgets.planet.enabled:
+                        atLeastOneEnabled = True
                         break
                 if not atLeastOneEnabled:
                     self.ui.actionSave.setEnabled(False)
@@ -488,7 +721,7 @@ class MainWindow(QMainWindow):
         If it is unchecked, the data is deleted and the timeObject is enabled.
         """
         if checked:
-            machine.startTime = timeBox.time().toString()
+            machine.startTime = timeBox.time().msecsSinceStartOfDay() // 1000
             timeBox.setReadOnly(True)
             palette = QPalette()
             palette.setColor(QPalette.Button, Qt.darkGreen)
@@ -508,6 +741,7 @@ class MainWindow(QMainWindow):
             button.setPalette(palette)
             timeBox.setPalette(palette)
 
+        self.journal.setTime(self.machines.index(machine), 'startTime', machine.startTime)
         self.updateResults(machine)
 
     def endTimeCheck(self, checked, machine, timeBox, button):
@@ -516,7 +750,7 @@ class MainWindow(QMainWindow):
         If it is unchecked, the data is deleted and the timeObject is enabled.
         """
         if checked:
-            machine.endTime = timeBox.time().toString()
+            machine.endTime = timeBox.time().msecsSinceStartOfDay() // 1000
             timeBox.setReadOnly(True)
             palette = QPalette()
             palette.setColor(QPalette.Button, Qt.darkGreen)
@@ -535,6 +769,7 @@ class MainWindow(QMainWindow):
             button.setPalette(palette)
             timeBox.setPalette(palette)
 
+        self.journal.setTime(self.machines.index(machine), 'endTime', machine.endTime)
         self.updateResults(machine)
 
     def loadTimeCheck(self, checked, machine, timeBox, button):
@@ -543,7 +778,7 @@ class MainWindow(QMainWindow):
         If it is unchecked, the data is deleted and the timeObject is enabled.
         """
         if checked:
-            machine.loadTime = timeBox.time().toString()
+            machine.loadTime = timeBox.time().msecsSinceStartOfDay() // 1000
             timeBox.setReadOnly(True)
             palette = QPalette()
             palette.setColor(QPalette.Button, Qt.darkGreen)
@@ -562,6 +797,7 @@ class MainWindow(QMainWindow):
             button.setPalette(palette)
             timeBox.setPalette(palette)
 
+        self.journal.setTime(self.machines.index(machine), 'loadTime', machine.loadTime)
         self.updateResults(machine)
 
     def unloadTimeCheck(self, checked, machine, timeBox, button):
@@ -570,7 +806,7 @@ class MainWindow(QMainWindow):
         If it is unchecked, the data is deleted and the timeObject is enabled.
         """
         if checked:
-            machine.unloadTime = timeBox.time().toString()
+            machine.unloadTime = timeBox.time().msecsSinceStartOfDay() // 1000
             timeBox.setReadOnly(True)
             palette = QPalette()
             palette.setColor(QPalette.Button, Qt.darkGreen)
@@ -589,68 +825,40 @@ class MainWindow(QMainWindow):
             button.setPalette(palette)
             timeBox.setPalette(palette)
 
+        self.journal.setTime(self.machines.index(machine), 'unloadTime', machine.unloadTime)
         self.updateResults(machine)
 
-    def validateData(self, checked, tab):
+    def validateData(self, checked, widgets):
         """
         If checked, loads data from all text fields around validate button, and disables them. Also changes button text.
         Otherwise, enables all fields, clears data, and changes button text back.
+        widgets is the machine's tab. It is given directly, as this also runs while the tab is being created.
         """
-        cdnBox = "self.ui.cdn"
-        testBox = "self.ui.testRun"
-        coatBox = "self.ui.coatRun"
-        loadBox = "self.ui.loadingRun"
-        setupBox = "self.ui.setupTestRun"
-        vButton = "self.ui.validateButton"
-        machine = "self.machines[" + str(tab-1) + "]"
-        if tab in (2, 3):
-            cdnBox += "_" + str(tab)
-            testBox += "_" + str(tab)
-            coatBox += "_" + str(tab)
-            loadBox += "_" + str(tab)
-            setupBox += "_" + str(tab)
-            vButton += "_" + str(tab)
+        tab = widgets.machineNum
+        machine = self.machines[tab-1]
+        fields = widgets.runFields()
+        vButton = widgets.validateButton
 
         if checked:
-            codeList = [
-                'cdn = ' + cdnBox + '.text()',
-                'testRun = ' + testBox + '.text()',
-                'coatingRun = ' + coatBox + '.text()',
-                'loadingRun = ' + loadBox + '.text()',
-                'setupRun = ' + setupBox + '.text()',
-                'locals()["valid"] = self.checkValidity(cdn, testRun, coatingRun, loadingRun, setupRun)'
-            ]
-            code = '\n'.join(codeList)
-            exec(code)
-
-            if locals()["valid"]:
-                codeList = [
-                    machine + '.cdn = int(' + cdnBox + '.text())',
-                    machine + '.testRun = float(' + testBox + '.text())',
-                    machine + '.coatingRun = float(' + coatBox + '.text())',
-                    machine + '.loadingRun = float(' + loadBox + '.text())',
-                    machine + '.setupRun = float(' + setupBox + '.text())',
-                    cdnBox + '.setReadOnly(True)',
-                    testBox + '.setReadOnly(True)',
-                    coatBox + '.setReadOnly(True)',
-                    loadBox + '.setReadOnly(True)',
-                    setupBox + '.setReadOnly(True)',
-                    vButton + '.setText("Unlock")',
-                    'palette = QPalette()',
-                    'palette.setColor(QPalette.Button, Qt.darkGreen)',
-                    'palette.setColor(QPalette.ButtonText, Qt.white)',
-                    'palette.setColor(QPalette.Base, QColor(100, 143, 100))',
-                    vButton + '.setPalette(palette)',
-                    cdnBox + '.setPalette(palette)',
-                    testBox + '.setPalette(palette)',
-                    coatBox + '.setPalette(palette)',
-                    loadBox + '.setPalette(palette)',
-                    setupBox + '.setPalette(palette)'
-                ]
+            cdn, testRun, coatingRun, loadingRun, setupRun = [field.text() for field in fields]
+            if self.checkValidity(cdn, testRun, coatingRun, loadingRun, setupRun):
+                machine.cdn = int(cdn)
+                machine.testRun = float(testRun)
+                machine.coatingRun = float(coatingRun)
+                machine.loadingRun = float(loadingRun)
+                machine.setupRun = float(setupRun)
+                vButton.setText("Unlock")
+
+                palette = QPalette()
+                palette.setColor(QPalette.Button, Qt.darkGreen)
+                palette.setColor(QPalette.ButtonText, Qt.white)
+                palette.setColor(QPalette.Base, QColor(100, 143, 100))
+                vButton.setPalette(palette)
+                for field in fields:
+                    field.setReadOnly(True)
+                    field.setPalette(palette)
             else:
-                codeList = [
-                    vButton + '.setChecked(False)'
-                ]
+                vButton.setChecked(False)
         else:
             palette = QPalette()
             if self.theme is 0:
@@ -661,30 +869,19 @@ class MainWindow(QMainWindow):
                 palette.setColor(QPalette.Button, QColor(53, 53, 53))
                 palette.setColor(QPalette.Base, QColor(25, 25, 25))
 
-            codeList = [
-                machine + '.cdn = None',
-                machine + '.testRun = None',
-                machine + '.coatingRun = None',
-                machine + '.loadingRun = None',
-                machine + '.setupRun = None',
-                cdnBox + '.setReadOnly(False)',
-                testBox + '.setReadOnly(False)',
-                coatBox + '.setReadOnly(False)',
-                loadBox + '.setReadOnly(False)',
-                setupBox + '.setReadOnly(False)',
-                vButton + '.setText("Lock")',
-                vButton + '.setPalette(palette)',
-                cdnBox + '.setPalette(palette)',
-                testBox + '.setPalette(palette)',
-                coatBox + '.setPalette(palette)',
-                loadBox + '.setPalette(palette)',
-                setupBox + '.setPalette(palette)'
-            ]
-
-        code = '\n'.join(codeList)
-        exec(code)
-
-        self.updateResults(self.machines[tab-1])
+            machine.cdn = None
+            machine.testRun = None
+            machine.coatingRun = None
+            machine.loadingRun = None
+            machine.setupRun = None
+            vButton.setText("Lock")
+            vButton.setPalette(palette)
+            for field in fields:
+                field.setReadOnly(False)
+                field.setPalette(palette)
+
+        self.journal.setRunParameters(tab-1, machine)
+        self.updateResults(machine)
 
     def checkValidity(self, cdn, testRun, coatingRun, loadingRun, setupRun):
         """
@@ -709,45 +906,45 @@ class MainWindow(QMainWindow):
         """
         When a button is pressed in a machine, this function makes sure
         to update its work orders with the correct values.
+        The update is only scheduled: all updates asked for in one event loop tick are applied at once.
         """
-        for workOrder in machine.workOrders:
-            self.results.updateRowInfo(workOrder)
+        self.results.updateTimes(machine)
 
-    def connectMachineSignals(self):
-        """
-        Connects all time and textbox signals for each machine.
-        Note: Not static. Uses self variable, but hidden as string.
-        """
-        for tab in range(1, 2):  # TODO: Change 2 to 4 when other tabs are implemented.
-            # Instantiate button names
-            stButton = "self.ui.stButton"
-            stBox = "self.ui.startTime"
-            etButton = "self.ui.etButton"
-            etBox = "self.ui.endTime"
-            ltButton = "self.ui.ltButton"
-            ltBox = "self.ui.loadTime"
-            utButton = "self.ui.utButton"
-            utBox = "self.ui.unloadTime"
-            vButton = "self.ui.validateButton"
-            machine = "self.machines[" + str(tab - 1) + "]"
-            if tab in (2, 3):
-                stButton += "_" + str(tab)
-                etButton += "_" + str(tab)
-                ltButton += "_" + str(tab)
-                utButton += "_" + str(tab)
-                vButton += "_" + str(tab)
-
-            # List of code to run
-            codeList = [
-                stButton + ".toggled.connect(lambda checked, self=self: self.startTimeCheck(checked, " + machine + ", " + stBox + ", " + stButton + "))",
-                etButton + ".toggled.connect(lambda checked, self=self: self.endTimeCheck(checked, " + machine + ", " + etBox + ", " + etButton + "))",
-                ltButton + ".toggled.connect(lambda checked, self=self: self.loadTimeCheck(checked, " + machine + ", " + ltBox + ", " + ltButton + "))",
-                utButton + ".toggled.connect(lambda checked, self=self: self.unloadTimeCheck(checked, " + machine + ", " + utBox + ", " + utButton + "))",
-                vButton + ".toggled.connect(lambda checked, self=self: self.validateData(checked, " + str(tab) + "))"
-            ]
-
-            code = '\n'.join(codeList)
-            exec(code)
+    def connectMachineSignals(self, widgets):
+        """
+        Connects all time and textbox signals of a machine's tab.
+        """
+        tab = widgets.machineNum
+        machine = self.machines[tab - 1]
+        widgets.stButton.toggled.connect(lambda checked, m=machine, w=widgets: self.startTimeCheck(checked, m, w.startTime, w.stButton))
+        widgets.etButton.toggled.connect(lambda checked, m=machine, w=widgets: self.endTimeCheck(checked, m, w.endTime, w.etButton))
+        widgets.ltButton.toggled.connect(lambda checked, m=machine, w=widgets: self.loadTimeCheck(checked, m, w.loadTime, w.ltButton))
+        widgets.utButton.toggled.connect(lambda checked, m=machine, w=widgets: self.unloadTimeCheck(checked, m, w.unloadTime, w.utButton))
+        widgets.validateButton.toggled.connect(lambda checked, w=widgets: self.validateData(checked, w))
+        widgets.addWorkOrderButton.clicked.connect(lambda: self.showWOInitDialog())
+
+    def syncMachineTab(self, widgets):
+        """
+        Shows the machine's current times and run parameters in its tab. Nothing is recorded in the journal, as
+        the values don't change.
+        """
+        machine = self.machines[widgets.machineNum - 1]
+        suspended = self.journal.suspended
+        self.journal.suspended = True
+
+        for key, timeBox, button in widgets.timeFields():
+            secs = getattr(machine, key)
+            if secs is not None:
+                timeBox.setTime(QTime.fromMSecsSinceStartOfDay(secs * 1000))
+            button.setChecked(secs is not None)
+
+        if machine.cdn is not None:
+            values = [machine.cdn, machine.testRun, machine.coatingRun, machine.loadingRun, machine.setupRun]
+            for field, value in zip(widgets.runFields(), values):
+                field.setText(str(value))
+        widgets.validateButton.setChecked(machine.cdn is not None)
+
+        self.journal.suspended = suspended
 
     def showWOInitDialog(self, wo=None):
         """
@@ -762,31 +959,96 @@ class MainWindow(QMainWindow):
         else:
             success = self.addToPlanets(wo)
             if not success:
+                self.woIDs.release(wo.number)
                 self.showWOInitDialog(wo)
                 return
+            self.machines[wo.machineNum-1].addWorkOrder(wo)
+            self.journal.addWorkOrder(wo)
             self.results.addRowFor(wo)
-            self.machines[wo.machineNum-1].workOrders.append(wo)
 
-    def updateWorkOrder(self, workOrder: WorkOrder):
+    def updateWorkOrder(self, workOrder: WorkOrder, oldMachineNum, oldPlanetNum):
         """
-        Updates visual information about workOrder.
+        Updates visual information about workOrder after it was edited. If its machine or planet was changed, it is
+        moved there, unless the user refuses to grow that planet, in which case it stays where it was. If the user
+        refuses to grow its planet for a raised number of pieces, its old number of pieces is kept.
         """
-        workOrder.slice.setValue(workOrder.pieces)
-        workOrder.slice.parent().updateHeader()
-        if workOrder.slice.selected:
-            workOrder.slice.parent().clickSlice(workOrder.slice)
-            workOrder.slice.parent().clickSlice(workOrder.slice)
+        newLocation = (workOrder.machineNum, workOrder.planetNum)
+        if newLocation == (oldMachineNum, oldPlanetNum):
+            planet = workOrder.slice.parent()
+            if not planet.updateOrder(workOrder):
+                # The user refused to grow the planet: the other edits are kept, not the new number of pieces
+                self.restorePieces(workOrder, planet.piecesOf(workOrder))
+            machine = self.machines[workOrder.machineNum-1]
+            machine.updateWorkOrder(workOrder)
+            self.journal.editWorkOrder(workOrder)
+            self.results.updateRowInfo(workOrder)
+            self.updateResults(machine)
+            return
+
+        # Take it off its old planet, which gets back the pieces it took
+        workOrder.machineNum, workOrder.planetNum = oldMachineNum, oldPlanetNum
+        self.deselectWorkOrder(workOrder)
+        oldPlanet = self.registry.planet(oldMachineNum, oldPlanetNum)
+        oldPieces = oldPlanet.piecesOf(workOrder)
+        oldPlanet.deleteOrder(workOrder)
+
+        workOrder.machineNum, workOrder.planetNum = newLocation
+        if not self.addToPlanets(workOrder):
+            # Back to its old planet, which may have to grow if its number of pieces was raised. If the user refuses
+            # that too, the new number of pieces is dropped, and the old one fits in the space it just left.
+            workOrder.machineNum, workOrder.planetNum = oldMachineNum, oldPlanetNum
+            if not oldPlanet.addSlice(workOrder):
+                self.restorePieces(workOrder, oldPieces)
+                oldPlanet.addSlice(workOrder)
+
+        oldMachine = self.machines[oldMachineNum-1]
+        machine = self.machines[workOrder.machineNum-1]
+        if machine is oldMachine:
+            machine.updateWorkOrder(workOrder)
+            self.journal.editWorkOrder(workOrder)
+        else:
+            oldMachine.removeWorkOrder(workOrder)
+            self.journal.deleteWorkOrder(workOrder, oldMachineNum)
+            machine.addWorkOrder(workOrder)
+            self.journal.addWorkOrder(workOrder)
+            self.updateResults(oldMachine)
         self.results.updateRowInfo(workOrder)
+        self.updateResults(machine)
+
+    @staticmethod
+    def restorePieces(workOrder, pieces):
+        """
+        Sets workOrder's number of pieces back to pieces, lowering its yield if it doesn't fit anymore.
+        """
+        workOrder.pieces = pieces
+        if workOrder.yld is not None:
+            workOrder.setYield(min(workOrder.yld, pieces))
+
+    def showRunSequence(self, machineNum):
+        """
+        Shows the run order of machine machineNum that changes planets and sides the least, and the machine time it
+        saves compared to running the work orders in order.
+        """
+        report = sequenceMachine(self.machines[machineNum-1])
+        lines = [str(i) + ". " + run.name() + " (" + ", ".join(wo.name for wo in run.workOrders) + ")"
+                 for i, run in enumerate(report.runs, 1)]
+        message = "Planned run order:\n" + "\n".join(lines) + "\n\n" + \
+                  "Projected machine time: {:.2f} h\nIn work order order: {:.2f} h\nSaved: {:.2f} h".format(
+                      report.hours, report.naiveHours, report.savedHours())
+        if not report.naiveHours:
+            message += "\n\nSet the load and unload times, and the loading, setup and coating runs, to compare times."
+        title = "Run Order of Machine " + str(machineNum)
+        message = QMessageBox(QMessageBox.Information, title, message, buttons=QMessageBox.Ok, flags=Qt.Dialog)
+        message.exec_()
 
     def addToPlanets(self, workOrder: WorkOrder):
         """
-        Adds a new work order to its planet
+        Adds a new work order to its planet. If it doesn't fit, the user may have it placed on another planet
+        instead (see noSpaceLeftFor), which changes its machine and planet numbers.
         """
-        pie = "self.ui.pie" + str(workOrder.planetNum) + "series"
-        if workOrder.machineNum in (2, 3):
-            pie += "_" + str(workOrder.machineNum)
-        exec('success = ' + pie + '.addSlice(workOrder)', locals())
-        return locals()['success']
+        if self.registry.planet(workOrder.machineNum, workOrder.planetNum).addSlice(workOrder, offerElsewhere=True):
+            return True
+        return workOrder in self.registry.planet(workOrder.machineNum, workOrder.planetNum).orders
 
     def showPlanetConfigDialog(self):
         """
@@ -808,77 +1070,34 @@ class MainWindow(QMainWindow):
             result = message.exec_()
 
         if alreadyWarned or result == QMessageBox.Ok:
-            for num, machine in enumerate(self.machines):
-                for workOrder in machine.workOrders:
-                    self.deleteWorkOrder(workOrder)
-                if num is 0:  # TODO: Remove when other tabs are implemented
-                    for planetNum in range(1, 6):
-                        planet = 'self.ui.pie' + str(planetNum) + 'series'
-                        if num in (1, 2):
-                            planet += '_' + str(num+1)
-                        exec(planet + '.setDisabled()')
-                machine.workOrders.clear()
+            self.journal.suspended = True
+            for machineNum in self.topology.machineNums():
+                self.clearMachine(machineNum)
+            self.woIDs.clear()
+            self.journal.suspended = False
+            self.journal.start(self.buildProject())
 
     def toggleTheme(self):
         """
         Changes between light and dark theme. 0 is light, 1 is dark
         """
-        qApp = QApplication.instance()
-        if self.theme is 0:
-            qApp.setStyle("Fusion")
-
-            dark_palette = QPalette()
-            dark_palette.setColor(QPalette.Window, QColor(53, 53, 53))
-            dark_palette.setColor(QPalette.WindowText, Qt.white)
-            dark_palette.setColor(QPalette.Base, QColor(25, 25, 25))
-            dark_palette.setColor(QPalette.AlternateBase, QColor(53, 53, 53))
-            dark_palette.setColor(QPalette.ToolTipBase, Qt.white)
-            dark_palette.setColor(QPalette.ToolTipText, Qt.white)
-            dark_palette.setColor(QPalette.Text, Qt.white)
-            dark_palette.setColor(QPalette.Button, QColor(53, 53, 53))
-            dark_palette.setColor(QPalette.ButtonText, Qt.white)
-            dark_palette.setColor(QPalette.BrightText, Qt.red)
-            dark_palette.setColor(QPalette.Link, QColor(42, 130, 218))
-            dark_palette.setColor(QPalette.Highlight, QColor(42, 130, 218))
-            dark_palette.setColor(QPalette.HighlightedText, Qt.black)
-            dark_palette.setColor(QPalette.Disabled, QPalette.Text, QColor(190, 190, 190))
-            dark_palette.setColor(QPalette.Disabled, QPalette.ButtonText, Qt.darkGray)
-            qApp.setPalette(dark_palette)
-            qApp.setStyleSheet("QToolTip { color: #ffffff; background-color: #2a82da; border: 1px solid white; }")
-            self.theme = 1
-            self.ui.themeButton.setText("Dark Mode")
-            self.themeChanged.emit(self.theme)
-        else:
-            qApp.setStyle("Fusion")
+        self.theme = 1 if self.theme == 0 else 0
+        QApplication.instance().setPalette(themes.getPalette(self.theme))
+        self.ui.themeButton.setText("Dark Mode" if self.theme == 1 else "Light Mode")
+        self.themeChanged.emit(self.theme)
 
-            palette = QPalette()
-            palette.setColor(QPalette.Window, QColor(180, 180, 180))
-            palette.setColor(QPalette.WindowText, Qt.black)
-            palette.setColor(QPalette.Base, QColor(140, 140, 140))
-            palette.setColor(QPalette.AlternateBase, QColor(180, 180, 180))
-            palette.setColor(QPalette.ToolTipBase, Qt.black)
-            palette.setColor(QPalette.ToolTipText, Qt.black)
-            palette.setColor(QPalette.Text, Qt.black)
-            palette.setColor(QPalette.Button, QColor(180, 180, 180))
-            palette.setColor(QPalette.ButtonText, Qt.black)
-            palette.setColor(QPalette.BrightText, Qt.red)
-            palette.setColor(QPalette.Link, QColor(42, 130, 218))
-            palette.setColor(QPalette.Highlight, QColor(42, 130, 218))
-            palette.setColor(QPalette.HighlightedText, Qt.white)
-            palette.setColor(QPalette.Disabled, QPalette.Text, QColor(60, 60, 60))
-            palette.setColor(QPalette.Disabled, QPalette.ButtonText, Qt.darkGray)
-            qApp.setPalette(palette)
-            qApp.setStyleSheet("QToolTip { color: #ffffff; background-color: #2a82da; border: 1px solid white; }")
-            self.theme = 0
-            self.ui.themeButton.setText("Light Mode")
-            self.themeChanged.emit(self.theme)
+    @Slot(int)
+    def changePlanetThemes(self, theme):
+        """
+        Applies theme to every planet whose chart was created, in one pass.
+        """
+        for widgets in self.registry.allPlanets():
+            widgets.planet.changeTheme(theme)
 
     def loadRandomWorkOrders(self):
         """
         Iteratively creates random work orders. Loads data into
         planets 1-4 and the table at the bottom, ***only in Tab 1***.
-
-        Not static: needs the self variable, but it is hidden as a string.
         """
         title = "Warning"
         message = "Running the demo will clear all current work orders. Continue?"
@@ -888,31 +1107,57 @@ class MainWindow(QMainWindow):
 
         if result == QMessageBox.Ok:
             self.reInit(True)
-            c = 1
-            for i in range(1, 5):  # The first 4 planets
-                # Get current pie's name, initialize that pieSeries
-                curPie = "self.ui.pie" + str(i) + "series"
-                exec(curPie + ".setEnabled(100)")
-
-                # Randomly generate some WorkOrders for this pie, add them
-                # as slices to pie, and add data to results.
-                for j in range(1, 5):
-                    # Random num of pcs and side choice
-                    numPcs = randrange(1, 26)
-                    side = randrange(1, 3)
-
-                    # Set name, create WorkOrder
-                    name = "WO #" + str(c)
-                    c += 1
-
-                    tmpWO = WorkOrder()
-                    tmpWO.name = name
-                    tmpWO.pieces = numPcs
-                    tmpWO.side = side
-                    tmpWO.planetNum = i
-                    tmpWO.machineNum = 1
-
-                    # Create slice for WorkOrder, add it to mapping, add it to results
-                    exec(curPie + ".addSlice(tmpWO)")
-                    self.results.addRowFor(tmpWO)
-                    self.machines[0].workOrders.append(tmpWO)
+            self.addRandomWorkOrders(16)
+
+    def addRandomWorkOrders(self, count, numPlanets=4):
+        """
+        Creates count random work orders spread over planets 1 to numPlanets of Tab 1, and adds them to the planets
+        and the table at the bottom. Planets are enabled with just enough room for their work orders (100 pieces
+        for the demo). Doesn't ask anything, so it is also used to generate projects for the benchmarks.
+        If Tab 1 has fewer planets than numPlanets, all of them are used.
+        """
+        numPlanets = min(numPlanets, self.topology.planetCount(1))
+        self.journal.suspended = True
+        c = self.woIDs.reserveRange(count)
+        newWOs = []
+        for i in range(1, numPlanets + 1):
+            # Get current pie, initialize that pieSeries
+            perPlanet = count // numPlanets + (1 if i <= count % numPlanets else 0)
+            curPie = self.registry.planet(1, i)
+            curPie.setEnabled(max(100, 25 * perPlanet))
+
+            # Randomly generate some WorkOrders for this pie, add them
+            # as slices to pie, and add data to results.
+            planetWOs = []
+            for j in range(perPlanet):
+                # Random num of pcs and side choice
+                numPcs = randrange(1, 26)
+                side = randrange(1, 3)
+
+                # Set name, create WorkOrder
+                name = "WO #" + str(c)
+                c += 1
+
+                tmpWO = WorkOrder()
+                tmpWO.name = name
+                tmpWO.pieces = numPcs
+                tmpWO.side = side
+                tmpWO.planetNum = i
+                tmpWO.machineNum = 1
+
+                # Add WorkOrder to its machine
+                self.machines[0].addWorkOrder(tmpWO)
+                planetWOs.append(tmpWO)
+
+            # Create slices for this pie's WorkOrders at once
+            curPie.addSlices(planetWOs)
+            newWOs.extend(planetWOs)
+
+        # Add all the results at once
+        self.results.addRowsFor(newWOs)
+        self.journal.suspended = False
+        self.journal.start(self.buildProject())
+
+
+instrument(MainWindow, 'ensureSingleWorkOrder_p', 'ensureSingleWorkOrder_r', 'addToPlanets', 'validateData',
+           'startTimeCheck', 'endTimeCheck', 'loadTimeCheck', 'unloadTimeCheck')
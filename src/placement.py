@@ -0,0 +1,96 @@
+"""
+Automatic placement of work orders onto planets.
+
+Work orders are packed with a best-fit decreasing heuristic: largest first, each into the planet it fits most
+tightly, which wastes less capacity than placing them by hand, and is O(n log n + n * planets). Orders of the same
+side are kept together: a planet already holding only that side is preferred, then an empty one, and a planet
+holding the other side only if nothing else fits.
+"""
+
+
+class Bin:
+
+    def __init__(self, machineNum, planetNum, spacesLeft, sides=()):
+        """
+        Room left on one enabled planet, and the sides of the work orders staying on it.
+        """
+        self.machineNum = machineNum
+        self.planetNum = planetNum
+        self.spacesLeft = spacesLeft
+        self.capacity = None  # Total pieces of the planet, only used for display
+        self.sides = set(sides)
+        self.workOrders = []  # Work orders placed in this bin
+
+    def name(self):
+        return "Machine " + str(self.machineNum) + ", Planet " + str(self.planetNum)
+
+    def rank(self, side):
+        """
+        Returns how well a work order of side goes with the orders in this bin, lower is better.
+        """
+        if not self.sides:
+            return 1
+        if self.sides == {side}:
+            return 0
+        return 2
+
+
+class Placement:
+
+    def __init__(self, bins):
+        """
+        Result of placeWorkOrders: the bin of every placed work order, and the work orders that fit nowhere.
+        """
+        self.bins = bins
+        self.assignments = {}  # work order -> Bin
+        self.unplaced = []
+
+    def moves(self):
+        """
+        Returns (work order, Bin) for every placed work order whose machine or planet changes.
+        """
+        return [(workOrder, target) for workOrder, target in self.assignments.items()
+                if (workOrder.machineNum, workOrder.planetNum) != (target.machineNum, target.planetNum)]
+
+
+def placeWorkOrders(workOrders, bins):
+    """
+    Assigns workOrders to bins (a list of Bin) without going over any bin's spacesLeft, which is updated.
+    Ties are broken by the order of bins, so the bins to prefer should come first. Returns a Placement.
+    """
+    placement = Placement(bins)
+
+    groups = {}
+    for workOrder in workOrders:
+        groups.setdefault(workOrder.side, []).append(workOrder)
+
+    # Sides with the most pieces are the hardest to keep together, so they choose their planets first
+    groups = sorted(groups.items(), key=lambda item: -sum(workOrder.pieces for workOrder in item[1]))
+    for side, group in groups:
+        group.sort(key=lambda workOrder: workOrder.pieces, reverse=True)
+        for workOrder in group:
+            target = bestBin(bins, workOrder.pieces, side)
+            if target is None:
+                placement.unplaced.append(workOrder)
+                continue
+            target.spacesLeft -= workOrder.pieces
+            target.sides.add(side)
+            target.workOrders.append(workOrder)
+            placement.assignments[workOrder] = target
+    return placement
+
+
+def bestBin(bins, pieces, side):
+    """
+    Returns the bin pieces of side fit best in, or None if they fit in none.
+    """
+    best = None
+    bestKey = None
+    for target in bins:
+        if target.spacesLeft < pieces:
+            continue
+        key = (target.rank(side), target.spacesLeft - pieces)
+        if bestKey is None or key < bestKey:
+            best = target
+            bestKey = key
+    return best
@@ -0,0 +1,68 @@
+from PySide2.QtWidgets import QDialog, QDialogButtonBox, QLabel, QTreeWidget, QTreeWidgetItem, QVBoxLayout
+
+
+class PlacementDialog(QDialog):
+
+    def __init__(self, placement, parent=None):
+        """
+        Shows the layout proposed by a Placement, planet by planet, before anything is changed.
+        The proposal is applied by the caller if the dialog is accepted.
+        """
+        QDialog.__init__(self, parent)
+        self.setModal(True)
+        self.setWindowTitle("Auto-Place Work Orders")
+        self.resize(520, 420)
+
+        self.placement = placement
+        moves = placement.moves()
+
+        summary = QLabel(self)
+        text = str(len(placement.assignments)) + " work order(s) placed, " + str(len(moves)) + " of them moved."
+        if placement.unplaced:
+            text += "\n" + str(len(placement.unplaced)) + " work order(s) don't fit on any enabled planet."
+        summary.setText(text)
+
+        tree = QTreeWidget(self)
+        tree.setHeaderLabels(["Planet / Work Order", "Pieces", "Side", "From"])
+        tree.setColumnWidth(0, 220)
+        self.fillTree(tree)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel, parent=self)
+        buttons.button(QDialogButtonBox.Ok).setText("Apply")
+        buttons.button(QDialogButtonBox.Ok).setEnabled(bool(moves))
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(summary)
+        layout.addWidget(tree)
+        layout.addWidget(buttons)
+
+    def fillTree(self, tree):
+        """
+        Adds one item per planet receiving work orders, with its fill, and the work orders under it.
+        """
+        for target in self.placement.bins:
+            if not target.workOrders:
+                continue
+            header = target.name()
+            if target.capacity:
+                header += ":  " + str(target.capacity - target.spacesLeft) + " of " + str(target.capacity) + " pieces"
+            sides = ", ".join(str(side) for side in sorted(target.sides))
+            planetItem = QTreeWidgetItem(tree, [header, "", sides, ""])
+            for workOrder in target.workOrders:
+                self.addWorkOrderItem(planetItem, workOrder)
+            planetItem.setExpanded(True)
+
+        if self.placement.unplaced:
+            planetItem = QTreeWidgetItem(tree, ["Doesn't fit", "", "", ""])
+            for workOrder in self.placement.unplaced:
+                self.addWorkOrderItem(planetItem, workOrder)
+            planetItem.setExpanded(True)
+
+    @staticmethod
+    def addWorkOrderItem(parent, workOrder):
+        origin = ""
+        if workOrder.machineNum:
+            origin = "Machine " + str(workOrder.machineNum) + ", Planet " + str(workOrder.planetNum)
+        QTreeWidgetItem(parent, [workOrder.name, str(workOrder.pieces), str(workOrder.side), origin])
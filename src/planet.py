@@ -1,14 +1,60 @@
-import sys
 from PySide2.QtCore import Qt, Slot, Signal
-from PySide2.QtGui import QPainter, QPen, QColor
-from PySide2.QtWidgets import QMainWindow, QApplication, QMessageBox
+from PySide2.QtGui import QPen, QColor
+from PySide2.QtWidgets import QMessageBox
 from PySide2.QtCharts import QtCharts
 import src.workorder as wo
+from src.instrumentation import instrument
+
+
+class SliceStyle:
+
+    def __init__(self, theme):
+        """
+        Pens and colors used by the slices of every planet, for one theme. 0 is light, 1 is dark
+        """
+        self.normalPen = QPen(QColor(90, 90, 90), 2)
+        self.selectedPen = QPen(Qt.darkGreen, 2)
+        self.selectedColor = QColor(Qt.green)
+        if theme == 0:
+            self.emptyColor = QColor(120, 120, 120)
+            self.disabledColor = QColor(120, 120, 120)
+        else:
+            self.emptyColor = QColor(50, 50, 50)
+            self.disabledColor = QColor(45, 45, 45)
+
+        # Hover variant of every slice color seen so far: rgba -> color
+        self.hoveredColors = {}
+
+    def hoveredColor(self, color):
+        """
+        Returns the lighter color used when a slice of the given color is hovered.
+        """
+        rgba = color.rgba()
+        hovered = self.hoveredColors.get(rgba)
+        if hovered is None:
+            hovered = self.hoveredColors[rgba] = color.lighter(f=120)
+        return hovered
+
+
+SLICE_STYLES = {}
+
+
+def getSliceStyle(theme):
+    """
+    Returns the shared SliceStyle of theme, creating it the first time.
+    """
+    if theme not in SLICE_STYLES:
+        SLICE_STYLES[theme] = SliceStyle(theme)
+    return SLICE_STYLES[theme]
 
 
 class Planet(QtCharts.QPieSeries):
 
+    # Work orders narrower than this angle (in degrees) are drawn as one "N small orders" slice. 0 disables it.
+    LOD_ANGLE = 5.0
+
     planetEnabled = Signal(bool)
+    planetResized = Signal()  # Emitted when the user grows the planet to fit a work order
     notEnoughSpaceForWO = Signal(wo.WorkOrder)
 
     def __init__(self, parent: QtCharts.QChart, window, infoSection, planetBox):
@@ -25,29 +71,55 @@ class Planet(QtCharts.QPieSeries):
         self.enabled = True
         self.emptySlice: QtCharts.QPieSlice = None
 
+        # Work orders on the planet, in order, and the slice standing for the small ones (None if there isn't one)
+        self.orders = []
+        # Pieces each work order takes on the planet: id(work order) -> pieces. Kept apart from the work orders, which
+        # are edited in place before their planet is told about it.
+        self.orderPieces = {}
+        self.smallSlice: QtCharts.QPieSlice = None
+        self.lodAngle = self.LOD_ANGLE
+        self.detailed = False
+
+        # Slices currently selected, so deselecting never has to look at the others
+        self.selectedSlices = set()
+
+        # Number of the machine this planet belongs to. Set by MainWindow.
+        self.machineNum = None
+
+        # Slice signals are connected once for the whole series, rather than for each slice
+        self.hovered.connect(self.hoverSlice)
+        self.clicked.connect(self.sliceClicked)
+
         # Initialize to "disabled" appearance
         self.setDisabled()
 
+    def sliceStyle(self):
+        """
+        Returns the shared pens and colors of the current theme.
+        """
+        return getSliceStyle(self.window.theme)
+
     def setDisabled(self):
         """
         Gives the disabled look of the item, and disables interactivity via its parent.
         """
         if self.enabled:
             self.clear()
+            style = self.sliceStyle()
             self.append('Empty', 1)
             self.append('Empty', 3)
-            if self.window.theme is 0:
-                self.slices()[0].setBrush(QColor(120, 120, 120))
-                self.slices()[1].setBrush(QColor(120, 120, 120))
-            else:
-                self.slices()[0].setBrush(QColor(45, 45, 45))
-                self.slices()[1].setBrush(QColor(45, 45, 45))
-            self.slices()[0].setPen(QPen(QColor(90, 90, 90), 2))
+            for slc in self.slices():
+                slc.setBrush(style.disabledColor)
+                slc.setPen(style.normalPen)
             self.slices()[0].setExploded()
-            self.slices()[1].setPen(QPen(QColor(90, 90, 90), 2))
             self.infoSection.hide()
             self.planetBox.setTitle(self.planetName)
             self.emptySlice = None
+            self.orders = []
+            self.orderPieces = {}
+            self.selectedSlices = set()
+            self.smallSlice = None
+            self.detailed = False
             self.enabled = False
             self.planetEnabled.emit(False)
 
@@ -58,16 +130,7 @@ class Planet(QtCharts.QPieSeries):
         if not self.enabled:
             # Initialize empty slice with number of slices in planet, set necessary attributes
             self.clear()
-            self.emptySlice = self.append('Empty', pieces)
-            if self.window.theme == 0:
-                self.emptySlice.setBrush(QColor(120, 120, 120))
-            else:
-                self.emptySlice.setBrush(QColor(50, 50, 50))
-            self.emptySlice.setPen(QPen(QColor(90, 90, 90), 2))
-            self.emptySlice.selected = False
-
-            # Connect to slot
-            self.emptySlice.clicked.connect(lambda: self.emptySliceClicked())
+            self.appendEmptySlice(pieces)
 
             # Initialize needed variables and show text area for planet box
             self.spacesLeft = pieces
@@ -81,81 +144,223 @@ class Planet(QtCharts.QPieSeries):
             # Notify app that planet was updated
             self.planetEnabled.emit(True)
 
-    def addSlice(self, workOrder):
+    def addSlice(self, workOrder, offerElsewhere=False):
+        """
+        Adds a slice, deducting the value from spacesLeft.
+        """
+        return bool(self.addSlices([workOrder], offerElsewhere))
+
+    def addSlices(self, workOrders, offerElsewhere=False):
         """
-        Adds a slice, deducting the value from spacesLeft. Connects signals as needed
+        Adds a slice for each work order in one series update, deducting their values from spacesLeft.
+        Returns the work orders that were added (the user may refuse to grow a full planet). If offerElsewhere, the
+        user may also have a work order placed on another planet instead (see updateSpaces).
         """
-        # Get values from workOrder
-        value = workOrder.pieces
-        label = workOrder.name
+        oldCount = len(self.orders)
+        oldCapacity = self.capacity()
+        added = []
+        for workOrder in workOrders:
+            # If there isn't enough space left, check with user if they still want to add it
+            if self.enabled and workOrder.pieces > self.spacesLeft:
+                confirmed = self.updateSpaces(workOrder, offerElsewhere)
+            else:
+                confirmed = True
 
-        # If no space left, check with user if they still want to add it
-        if self.spacesLeft is 0:
-            confirmed = self.updateSpaces(workOrder)
+            if confirmed:
+                if not self.enabled:
+                    self.setEnabled(workOrder.pieces)
+                self.spacesLeft -= workOrder.pieces
+                self.orderPieces[id(workOrder)] = workOrder.pieces
+                added.append(workOrder)
+
+        if not added:
+            return added
+
+        self.orders.extend(added)
+        capacity = self.capacity()
+        small = [workOrder for workOrder in added if self.isSmall(workOrder.pieces, capacity)]
+        if oldCount and capacity != oldCapacity:
+            # The planet grew, so work orders already on it may have crossed the LOD threshold
+            self.rebuildSlices()
+        elif self.smallSlice:
+            smallIDs = {id(workOrder) for workOrder in small}
+            self.addToSmallSlice(small)
+            self.appendSlices([workOrder for workOrder in added if id(workOrder) not in smallIDs])
+        elif small and sum(self.isSmall(workOrder.pieces, capacity) for workOrder in self.orders) >= 2:
+            self.rebuildSlices()  # Enough small orders to merge
         else:
-            confirmed = True
+            self.appendSlices(added)
 
-        if confirmed:
-            if not self.enabled:
-                self.setEnabled(workOrder.pieces)
+        if self.emptySlice:
+            self.emptySlice.setValue(self.spacesLeft)
 
-            # Initialize new slice, associate it to the workOrder, and remove value from space left
-            newSlice = self.append(label, value)
-            self.spacesLeft -= value
-            if self.emptySlice:
-                self.emptySlice.setValue(self.spacesLeft)
+        self.storeColors()
+        self.showPlanetStatus()
+        self.updateHeader()
+        return added
 
-            # Add new properties to the slice
+    def addToSmallSlice(self, workOrders):
+        """
+        Merges workOrders into the existing smallSlice, without touching the other slices.
+        """
+        if not workOrders:
+            return
+        mySlice = self.smallSlice
+        mySlice.orders.extend(workOrders)
+        for workOrder in workOrders:
+            workOrder.slice = mySlice
+        mySlice.setValue(mySlice.value() + sum(workOrder.pieces for workOrder in workOrders))
+        mySlice.setLabel(str(len(mySlice.orders)) + ' small orders')
+        if mySlice.selected:
+            self.deselectSlice(mySlice)
+            self.selectSlice(mySlice)
+
+    def appendEmptySlice(self, pieces):
+        """
+        Creates the slice standing for the pieces still available on the planet.
+        """
+        style = self.sliceStyle()
+        self.emptySlice = self.append('Empty', pieces)
+        self.emptySlice.setBrush(style.emptyColor)
+        self.emptySlice.setPen(style.normalPen)
+        self.emptySlice.selected = False
+
+    def appendSlices(self, workOrders):
+        """
+        Initializes one slice per work order, associates them to their work order, and appends them all at once.
+        """
+        style = self.sliceStyle()
+        newSlices = []
+        for workOrder in workOrders:
+            newSlice = QtCharts.QPieSlice(workOrder.name, workOrder.pieces)
             newSlice.selected = False
             newSlice.order = workOrder
             workOrder.slice = newSlice
-            newSlice.selectedColor = Qt.green
-            newSlice.selectedPen = QPen(Qt.darkGreen, 2)
-            newSlice.normalPen = QPen(QColor(90, 90, 90), 2)
             newSlice.setExplodeDistanceFactor(.06)
+            newSlice.setPen(style.normalPen)  # Set pen (so it's not white)
+            newSlices.append(newSlice)
+        self.append(newSlices)
 
-            # Update all slice colors (they all start with the same color otherwise)
-            for slc in self.slices():
-                slc.hoveredColor = slc.brush().color().lighter(f=120)
+    def storeColors(self):
+        """
+        Stores all slice colors, once per batch (the chart recolors every slice when slices are added).
+        Selected slices keep the color stored before they were selected, rather than the selected color.
+        """
+        for slc in self.slices():
+            if not getattr(slc, 'selected', False):
                 slc.normalColor = slc.brush().color()
 
-            # Set pen (so it's not white)
-            newSlice.setPen(newSlice.normalPen)
+    def capacity(self):
+        """
+        Returns the number of pieces the planet holds when full.
+        """
+        return sum(self.orderPieces.values()) + max(self.spacesLeft, 0)
+
+    def piecesOf(self, workOrder):
+        """
+        Returns the number of pieces workOrder takes on the planet, which is its number of pieces before any edit
+        the planet wasn't told about yet.
+        """
+        return self.orderPieces[id(workOrder)]
 
-            # Connect slice signals to slots
-            newSlice.hovered.connect(lambda: self.hoverSlice(newSlice))
-            newSlice.clicked.connect(lambda: self.window.ensureSingleWorkOrder_p(newSlice))
+    def isSmall(self, pieces, capacity):
+        """
+        Returns True if a work order of this many pieces is narrower than lodAngle, outside of detail mode.
+        """
+        return not self.detailed and pieces * 360 < self.lodAngle * capacity
 
+    def rebuildSlices(self):
+        """
+        Recreates the work order slices. Small work orders are merged into smallSlice, if there are at least two.
+        All slices are cleared at once, then the empty slice is created again. Selected slices stay selected, and
+        slice colors are stored before they are selected again.
+        """
+        selectedOrders = [workOrder for workOrder in self.orders if workOrder.slice in self.selectedSlices]
+        emptyValue = self.emptySlice.value() if self.emptySlice else None
+        emptySelected = self.emptySlice in self.selectedSlices
+        self.clear()
+        self.selectedSlices = set()
+        self.emptySlice = None
+        self.smallSlice = None
+        if emptyValue is not None:
+            self.appendEmptySlice(emptyValue)
+
+        capacity = self.capacity()
+        small = [workOrder for workOrder in self.orders if self.isSmall(workOrder.pieces, capacity)]
+        if len(small) < 2:
+            small = []
+        smallIDs = {id(workOrder) for workOrder in small}
+        self.appendSlices([workOrder for workOrder in self.orders if id(workOrder) not in smallIDs])
+
+        if small:
+            self.smallSlice = QtCharts.QPieSlice(str(len(small)) + ' small orders',
+                                                 sum(workOrder.pieces for workOrder in small))
+            self.smallSlice.selected = False
+            self.smallSlice.orders = small
+            for workOrder in small:
+                workOrder.slice = self.smallSlice
+            self.smallSlice.setExplodeDistanceFactor(.06)
+            self.smallSlice.setPen(self.sliceStyle().normalPen)
+            self.append(self.smallSlice)
+
+        self.storeColors()
+        if emptySelected:
+            self.selectSlice(self.emptySlice)
+        for workOrder in selectedOrders:
+            self.selectSlice(workOrder.slice)
+
+    def setLodAngle(self, angle):
+        """
+        Sets the angle (in degrees) below which work orders are merged into one slice. 0 shows every work order.
+        """
+        self.lodAngle = angle
+        if self.enabled:
+            self.rebuildSlices()
+
+    def showDetail(self, detailed):
+        """
+        Switches between showing every work order (after a click on the small orders slice), and merging the small
+        ones again (after a click on the empty slice).
+        """
+        if self.detailed != detailed:
+            self.detailed = detailed
+            self.rebuildSlices()
             self.showPlanetStatus()
-            self.updateHeader()
-            return True
-        else:
-            return False
 
-    def updateSpaces(self, workOrder):
+    def updateSpaces(self, workOrder, offerElsewhere=False, pieces=None):
         """
-        Increases spacesLeft by workOrder and does necessary adjustments
+        Increases spacesLeft so that workOrder fits, and does necessary adjustments. pieces is the number of pieces
+        that must fit, by default all of workOrder's (only the added ones when it is edited).
+        If offerElsewhere, the user may instead have the work order placed on another planet, see notEnoughSpaceForWO.
+        Only new work orders added by the user are offered that: whoever adds the others keeps track of them.
         """
+        missing = (workOrder.pieces if pieces is None else pieces) - max(self.spacesLeft, 0)
         confirmed = False
         if self.enabled:
-            if self.emptySlice:
-                self.remove(self.emptySlice)
-                self.emptySlice = None
-
             title = "Warning"
-            message = "Adding work order will increase the planet size from " + str(int(self.sum())) + \
-                      " to " + str(int(self.sum() + workOrder.pieces)) + " pieces total. Continue?"
+            message = ("Adding" if pieces is None else "Editing") + " work order will increase the planet size " + \
+                      "from " + str(int(self.capacity())) + " to " + str(int(self.capacity() + missing)) + \
+                      " pieces total. Continue?"
             buttons = QMessageBox.Ok | QMessageBox.Cancel
             message = QMessageBox(QMessageBox.Warning, title, message, buttons=buttons, flags=Qt.Dialog)
+            placeButton = message.addButton("Place Elsewhere", QMessageBox.ActionRole) if offerElsewhere else None
             result = message.exec_()
-            if result == QMessageBox.Ok:
+            if placeButton is not None and message.clickedButton() is placeButton:
+                self.notEnoughSpaceForWO.emit(workOrder)
+            elif result == QMessageBox.Ok:
                 confirmed = True
         else:
             confirmed = True
 
         if confirmed:
-            self.spacesLeft += workOrder.pieces
+            if self.emptySlice:  # The planet will be full
+                self.deselectSlice(self.emptySlice)
+                self.remove(self.emptySlice)
+                self.emptySlice = None
+            self.spacesLeft = max(self.spacesLeft, 0) + missing
             self.updateHeader()
+            if self.enabled:
+                self.planetResized.emit()
             return True
         else:
             return False
@@ -166,58 +371,93 @@ class Planet(QtCharts.QPieSeries):
         """
         self.planetBox.setTitle(self.planetName + ":     " + str(int(self.sum())) + " pieces total")
 
-    @Slot(bool)
-    def hoverSlice(self, mySlice):
+    @Slot(QtCharts.QPieSlice)
+    def sliceClicked(self, mySlice):
+        """
+        Forwards clicks on work order slices to the window, and clicks on the empty slice to emptySliceClicked.
+        """
+        if mySlice is self.emptySlice:
+            self.emptySliceClicked()
+            self.showDetail(False)
+        elif mySlice is self.smallSlice:
+            self.showDetail(True)
+        elif hasattr(mySlice, 'order'):
+            self.window.ensureSingleWorkOrder_p(mySlice)
+
+    def hoverSlice(self, mySlice, state):
         """
         Gives slight explosion and color change of slice on hover.
         """
-        if self.enabled:
+        if self.enabled and (hasattr(mySlice, 'order') or mySlice is self.smallSlice):
             if not mySlice.selected:
-                if not mySlice.isExploded():
-                    mySlice.setBrush(mySlice.hoveredColor)
+                if state:
+                    mySlice.setBrush(self.sliceStyle().hoveredColor(mySlice.normalColor))
                     mySlice.setExploded()
                 else:
                     mySlice.setExploded(False)
                     mySlice.setBrush(mySlice.normalColor)
 
-    def clickSlice(self, mySlice):
-        if self.enabled:
-            if not mySlice.selected:
-                self.deselectAll()
-                mySlice.selected = True
-
-                mySlice.setExplodeDistanceFactor(.12)
-                mySlice.setExploded()
-                mySlice.setPen(mySlice.selectedPen)
-                mySlice.setBrush(mySlice.selectedColor)
-
-                val = int(mySlice.value())
-                order = mySlice.order
-                if val > 1:
-                    self.infoSection.setText(mySlice.label() + ":  " + str(val) + " pieces on side " + str(order.side))
-                else:
-                    self.infoSection.setText(mySlice.label() + ":  1 piece on side " + str(order.side))
-            else:
-                mySlice.selected = False
-                mySlice.setExplodeDistanceFactor(.06)
-                mySlice.setPen(mySlice.normalPen)
-                mySlice.setBrush(mySlice.normalColor)
-                self.showPlanetStatus()
+    def selectSlice(self, mySlice):
+        """
+        Gives mySlice the selected look, and shows its info. Other selected slices are left as they are.
+        """
+        if not self.enabled or mySlice is None or mySlice.selected:
+            return
+        mySlice.selected = True
+        self.selectedSlices.add(mySlice)
+
+        if mySlice is self.emptySlice:
+            self.showPlanetStatus()
+            return
+
+        style = self.sliceStyle()
+        mySlice.setExplodeDistanceFactor(.12)
+        mySlice.setExploded()
+        mySlice.setPen(style.selectedPen)
+        mySlice.setBrush(style.selectedColor)
+
+        val = int(mySlice.value())
+        if mySlice is self.smallSlice:
+            self.infoSection.setText(mySlice.label() + ":  " + str(val) + " pieces\nClick to show them all")
+            return
+        order = mySlice.order
+        if val > 1:
+            self.infoSection.setText(mySlice.label() + ":  " + str(val) + " pieces on side " + str(order.side))
+        else:
+            self.infoSection.setText(mySlice.label() + ":  1 piece on side " + str(order.side))
+
+    def deselectSlice(self, mySlice):
+        """
+        Gives mySlice its normal look back. Shows the planet status once nothing is selected anymore.
+        """
+        if mySlice is None or not mySlice.selected:
+            return
+        mySlice.selected = False
+        self.selectedSlices.discard(mySlice)
+
+        style = self.sliceStyle()
+        if mySlice is self.emptySlice:
+            mySlice.setBrush(style.emptyColor)
+        else:
+            mySlice.setExplodeDistanceFactor(.06)
+            mySlice.setExploded(False)
+            mySlice.setPen(style.normalPen)
+            mySlice.setBrush(mySlice.normalColor)
+
+        if self.enabled and not self.selectedSlices:
+            self.showPlanetStatus()
 
     @Slot()
     def emptySliceClicked(self):
         """
         Only gets called if the empty slice is selected. Uses different graphics, hence the independent function.
+        Selecting it deselects everything else in the machine, through the window.
         """
         if self.enabled:
-            mySlice = self.emptySlice
-            if not mySlice.selected:
-                self.deselectAll()
-                mySlice.selected = True
-
-                self.showPlanetStatus()
+            if not self.emptySlice.selected:
+                self.window.selectEmptySlice(self)
             else:
-                mySlice.selected = False
+                self.deselectSlice(self.emptySlice)
 
     def deselectAll(self):
         """
@@ -225,17 +465,8 @@ class Planet(QtCharts.QPieSeries):
         """
         if self.enabled:
             self.showPlanetStatus()
-            for sl in self.slices():
-                if sl.selected:
-                    sl.selected = False
-
-                    if sl.label() == "Empty":
-                        sl.setBrush(QColor(120, 120, 120))
-                    else:
-                        sl.setExplodeDistanceFactor(.06)
-                        sl.setExploded(False)
-                        sl.setPen(sl.normalPen)
-                        sl.setBrush(sl.normalColor)
+            for sl in list(self.selectedSlices):
+                self.deselectSlice(sl)
 
     def showPlanetStatus(self):
         """
@@ -253,31 +484,100 @@ class Planet(QtCharts.QPieSeries):
         else:
             self.infoSection.setText("No space left on planet")
 
-    def deleteSlice(self, mySlice):
+    def deleteOrder(self, workOrder):
         """
-        Deletes slice from chart, and adds its value back to the empty space
+        Deletes workOrder's slice from chart (or takes it out of the small orders slice), and adds its value back to
+        the empty space
         """
-        if self.emptySlice:
-            try:
-                self.spacesLeft += mySlice.value()
+        if workOrder in self.orders:
+            self.orders.remove(workOrder)
+            mySlice = workOrder.slice
+            workOrder.slice = None
+            pieces = self.orderPieces.pop(id(workOrder))
+            self.spacesLeft += pieces
+
+            if mySlice is self.smallSlice:
+                if len(mySlice.orders) > 1 and mySlice.selected:
+                    self.deselectSlice(mySlice)
+                mySlice.orders.remove(workOrder)
+                if len(mySlice.orders) < 2:
+                    self.rebuildSlices()
+                else:
+                    mySlice.setValue(mySlice.value() - pieces)
+                    mySlice.setLabel(str(len(mySlice.orders)) + ' small orders')
+            else:
+                self.selectedSlices.discard(mySlice)
                 self.remove(mySlice)
+            if self.emptySlice:
                 self.emptySlice.setValue(self.spacesLeft)
-            except:
-                pass
+
+    def deleteOrders(self, workOrders):
+        """
+        Deletes the slices of all the given work orders at once, and adds their values back to the empty space.
+        """
+        removedIDs = {id(workOrder) for workOrder in workOrders}
+        if len(removedIDs) == 1:
+            for workOrder in workOrders:
+                self.deleteOrder(workOrder)
+            return
+
+        remaining = []
+        for workOrder in self.orders:
+            if id(workOrder) in removedIDs:
+                workOrder.slice = None
+                self.spacesLeft += self.orderPieces.pop(id(workOrder))
+            else:
+                remaining.append(workOrder)
+        if len(remaining) == len(self.orders):
+            return
+
+        self.orders = remaining
+        self.rebuildSlices()
+        if self.emptySlice:
+            self.emptySlice.setValue(self.spacesLeft)
+
+    def updateOrder(self, workOrder):
+        """
+        Updates workOrder's slice and the space left after its number of pieces was edited. If the planet has to
+        grow for the new count, the user is asked first: returns False if they refuse, leaving the planet as it was.
+        """
+        added = workOrder.pieces - self.piecesOf(workOrder)
+        oldCapacity = self.capacity()
+        if added > self.spacesLeft and not self.updateSpaces(workOrder, pieces=added):
+            return False
+        self.spacesLeft -= added
+        self.orderPieces[id(workOrder)] = workOrder.pieces
+        if self.emptySlice:
+            self.emptySlice.setValue(self.spacesLeft)
+
+        mySlice = workOrder.slice
+        aggregated = mySlice is self.smallSlice
+        capacity = self.capacity()
+        if capacity != oldCapacity or aggregated != self.isSmall(workOrder.pieces, capacity):
+            self.rebuildSlices()
+        else:
+            if aggregated:
+                mySlice.setValue(sum(order.pieces for order in mySlice.orders))
+            else:
+                mySlice.setValue(workOrder.pieces)
+            if mySlice.selected:
+                self.deselectSlice(mySlice)
+                self.selectSlice(mySlice)
+        if not self.selectedSlices:
+            self.showPlanetStatus()
+        self.updateHeader()
+        return True
 
     def changeTheme(self, theme):
         """
         changes theme (i.e. empty slice color and disabled color). 0 is light, 1 is dark
         """
+        style = getSliceStyle(theme)
         if self.enabled and self.emptySlice:
-            if theme is 0:
-                self.emptySlice.setBrush(QColor(120, 120, 120))
-            else:
-                self.emptySlice.setBrush(QColor(45, 45, 45))
+            self.emptySlice.setBrush(style.emptyColor)
         elif not self.enabled:
-            if theme is 0:
-                self.slices()[0].setBrush(QColor(120, 120, 120))
-                self.slices()[1].setBrush(QColor(120, 120, 120))
-            else:
-                self.slices()[0].setBrush(QColor(45, 45, 45))
-                self.slices()[1].setBrush(QColor(45, 45, 45))
+            for slc in self.slices():
+                slc.setBrush(style.disabledColor)
+
+
+instrument(Planet, 'hoverSlice', 'selectSlice', 'deselectSlice')
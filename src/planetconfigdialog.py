@@ -1,5 +1,6 @@
 from gui.ui_planetConfigDialog import Ui_Dialog
-from PySide2.QtWidgets import QDialog, QMessageBox
+from PySide2.QtWidgets import QDialog, QMessageBox, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox, \
+    QPushButton, QScrollArea, QFrame
 from PySide2.QtGui import QPalette, QColor
 from PySide2.QtCore import Qt
 
@@ -18,32 +19,63 @@ class PlanetConfigDialog(QDialog):
 
     def initializeContent(self):
         """
-        Connects button signals and initializes spin boxes
-        Fills in all the spin boxes with the current planets' enabled status and number of pieces
-        NOT Static
+        Adds one page per machine of the topology. A page's controls are only created when it is first shown.
         """
-        for tabNum in range(1, 2):  # TODO: Change to 4 when done
-            for planetNum in range(1, 6):
-                planet = 'self.mainWindow.ui.pie' + str(planetNum) + 'series'
-                spinBox = 'self.ui.planet' + str(planetNum) + 'Num'
-                button = 'self.ui.planet' + str(planetNum) + 'Enable'
-                if tabNum in (2, 3):
-                    planet += '_' + str(tabNum)
-                    spinBox += '_' + str(tabNum)
-                    button += '_' + str(tabNum)
-
-                codeList = [
-                    button + '.toggled.connect(lambda checked, self=self: self.checkButton(checked, ' + button + ', ' + spinBox + '))',
-                    spinBox + '.setMinimum(0)',
-                    spinBox + '.setMaximum(500)',
-                    'if ' + planet + '.enabled:',
-                    '\tpieces = ' + planet + '.sum()',
-                    '\t' + spinBox + '.setValue(pieces)',
-                    '\t' + button + '.setChecked(True)'
-                ]
-
-                code = '\n'.join(codeList)
-                exec(code)
+        # Each planet's spin box and button: (machineNum, planetNum) -> (spinBox, button)
+        self.planetControls = {}
+        self.pagesBuilt = set()
+
+        topology = self.mainWindow.topology
+        self.ui.tabWidget.clear()
+        for machineNum in topology.machineNums():
+            self.ui.tabWidget.addTab(QWidget(), topology.machineName(machineNum))
+        self.ui.tabWidget.currentChanged.connect(lambda index: self.buildPage(index + 1))
+        self.ui.tabWidget.setCurrentIndex(self.mainWindow.ui.tabWidget.currentIndex())
+        self.buildPage(self.ui.tabWidget.currentIndex() + 1)
+
+    def buildPage(self, machineNum):
+        """
+        Creates a spin box and an enable button for each planet of machine machineNum, and fills them in with the
+        planets' enabled status and number of pieces.
+        """
+        if machineNum in self.pagesBuilt or machineNum not in self.mainWindow.topology:
+            return
+        self.pagesBuilt.add(machineNum)
+
+        content = QWidget()
+        rows = QVBoxLayout(content)
+        for planetNum in self.mainWindow.topology.planetNums(machineNum):
+            spinBox = QSpinBox(content)
+            spinBox.setMinimumWidth(220)
+            spinBox.setReadOnly(True)
+            button = QPushButton('Enable', content)
+            button.setCheckable(True)
+
+            row = QHBoxLayout()
+            row.addStretch()
+            row.addWidget(QLabel('Planet ' + str(planetNum) + ':', content))
+            row.addWidget(spinBox)
+            row.addWidget(QLabel('pieces', content))
+            row.addStretch()
+            row.addWidget(button)
+            rows.addLayout(row)
+            self.planetControls[(machineNum, planetNum)] = (spinBox, button)
+
+            button.toggled.connect(lambda checked, b=button, sb=spinBox: self.checkButton(checked, b, sb))
+            spinBox.setMinimum(0)
+            spinBox.setMaximum(500)
+            widgets = self.mainWindow.registry.planets.get((machineNum, planetNum))
+            if widgets is not None and widgets.planet is not None and widgets.planet.enabled:
+                spinBox.setValue(widgets.planet.sum())
+                button.setChecked(True)
+        rows.addStretch()
+
+        scrollArea = QScrollArea()
+        scrollArea.setFrameShape(QFrame.NoFrame)
+        scrollArea.setWidgetResizable(True)
+        scrollArea.setWidget(content)
+        layout = QVBoxLayout(self.ui.tabWidget.widget(machineNum - 1))
+        layout.addWidget(scrollArea)
 
     def checkButton(self, checked, button, spinBox):
         """
@@ -78,54 +110,38 @@ class PlanetConfigDialog(QDialog):
         """
         warningShown = False
 
-        for tabNum in range(1, 2):  # TODO: Change to 4 when done
-            for planetNum in range(1, 6):
-                planet = 'self.mainWindow.ui.pie' + str(planetNum) + 'series'
-                spinBox = 'self.ui.planet' + str(planetNum) + 'Num'
-                button = 'self.ui.planet' + str(planetNum) + 'Enable'
-                if tabNum in (2, 3):
-                    planet += '_' + str(tabNum)
-                    spinBox += '_' + str(tabNum)
-                    button += '_' + str(tabNum)
-
-                exec('checked = ' + button + '.isChecked()', locals())
-                exec('pE = ' + planet + '.enabled', locals())
-
-                if locals()['checked']:
-                    exec('pieces = ' + spinBox + '.value()', locals())
-                    pcs = locals()['pieces']
-
-                    exec('samePcNum = ' + planet + '.sum() == ' + str(pcs), locals())
-
-                    if not locals()['pE']:
-                        exec(planet + '.setEnabled(' + str(pcs) + ')')
-                    elif not locals()['samePcNum']:
-                        if not warningShown:
-                            result = self.showChangeWarning()
-                            warningShown = True
-                            if result == QMessageBox.Cancel:
-                                return
-
-                        exec(planet + '.clear()')
-                        exec(planet + '.setEnabled(' + str(pcs) + ')')
-                    # Only other case is planet already being enabled with the same num of pcs, nothing to do.
-                else:
-                    if locals()['pE']:
-                        if not warningShown:
-                            result = self.showChangeWarning()
-                            warningShown = True
-                            if result == QMessageBox.Cancel:
-                                return
-
-                        toDelete = []
-                        for wo in self.mainWindow.machines[tabNum-1].workOrders:
-                            if wo.planetNum == planetNum:
-                                toDelete.append(wo)
-                        for wo in toDelete:
-                            self.mainWindow.deleteWorkOrder(wo)
-                        toDelete.clear()
-
-                        exec(planet + '.setDisabled()')
+        for (tabNum, planetNum), (spinBox, button) in self.planetControls.items():
+            if not button.isChecked() and tabNum not in self.mainWindow.registry.chartsBuilt:
+                continue  # Charts that were never created can only be disabled
+            planet = self.mainWindow.registry.planet(tabNum, planetNum)
+
+            if button.isChecked():
+                pcs = spinBox.value()
+
+                if not planet.enabled:
+                    planet.setEnabled(pcs)
+                elif planet.sum() != pcs:
+                    if not warningShown:
+                        result = self.showChangeWarning()
+                        warningShown = True
+                        if result == QMessageBox.Cancel:
+                            return
+
+                    planet.clear()
+                    planet.setEnabled(pcs)
+                # Only other case is planet already being enabled with the same num of pcs, nothing to do.
+            else:
+                if planet.enabled:
+                    if not warningShown:
+                        result = self.showChangeWarning()
+                        warningShown = True
+                        if result == QMessageBox.Cancel:
+                            return
+
+                    toDelete = [wo for wo in self.mainWindow.machines[tabNum-1].workOrders if wo.planetNum == planetNum]
+                    self.mainWindow.deleteWorkOrders(toDelete)
+
+                    planet.setDisabled()
 
         return QDialog.accept(self)
 
@@ -0,0 +1,279 @@
+"""
+Reading and writing of .proj project files.
+
+Projects are handled as the nested dict built by MainWindow.saveFile:
+    {'techID': int or None,
+     tab: {'workOrders': {name: [pieces, side, planetNum, yld]},
+           'startTime', 'endTime', 'loadTime', 'unloadTime': "hh:mm:ss" or None,
+           'cdn', 'testRun', 'coatingRun', 'loadingRun', 'setupRun': number or None,
+           'planets': {planetNum: number of pieces, or None if disabled}},
+     ...}
+where tab is the machine's index (0 for Machine 1). Machines that weren't saved have no entry.
+
+Version 3 file layout (all little-endian):
+    Header          HEADER: magic b'PTMP', format version, number of machines, tech ID (-1 if not set)
+    Section table   one SECTION per machine: offset of its section (0 if not saved), number of planets,
+                    number of work orders
+    Sections        for each saved machine: one MACHINE record, one PLANET record per planet, then one
+                    fixed-width WORK_ORDER record per work order, sorted by work order number
+
+Version 2 files are still read: their PLANET records hold no planet number, the planets being numbered from 1.
+
+Times are stored as seconds since midnight, and unset values as -1 (or NaN for the run parameters).
+Files written by older versions are pickled dicts. They are still read by loadProject, and can be rewritten
+in the current format with convertLegacy.
+"""
+import math
+import mmap
+import pickle
+import struct
+
+from src.timecalc import parseTime, formatTime
+
+MAGIC = b'PTMP'
+VERSION = 3
+READABLE_VERSIONS = (2, 3)
+
+HEADER = struct.Struct('<4sHHq')  # magic, version, machine count, tech ID
+SECTION = struct.Struct('<QHI')  # section offset, planet count, work order count
+MACHINE = struct.Struct('<iiiiidddd')  # start, end, load, unload times, cdn, test, coating, loading, setup runs
+PLANET = struct.Struct('<Bi')  # planet number, pieces in planet (-1 if disabled)
+PLANET_V2 = struct.Struct('<i')  # pieces in planet, -1 if disabled
+WORK_ORDER = struct.Struct('<IiBBi')  # number, pieces, side, planet number, yield (-1 if not given)
+
+TIME_KEYS = ('startTime', 'endTime', 'loadTime', 'unloadTime')
+RUN_KEYS = ('testRun', 'coatingRun', 'loadingRun', 'setupRun')
+
+
+class ProjectFileError(ValueError):
+    """
+    Raised when a file is not a valid project file.
+    """
+
+
+def saveProject(path, project, numMachines=3):
+    """
+    Writes project (see the module docstring) to path in the current format.
+    """
+    tabs = sorted(key for key in project if key != 'techID')
+    numMachines = max([numMachines] + [tab + 1 for tab in tabs])
+    techID = project.get('techID')
+
+    sections = []
+    offset = HEADER.size + SECTION.size * numMachines
+    for tab in range(numMachines):
+        if tab in project:
+            section = encodeMachine(project[tab])
+            sections.append((offset, len(project[tab]['planets']), len(project[tab]['workOrders']), section))
+            offset += len(section)
+        else:
+            sections.append((0, 0, 0, b''))
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, numMachines, -1 if techID is None else techID))
+        for sectionOffset, planetCount, woCount, _ in sections:
+            f.write(SECTION.pack(sectionOffset, planetCount, woCount))
+        for _, _, _, section in sections:
+            f.write(section)
+
+
+def encodeMachine(machine):
+    """
+    Returns the bytes of one machine's section.
+    """
+    times = [-1 if machine[key] is None else parseTime(machine[key]) for key in TIME_KEYS]
+    runs = [math.nan if machine[key] is None else machine[key] for key in RUN_KEYS]
+    cdn = -1 if machine['cdn'] is None else machine['cdn']
+    parts = [MACHINE.pack(*times, cdn, *runs)]
+
+    for planetNum in sorted(machine['planets']):
+        pieces = machine['planets'][planetNum]
+        parts.append(PLANET.pack(planetNum, -1 if pieces is None else int(pieces)))
+
+    workOrders = sorted((int(name[4:]), params) for name, params in machine['workOrders'].items())
+    for number, (pieces, side, planetNum, yld) in workOrders:
+        parts.append(WORK_ORDER.pack(number, pieces, side, planetNum, -1 if yld is None else yld))
+
+    return b''.join(parts)
+
+
+def loadProject(path):
+    """
+    Reads the whole project at path, in the current or legacy format, and returns it as a dict.
+    """
+    if isLegacy(path):
+        return loadLegacy(path)
+
+    with ProjectReader(path) as reader:
+        project = {'techID': reader.techID}
+        for tab in reader.savedMachines():
+            project[tab] = reader.machine(tab)
+            project[tab]['workOrders'] = {
+                'WO #' + str(number): [pieces, side, planetNum, yld]
+                for number, pieces, side, planetNum, yld in reader.iterWorkOrders(tab)
+            }
+    return project
+
+
+def isLegacy(path):
+    """
+    Returns True if the file at path was written by an older version (i.e. it is a pickle).
+    """
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) != MAGIC
+
+
+def loadLegacy(path):
+    """
+    Reads a pickled project file.
+    """
+    try:
+        with open(path, 'rb') as f:
+            project = pickle.load(f)
+    except OSError:
+        raise
+    except Exception as e:  # Anything can go wrong unpickling a file that isn't a project
+        raise ProjectFileError('Not a project file: ' + path) from e
+
+    if not isLegacyProject(project):
+        raise ProjectFileError('Not a project file: ' + path)
+    return project
+
+
+def isLegacyProject(project):
+    """
+    Returns True if project has the keys and value types of a project dict (see the module docstring).
+    """
+    if not isinstance(project, dict) or 'techID' not in project:
+        return False
+    for tab, machine in project.items():
+        if tab == 'techID':
+            continue
+        if not isinstance(tab, int) or tab < 0 or not isinstance(machine, dict):
+            return False
+        if any(key not in machine for key in TIME_KEYS + ('cdn',) + RUN_KEYS):
+            return False
+        if not isinstance(machine.get('planets'), dict) or not isinstance(machine.get('workOrders'), dict):
+            return False
+        for name, params in machine['workOrders'].items():
+            if not isinstance(name, str) or not name[4:].isdigit():
+                return False
+            if not isinstance(params, (list, tuple)) or len(params) != 4:
+                return False
+    return True
+
+
+def convertLegacy(path, newPath=None):
+    """
+    Rewrites the legacy project at path in the current format, at newPath (or in place).
+    """
+    saveProject(newPath or path, loadLegacy(path))
+
+
+class ProjectReader:
+
+    def __init__(self, path):
+        """
+        Opens a project file in the current format through mmap. Only the header and section table are read, and
+        checked against the file's size: machines and work orders are only decoded when asked for.
+        """
+        self.file = open(path, 'rb')
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:  # Empty file
+            self.file.close()
+            raise ProjectFileError('Not a project file: ' + path) from e
+
+        try:
+            magic, version, numMachines, techID = HEADER.unpack_from(self.data, 0)
+            if magic != MAGIC:
+                raise ProjectFileError('Not a project file: ' + path)
+            if version not in READABLE_VERSIONS:
+                raise ProjectFileError('Unsupported project file version ' + str(version) + ': ' + path)
+
+            self.version = version
+            self.numMachines = numMachines
+            self.techID = None if techID == -1 else techID
+            self.planetRecord = PLANET if version >= 3 else PLANET_V2
+            self.sections = [SECTION.unpack_from(self.data, HEADER.size + SECTION.size * tab)
+                             for tab in range(numMachines)]
+            self.checkSections(path)
+        except struct.error as e:
+            self.close()
+            raise ProjectFileError('Truncated project file: ' + path) from e
+        except ProjectFileError:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def checkSections(self, path):
+        """
+        Raises ProjectFileError if a section starts inside the header or section table, or ends past the end of
+        the file.
+        """
+        tableEnd = HEADER.size + SECTION.size * self.numMachines
+        for offset, planetCount, woCount in self.sections:
+            if not offset:
+                continue
+            end = offset + MACHINE.size + self.planetRecord.size * planetCount + WORK_ORDER.size * woCount
+            if offset < tableEnd or end > len(self.data):
+                raise ProjectFileError('Truncated project file: ' + path)
+
+    def savedMachines(self):
+        """
+        Returns the indexes of the machines that have a section in the file.
+        """
+        return [tab for tab, (offset, _, _) in enumerate(self.sections) if offset]
+
+    def workOrderCount(self, tab):
+        """
+        Returns the number of work orders of machine tab, without reading them.
+        """
+        return self.sections[tab][2]
+
+    def machine(self, tab):
+        """
+        Returns the values and planets of machine tab, as in the project dict, without its work orders.
+        """
+        offset, planetCount, _ = self.sections[tab]
+        values = MACHINE.unpack_from(self.data, offset)
+        times, cdn, runs = values[:4], values[4], values[5:]
+
+        machine = {}
+        for key, secs in zip(TIME_KEYS, times):
+            machine[key] = None if secs == -1 else formatTime(secs)
+        machine['cdn'] = None if cdn == -1 else cdn
+        for key, run in zip(RUN_KEYS, runs):
+            machine[key] = None if math.isnan(run) else run
+
+        machine['planets'] = {}
+        offset += MACHINE.size
+        for planetNum in range(1, planetCount + 1):
+            if self.version >= 3:
+                planetNum, pieces = PLANET.unpack_from(self.data, offset)
+            else:
+                pieces, = PLANET_V2.unpack_from(self.data, offset)
+            machine['planets'][planetNum] = None if pieces == -1 else pieces
+            offset += self.planetRecord.size
+        return machine
+
+    def iterWorkOrders(self, tab):
+        """
+        Yields (number, pieces, side, planetNum, yld) for each work order of machine tab, decoding them one at
+        a time straight from the mapped file. yld is None if not given.
+        """
+        offset, planetCount, woCount = self.sections[tab]
+        offset += MACHINE.size + self.planetRecord.size * planetCount
+        for _ in range(woCount):
+            number, pieces, side, planetNum, yld = WORK_ORDER.unpack_from(self.data, offset)
+            offset += WORK_ORDER.size
+            yield number, pieces, side, planetNum, None if yld == -1 else yld
@@ -0,0 +1,51 @@
+from PySide2.QtCore import QTimer
+from src.instrumentation import instrument
+
+
+class RecalcScheduler:
+
+    def __init__(self, model):
+        """
+        Merges the result updates asked for during one event loop tick into a single pass over model (a
+        ResultsModel). Until then, machines and rows are only marked dirty, with the columns that may have changed.
+        """
+        self.model = model
+        self.dirtyMachines = {}  # machine -> columns to refresh in all of its rows
+        self.dirtyRows = {}  # work order -> columns to refresh in its row
+        self.scheduled = False
+
+    def scheduleMachine(self, machine, columns):
+        """
+        Marks columns dirty in every row of machine.
+        """
+        self.dirtyMachines.setdefault(machine, set()).update(columns)
+        self.schedule()
+
+    def scheduleRow(self, workOrder, columns):
+        """
+        Marks columns dirty in workOrder's row.
+        """
+        self.dirtyRows.setdefault(workOrder, set()).update(columns)
+        self.schedule()
+
+    def schedule(self):
+        if not self.scheduled:
+            self.scheduled = True
+            QTimer.singleShot(0, self.flush)
+
+    def flush(self):
+        """
+        Refreshes every dirty cell at once. The model only notifies the view about cells whose text changed.
+        """
+        self.scheduled = False
+        machines, self.dirtyMachines = self.dirtyMachines, {}
+        cells, self.dirtyRows = self.dirtyRows, {}
+
+        for machine, columns in machines.items():
+            for workOrder in machine.workOrders:
+                cells.setdefault(workOrder, set()).update(columns)
+        if cells:
+            self.model.refreshCells(cells)
+
+
+instrument(RecalcScheduler, 'flush')
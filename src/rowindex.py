@@ -0,0 +1,107 @@
+class RowIndex:
+
+    COMPACT_MIN = 64  # Holes are only compacted once there are at least this many, and more holes than keys
+
+    def __init__(self):
+        """
+        Bidirectional index between stable keys and table rows, in insertion order.
+        Each key gets a slot when appended. Removing a key leaves a hole in its slot instead of shifting the
+        ones after it, and a Fenwick tree counting the live slots converts between slot and row in O(log n).
+        So appends, removals, and lookups both ways are all O(log n) (amortized, as holes are dropped once they
+        outnumber the keys), however many rows come after.
+        """
+        self.keys = []  # slot -> key, None for removed slots
+        self.slots = {}  # key -> slot
+        self.tree = [0]  # Fenwick tree over the slots (1-based), 1 for live slots
+        self.holes = 0
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, key):
+        return key in self.slots
+
+    def __iter__(self):
+        """
+        Iterates over the keys in row order.
+        """
+        return (key for key in self.keys if key is not None)
+
+    def append(self, key):
+        """
+        Adds key in a new row at the end.
+        """
+        slot = len(self.keys)
+        self.keys.append(key)
+        self.slots[key] = slot
+
+        # The new node covers the slots (i - lowbit(i), i], its own included
+        i = slot + 1
+        self.tree.append(1 + self.prefix(i - 1) - self.prefix(i - (i & -i)))
+
+    def remove(self, key):
+        """
+        Removes key's row. The rows after it move up by one without being touched. Returns the removed row.
+        """
+        slot = self.slots.pop(key)
+        row = self.prefix(slot)
+        self.keys[slot] = None
+
+        i = slot + 1
+        while i < len(self.tree):
+            self.tree[i] -= 1
+            i += i & -i
+
+        self.holes += 1
+        if self.holes >= self.COMPACT_MIN and self.holes > len(self.slots):
+            self.rebuild(list(self))
+        return row
+
+    def row(self, key):
+        """
+        Returns the row of key.
+        """
+        return self.prefix(self.slots[key])
+
+    def key(self, row):
+        """
+        Returns the key in row.
+        """
+        if not 0 <= row < len(self.slots):
+            raise IndexError('row out of range: ' + str(row))
+
+        # Descend the tree to the first slot with row + 1 live slots up to it
+        slot = 0
+        remaining = row + 1
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            nextSlot = slot + step
+            if nextSlot < len(self.tree) and self.tree[nextSlot] < remaining:
+                slot = nextSlot
+                remaining -= self.tree[nextSlot]
+            step >>= 1
+        return self.keys[slot]
+
+    def prefix(self, count):
+        """
+        Returns the number of live slots among the first count slots.
+        """
+        total = 0
+        while count > 0:
+            total += self.tree[count]
+            count -= count & -count
+        return total
+
+    def rebuild(self, keys):
+        """
+        Replaces the whole index with keys, in that order. Used to reorder rows, and to drop holes.
+        """
+        self.clear()
+        for key in keys:
+            self.append(key)
+
+    def clear(self):
+        self.keys = []
+        self.slots = {}
+        self.tree = [0]
+        self.holes = 0
@@ -0,0 +1,34 @@
+class SelectionModel:
+
+    def __init__(self):
+        """
+        Selection of one machine: the selected work orders, in selection order, and the planet whose empty slice
+        is selected, if any. Lookups, additions and removals are O(1), so changing the selection only costs as
+        much as the items that actually change, however many planets and work orders the machine has.
+        """
+        self.workOrders = {}  # work order -> None, used as an ordered set
+        self.emptyPlanet = None
+
+    def __contains__(self, workOrder):
+        return workOrder in self.workOrders
+
+    def __len__(self):
+        return len(self.workOrders)
+
+    def __iter__(self):
+        return iter(list(self.workOrders))
+
+    def add(self, workOrder):
+        self.workOrders[workOrder] = None
+
+    def discard(self, workOrder):
+        self.workOrders.pop(workOrder, None)
+
+    def clear(self):
+        """
+        Empties the selection. Returns the work orders and empty slice planet that were selected.
+        """
+        workOrders, emptyPlanet = list(self.workOrders), self.emptyPlanet
+        self.workOrders = {}
+        self.emptyPlanet = None
+        return workOrders, emptyPlanet
@@ -0,0 +1,212 @@
+"""
+Orders the runs of a machine to spend as little machine time as possible on changeovers.
+
+A run coats the work orders of one side on one planet. The machine's run parameters are its totals for running its
+work orders in the order of their numbers (see Machine), so each load, side setup and coating run of that order
+costs an equal share of them. Between two runs, changing planets costs a reload (a share of the unload and load
+windows plus the loading run), and changing sides costs a share of the setup run. The order is built greedily,
+always running next whatever is cheapest to change over to (taken from one priority queue per side), then
+improved by moving single runs to better positions until no move helps.
+"""
+import heapq
+
+
+class Run:
+
+    def __init__(self, planetNum, side):
+        """
+        The work orders of one side on one planet, coated together.
+        """
+        self.planetNum = planetNum
+        self.side = side
+        self.workOrders = []
+        self.pieces = 0
+
+    def name(self):
+        return "Planet " + str(self.planetNum) + " side " + str(self.side)
+
+
+class ChangeoverCosts:
+
+    def __init__(self, machine, baseline):
+        """
+        Hours machine spends per run and between runs. Its parameters are totals for running its work orders in the
+        order of their numbers (see Machine), whose runs are baseline: each load, side setup and coating run costs
+        its share of those totals. Parameters not set count as 0.
+        """
+        loads = 1 + changes(baseline, 'planetNum')
+        setups = 1 + changes(baseline, 'side')
+        self.testHours = machine.testRun or 0
+        self.reloadHours = ((machine.loadSeconds() or 0) / 3600 + (machine.unloadSeconds() or 0) / 3600 +
+                            (machine.loadingRun or 0)) / loads
+        self.flipHours = (machine.setupRun or 0) / setups
+        self.runHours = (machine.coatingRun or 0) / max(len(baseline), 1)
+
+    def between(self, run, nextRun):
+        """
+        Returns the changeover hours from run to nextRun.
+        """
+        hours = 0
+        if run.planetNum != nextRun.planetNum:
+            hours += self.reloadHours
+        if run.side != nextRun.side:
+            hours += self.flipHours
+        return hours
+
+    def total(self, runs):
+        """
+        Returns the machine hours of doing runs in that order: the test run, the first load and setup, every run and
+        changeover, and the last unload. For the baseline runs, this is the sum of the machine's parameters, i.e. the
+        labor and coating hours of the results.
+        """
+        if not runs:
+            return 0
+        hours = self.testHours + self.reloadHours + self.flipHours + self.runHours * len(runs)
+        for run, nextRun in zip(runs, runs[1:]):
+            hours += self.between(run, nextRun)
+        return hours
+
+
+def changes(runs, attribute):
+    """
+    Returns how many times attribute changes from one run to the next in runs.
+    """
+    return sum(getattr(run, attribute) != getattr(nextRun, attribute) for run, nextRun in zip(runs, runs[1:]))
+
+
+class SequenceReport:
+
+    def __init__(self, naiveRuns, naiveHours, runs, hours):
+        """
+        Runs of a machine in the naive order (that of its work orders) and in the planned order, with their
+        projected machine hours.
+        """
+        self.naiveRuns = naiveRuns
+        self.naiveHours = naiveHours
+        self.runs = runs
+        self.hours = hours
+
+    def savedHours(self):
+        return self.naiveHours - self.hours
+
+
+def naiveRuns(workOrders):
+    """
+    Returns the runs of doing workOrders in their order: a new run starts whenever the planet or side changes, so
+    the same planet and side may be run more than once.
+    """
+    runs = []
+    for workOrder in workOrders:
+        if not runs or (runs[-1].planetNum, runs[-1].side) != (workOrder.planetNum, workOrder.side):
+            runs.append(Run(workOrder.planetNum, workOrder.side))
+        runs[-1].workOrders.append(workOrder)
+        runs[-1].pieces += workOrder.pieces
+    return runs
+
+
+def groupRuns(workOrders):
+    """
+    Groups workOrders into one run per planet and side, in the order their first work order comes in.
+    """
+    runs = {}
+    for workOrder in workOrders:
+        key = (workOrder.planetNum, workOrder.side)
+        run = runs.get(key)
+        if run is None:
+            run = runs[key] = Run(workOrder.planetNum, workOrder.side)
+        run.workOrders.append(workOrder)
+        run.pieces += workOrder.pieces
+    return list(runs.values())
+
+
+def greedySequence(runs, costs):
+    """
+    Returns runs ordered greedily, starting with the biggest one: the next run is always the cheapest to change
+    over to, the biggest one among equally cheap runs. Only the biggest remaining run of each side, and the other
+    sides of the current planet, can be cheapest, so each step is O(log n).
+    """
+    if not runs:
+        return []
+
+    bySide = {}  # side -> heap of (-pieces, index) of its runs
+    byPlanet = {}  # planet number -> indices of its runs
+    for i, run in enumerate(runs):
+        heapq.heappush(bySide.setdefault(run.side, []), (-run.pieces, i))
+        byPlanet.setdefault(run.planetNum, []).append(i)
+    done = [False] * len(runs)
+
+    def topOf(heap):
+        while heap and done[heap[0][1]]:
+            heapq.heappop(heap)
+        return heap[0][1] if heap else None
+
+    current = min(range(len(runs)), key=lambda i: (-runs[i].pieces, i))
+    ordered = []
+    while current is not None:
+        done[current] = True
+        run = runs[current]
+        ordered.append(run)
+
+        candidates = [i for i in byPlanet[run.planetNum] if not done[i]]
+        candidates.extend(i for i in map(topOf, bySide.values()) if i is not None)
+        current = min(candidates, key=lambda i: (costs.between(run, runs[i]), -runs[i].pieces, i), default=None)
+    return ordered
+
+
+def improveSequence(runs, costs, maxPasses=10):
+    """
+    Local search over runs: moves single runs to the position that saves the most changeover time, until no move
+    saves anything or after maxPasses passes. Returns the improved order.
+    """
+    runs = list(runs)
+
+    def link(a, b):
+        return costs.between(a, b) if a is not None and b is not None else 0
+
+    for _ in range(maxPasses):
+        improved = False
+        for i in range(len(runs)):
+            run = runs[i]
+            before = runs[i - 1] if i > 0 else None
+            after = runs[i + 1] if i + 1 < len(runs) else None
+            removed = link(before, run) + link(run, after) - link(before, after)
+
+            rest = runs[:i] + runs[i + 1:]
+            best, bestPosition = 0, None
+            for j in range(len(rest) + 1):
+                if j == i:
+                    continue
+                left = rest[j - 1] if j > 0 else None
+                right = rest[j] if j < len(rest) else None
+                saved = removed - (link(left, run) + link(run, right) - link(left, right))
+                if saved > best + 1e-9:
+                    best, bestPosition = saved, j
+            if bestPosition is not None:
+                rest.insert(bestPosition, run)
+                runs = rest
+                improved = True
+        if not improved:
+            break
+    return runs
+
+
+def sequenceMachine(machine, improve=True):
+    """
+    Plans the run order of machine's work orders. If improve, the greedy order is improved by local search.
+    Returns a SequenceReport.
+    """
+    # The baseline is the order of the work order numbers, as listed in the results, rather than the order of the
+    # store, which deletions change
+    workOrders = sorted(machine.workOrders, key=lambda workOrder: workOrder.number)
+    naive = naiveRuns(workOrders)
+    costs = ChangeoverCosts(machine, naive)
+    runs = greedySequence(groupRuns(workOrders), costs)
+    if improve:
+        runs = improveSequence(runs, costs)
+
+    # The planned order is never worse than the naive one
+    hours = costs.total(runs)
+    naiveHours = costs.total(naive)
+    if hours > naiveHours:
+        runs, hours = list(naive), naiveHours
+    return SequenceReport(naive, naiveHours, runs, hours)
@@ -1,272 +1,437 @@
-from PySide2.QtWidgets import QTableWidget, QTableWidgetItem, QPushButton, QDialog
+from PySide2.QtWidgets import QTableView, QStyledItemDelegate, QStyleOptionButton, QStyleOptionViewItem, QStyle, \
+    QApplication, QDialog, QMenu
 from PySide2 import QtWidgets
-from PySide2.QtGui import QColor, QPalette
-from PySide2.QtCore import Qt, Signal, Slot, QTime
+from PySide2.QtGui import QPalette
+from PySide2.QtCore import Qt, Signal, QAbstractTableModel, QModelIndex, QEvent, \
+    QItemSelectionModel
 import src.workorder as wo
 import src.workorderdialog as wod
+import src.timecalc as timecalc
+import src.themes as themes
+from src.rowindex import RowIndex
+from src.recalcscheduler import RecalcScheduler
+from src.instrumentation import instrument
 
 
-class TableView(QTableWidget):
+class ResultsModel(QAbstractTableModel):
 
-    fullRowSelected = Signal(wo.WorkOrder)
+    BUTTON_COLUMN = 10
+    TIME_COLUMNS = range(2, 7)
+    ALL_COLUMNS = range(0, BUTTON_COLUMN)
 
-    def __init__(self, headers: list, window, *args):
+    def __init__(self, headers: list, window):
         """
-        Initializes table view with horizontal headers and no data
+        Table model backed directly by the work orders. Rows are addressed by work order number, through a RowIndex,
+        so removing a row doesn't renumber the ones after it. Cells are only generated when shown.
         """
-        QTableWidget.__init__(self, *args)
+        QAbstractTableModel.__init__(self)
         self.hHeaders = headers
-        self.vHeaders = []
         self.window = window
-        self.setHorizontalHeaderLabels(headers)
-        self.firstInit = True
-        self.disabledColumns = [2, 3, 4, 5, 6, 9]
-        self.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.workOrders = {}  # number -> work order
+        self.rows = RowIndex()  # number <-> row
+
+        # Texts of the rows that were shown: number -> text of each column. Compared against by refreshCells.
+        self.texts = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.hHeaders)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole:
+            if orientation == Qt.Horizontal:
+                return self.hHeaders[section]
+            else:
+                return self.workOrderAt(section).name
+        return None
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        if role == Qt.DisplayRole:
+            column = index.column()
+            if column == self.BUTTON_COLUMN:  # Painted by the button delegate
+                return "..."
+            workOrder = self.workOrderAt(index.row())
+            texts = self.texts.get(workOrder.number)
+            if texts is None:
+                texts = self.texts[workOrder.number] = [self.text(workOrder, col) for col in self.ALL_COLUMNS]
+            return texts[column]
+        elif role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def text(self, workOrder, column):
+        """
+        Returns the text shown in column for workOrder.
+        """
+        if column == 0:  # Machine Number
+            return "Machine " + str(workOrder.machineNum)
 
-        # Initialize mapping
-        self.rowNumToWOMapping = {}
+        elif column == 1:  # Planet Number
+            return "Planet " + str(workOrder.planetNum)
 
-        # Connect cell selection signal
-        self.cellClicked.connect(window.ensureSingleWorkOrder_r)
+        elif column == 2:  # Labor Hrs
+            return self.getLaborHrs(workOrder)
 
-        # Set headers to split space well
-        self.setHSpacing()
+        elif column == 3:  # Machine Time
+            return self.getMachineTime(workOrder)
+
+        elif column == 4:  # Setup Run
+            return self.getSetupRunTime(workOrder)
+
+        elif column == 5:  # Test Run
+            return self.getTestRunTime(workOrder)
+
+        elif column == 6:  # Coating Run
+            return self.getCoatingRunTime(workOrder)
 
-    def setColorToRow(self, rowIndex, color):
+        elif column == 7:  # Quantity
+            return str(workOrder.pieces) + " pieces"
+
+        elif column == 8:  # Yield
+            if workOrder.yld:
+                return str(workOrder.yld) + ' pieces'
+            return 'Not given'
+
+        elif column == 9:  # Scrap
+            if workOrder.scrap:
+                return str(workOrder.scrap) + ' pieces'
+            return 'Not given'
+
+    def workOrderAt(self, row):
         """
-        Sets color for a single row.
+        Returns the work order shown in row.
         """
-        palette = QPalette()
-        palette.setColor(QPalette.Button, color.darker(f=110))
+        return self.workOrders[self.rows.key(row)]
 
-        for j in range(self.columnCount()):
-            try:
-                wg = self.cellWidget(rowIndex, j)
-                if wg:
-                    wg.setPalette(palette)
-                else:
-                    self.item(rowIndex, j).setBackground(color)
-            except:
-                pass
+    def rowOf(self, workOrder):
+        """
+        Returns the row showing workOrder, or None if it has none.
+        """
+        if workOrder.number not in self.rows:
+            return None
+        return self.rows.row(workOrder.number)
 
-    def setBG(self):
+    def appendWorkOrders(self, workOrders):
         """
-        Sets table background to have alternating dark/lighter colors
+        Adds a row at the end of the table for each work order in workOrders, in a single insertion.
         """
-        if self.window.theme is 0:
-            color1 = QColor(180, 180, 180)
-            color2 = QColor(150, 150, 150)
-        else:
-            color1 = QColor(80, 80, 80)
-            color2 = QColor(60, 60, 60)
+        workOrders = list(workOrders)
+        if not workOrders:
+            return
+
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(workOrders) - 1)
+        for workOrder in workOrders:
+            self.workOrders[workOrder.number] = workOrder
+            self.rows.append(workOrder.number)
+        self.endInsertRows()
+
+    def removeWorkOrder(self, workOrder):
+        """
+        Removes workOrder's row, if it has one. The rows after it are not touched.
+        """
+        row = self.rowOf(workOrder)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.rows.remove(workOrder.number)
+        del self.workOrders[workOrder.number]
+        self.texts.pop(workOrder.number, None)
+        self.endRemoveRows()
 
-        for i in range(self.rowCount()):
-            if i % 2 is 0:
-                self.setColorToRow(i, color1)
+    def removeWorkOrders(self, workOrders):
+        """
+        Removes the rows of all the given work orders at once. The view is reset once, rather than told about
+        every row.
+        """
+        workOrders = [workOrder for workOrder in workOrders if workOrder.number in self.rows]
+        if len(workOrders) == 1:
+            self.removeWorkOrder(workOrders[0])
+        elif workOrders:
+            self.beginResetModel()
+            if len(workOrders) == len(self.rows):
+                self.rows.clear()
+                self.workOrders.clear()
+                self.texts.clear()
             else:
-                self.setColorToRow(i, color2)
+                for workOrder in workOrders:
+                    self.rows.remove(workOrder.number)
+                    del self.workOrders[workOrder.number]
+                    self.texts.pop(workOrder.number, None)
+            self.endResetModel()
 
-    def addRowFor(self, workOrder: 'WorkOrder'):
+    def refreshCells(self, cells):
         """
-        Adds row to results section for workOrder given. Then, associates row number to workOrder using mapping.
-        Some data is calculated and filled in.
+        Recomputes the text of the given cells (a dict of work order -> columns), and emits a single dataChanged
+        covering the cells whose text changed. Rows that were never shown are skipped: their texts are computed
+        when they are.
         """
-        # Gets rid of weird graphics
-        if self.firstInit:
-            self.setHSpacing()
-            self.firstInit = False
-
-        self.vHeaders.append(workOrder.name)
-
-        self.setRowCount(len(self.vHeaders))
-        rowPos = self.rowCount() - 1
-        self.insertRow(rowPos)
-        workOrder.rowNum = rowPos
-        self.rowNumToWOMapping[rowPos] = workOrder
-
-        self.setVerticalHeaderLabels(self.vHeaders)
-
-        for j in range(0, len(self.hHeaders)):
-
-            if j is 0:  # Machine Number
-                newItem = QTableWidgetItem("Machine " + str(workOrder.machineNum))
-                newItem.setTextAlignment(Qt.AlignCenter)
-                self.setItem(rowPos, j, newItem)
-
-            elif j is 1:  # Planet Number
-                newItem = QTableWidgetItem("Planet " + str(workOrder.planetNum))
-                newItem.setTextAlignment(Qt.AlignCenter)
-                self.setItem(rowPos, j, newItem)
-
-            elif j is 2:  # Labor Hrs
-                newItem = QTableWidgetItem(self.getLaborHrs(workOrder))
-                newItem.setTextAlignment(Qt.AlignCenter)
-                self.setItem(rowPos, j, newItem)
-
-            elif j is 3:  # Machine Time
-                newItem = QTableWidgetItem(self.getMachineTime(workOrder))
-                newItem.setTextAlignment(Qt.AlignCenter)
-                self.setItem(rowPos, j, newItem)
-
-            elif j is 4:  # Setup Run
-                newItem = QTableWidgetItem(self.getSetupRunTime(workOrder))
-                newItem.setTextAlignment(Qt.AlignCenter)
-                self.setItem(rowPos, j, newItem)
-
-            elif j is 5:  # Test Run
-                newItem = QTableWidgetItem(self.getTestRunTime(workOrder))
-                newItem.setTextAlignment(Qt.AlignCenter)
-                self.setItem(rowPos, j, newItem)
-
-            elif j is 6:  # Coating Run
-                newItem = QTableWidgetItem(self.getCoatingRunTime(workOrder))
-                newItem.setTextAlignment(Qt.AlignCenter)
-                self.setItem(rowPos, j, newItem)
-
-            elif j is 7:  # Quantity
-                newItem = QTableWidgetItem(str(workOrder.pieces) + " pieces")
-                newItem.setTextAlignment(Qt.AlignCenter)
-                self.setItem(rowPos, j, newItem)
-
-            elif j is 8:  # Yield
-                if workOrder.yld:
-                    newItem = QTableWidgetItem(str(workOrder.yld) + ' pieces')
-                else:
-                    newItem = QTableWidgetItem('Not given')
-                newItem.setTextAlignment(Qt.AlignCenter)
-                self.setItem(rowPos, j, newItem)
-
-            elif j is 9:  # Scrap
-                if workOrder.scrap:
-                    newItem = QTableWidgetItem(str(workOrder.scrap) + ' pieces')
-                else:
-                    newItem = QTableWidgetItem('Not given')
-                newItem.setTextAlignment(Qt.AlignCenter)
-                self.setItem(rowPos, j, newItem)
-
-            elif j is 10:
-                newItem = QPushButton()
-                newItem.setText("...")
-                newItem.clicked.connect(lambda: self.openEditWODialog(workOrder))
-                self.setCellWidget(rowPos, j, newItem)
-                self.updateButtons()
-
-        self.window.updateResults(self.window.machines[workOrder.machineNum-1])
-        self.removeRow(self.rowCount()-1)
-        self.setBG()
-
-    def updateButtons(self):
-        """
-        Fixes bug due to scrollbar appearing/disappearing
-        """
-        if self.rowCount() > 8:
-            for rowNum in range(1, self.rowCount()):
-                self.cellWidget(rowNum-1, 10).setFixedWidth(43)
-        else:
-            for rowNum in range(1, self.rowCount()):
-                print(rowNum)
-                self.cellWidget(rowNum-1, 10).setFixedWidth(69)  # ayyyy lmao. not intentional, actually the best value
+        top = bottom = left = right = None
+        for workOrder, columns in cells.items():
+            texts = self.texts.get(workOrder.number)
+            if texts is None or self.workOrders.get(workOrder.number) is not workOrder:
+                continue
+
+            changed = []
+            for column in columns:
+                text = self.text(workOrder, column)
+                if text != texts[column]:
+                    texts[column] = text
+                    changed.append(column)
+            if not changed:
+                continue
+
+            row = self.rows.row(workOrder.number)
+            if top is None:
+                top, bottom, left, right = row, row, min(changed), max(changed)
+            else:
+                top, bottom = min(top, row), max(bottom, row)
+                left, right = min(left, min(changed)), max(right, max(changed))
 
-    def openEditWODialog(self, workOrder):
+        if top is not None:
+            self.dataChanged.emit(self.index(top, left), self.index(bottom, right))
+
+    def getTime(self, column, workOrder):
         """
-        Allows a user to edit a work order. Also, selects the relevant slice in the GUI
+        Returns the calculated column value for workOrder as a string. If none, returns placeholder text.
         """
-        self.window.ensureSingleWorkOrder_r(workOrder.rowNum, 0)
+        machine = self.window.machines[workOrder.machineNum-1]
+        time = timecalc.getTimes(machine).get(column, workOrder)
+        if time is not None:
+            return '{:.3f} hours'.format(time)
+        return 'Not set...'
 
-        woDialog = wod.WorkOrderDialog(self.window, workOrder, editing=True)
-        result = woDialog.exec_()
+    def getLaborHrs(self, workOrder):
+        """
+        Returns the labor hours for the workOrder as a string. If none, returns placeholder text.
+        """
+        return self.getTime('labor', workOrder)
 
-        if result == QDialog.Rejected:
-            return
+    def getMachineTime(self, workOrder):
+        """
+        Returns the machine time for the workOrder as a string. If none, returns placeholder text.
+        """
+        return self.getTime('machine', workOrder)
+
+    def getSetupRunTime(self, workOrder):
+        """
+        Returns the setup run time for the workOrder as a string. If none, returns placeholder text.
+        """
+        return self.getTime('setup', workOrder)
+
+    def getTestRunTime(self, workOrder):
+        """
+        Returns the test run time for the workOrder as a string. If none, returns placeholder text.
+        """
+        return self.getTime('test', workOrder)
+
+    def getCoatingRunTime(self, workOrder):
+        """
+        Returns the coating run time for the workOrder as a string. If none, returns placeholder text.
+        """
+        return self.getTime('coating', workOrder)
+
+
+class ButtonDelegate(QStyledItemDelegate):
+
+    buttonClicked = Signal(int)
+
+    def paint(self, painter, option, index):
+        """
+        Paints a push button in the cell, instead of creating a QPushButton widget per row.
+        """
+        button = QStyleOptionButton()
+        button.rect = option.rect.adjusted(1, 1, -1, -1)
+        button.text = index.data()
+        button.state = QStyle.State_Enabled
+        button.palette = QPalette(option.palette)
+        if option.features & QStyleOptionViewItem.Alternate:
+            color = option.palette.color(QPalette.AlternateBase)
         else:
-            self.window.updateWorkOrder(workOrder)
+            color = option.palette.color(QPalette.Base)
+        button.palette.setColor(QPalette.Button, color.darker(f=110))
+        QApplication.style().drawControl(QStyle.CE_PushButton, button, painter)
 
-    def updateRowInfo(self, workOrder):
+    def editorEvent(self, event, model, option, index):
         """
-        Updates the information in the workOrder's associated row.
+        Emits buttonClicked with the row number when the painted button is clicked.
         """
-        rowPos = workOrder.rowNum
-        for j in range(0, len(self.hHeaders)):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            self.buttonClicked.emit(index.row())
+            return True
+        return False
+
 
-            if j is 0:  # Machine Number
-                self.item(rowPos, j).setText("Machine " + str(workOrder.machineNum))
+class TableView(QTableView):
 
-            elif j is 1:  # Planet Number
-                self.item(rowPos, j).setText("Planet " + str(workOrder.planetNum))
+    fullRowSelected = Signal(wo.WorkOrder)
 
-            elif j is 2:  # Labor Hrs
-                self.item(rowPos, j).setText(self.getLaborHrs(workOrder))
+    def __init__(self, headers: list, window, *args):
+        """
+        Initializes table view with horizontal headers and no data
+        """
+        QTableView.__init__(self, *args)
+        self.window = window
+        self.disabledColumns = [2, 3, 4, 5, 6, 9]
+        self.setEditTriggers(QTableView.NoEditTriggers)
 
-            elif j is 3:  # Machine Time
-                self.item(rowPos, j).setText(self.getMachineTime(workOrder))
+        # Initialize model, which holds the work orders in row order
+        self.resultsModel = ResultsModel(headers, window)
+        self.setModel(self.resultsModel)
 
-            elif j is 4:  # Setup Run
-                self.item(rowPos, j).setText(self.getSetupRunTime(workOrder))
+        # Result updates are merged, and applied once per event loop tick
+        self.scheduler = RecalcScheduler(self.resultsModel)
 
-            elif j is 5:  # Test Run
-                self.item(rowPos, j).setText(self.getTestRunTime(workOrder))
+        # Edit buttons are painted by a delegate rather than being widgets
+        self.buttonDelegate = ButtonDelegate(self)
+        self.buttonDelegate.buttonClicked.connect(lambda row: self.openEditWODialog(self.workOrderAt(row)))
+        self.setItemDelegateForColumn(ResultsModel.BUTTON_COLUMN, self.buttonDelegate)
 
-            elif j is 6:  # Coating Run
-                self.item(rowPos, j).setText(self.getCoatingRunTime(workOrder))
+        # All rows have the same height, so the view never has to measure them
+        self.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
 
-            elif j is 7:  # Quantity
-                self.item(rowPos, j).setText(str(workOrder.pieces) + " pieces")
+        # Rows are striped by the view, with the colors of the palette set by setBG
+        self.setAlternatingRowColors(True)
 
-            elif j is 8:  # Yield
-                if workOrder.yld:
-                    self.item(rowPos, j).setText(str(workOrder.yld) + ' pieces')
-                else:
-                    self.item(rowPos, j).setText('Not given')
+        # Connect cell selection signal
+        self.clicked.connect(lambda index: window.ensureSingleWorkOrder_r(index.row(), index.column()))
 
-            elif j is 9:  # Scrap
-                if workOrder.scrap:
-                    self.item(rowPos, j).setText(str(workOrder.scrap) + ' pieces')
-                else:
-                    self.item(rowPos, j).setText('Not given')
+        # Set headers to split space well
+        self.setHSpacing()
 
-    def getLaborHrs(self, workOrder):
+    def setBG(self):
         """
-        Calculates the labor hours for the workOrder and returns it as a string. If none, returns placeholder text.
+        Sets the table's palette for the current theme. Rows are striped dark/lighter by the view itself, from the
+        palette's base and alternate base colors.
         """
-        return 'Waiting...'
+        self.setPalette(themes.getTablePalette(self.window.theme))
 
-    def getMachineTime(self, workOrder):
+    def workOrderAt(self, row):
         """
-        Calculates the machine time for the workOrder and returns it as a string. If none, returns placeholder text.
+        Returns the work order shown in row.
         """
-        machine = self.window.machines[workOrder.machineNum-1]
-        if machine.startTime and machine.endTime:
-            try:
-                totPcs = 0
-                for tmpWO in machine.workOrders:
-                    totPcs += tmpWO.pieces
-
-                totTime = QTime().fromString(machine.startTime).secsTo(QTime().fromString(machine.endTime)) / 3600
-                time = totTime * workOrder.pieces / totPcs
-
-                return '{:.3f} hours'.format(time)
-            except:
-                return 'Not set...'
+        return self.resultsModel.workOrderAt(row)
+
+    def rowOf(self, workOrder):
+        """
+        Returns the row showing workOrder, or None if it has none.
+        """
+        return self.resultsModel.rowOf(workOrder)
+
+    def selectRowFor(self, workOrder, additive=False):
+        """
+        Selects workOrder's row. If additive, the rows already selected stay selected.
+        """
+        row = self.rowOf(workOrder)
+        if row is None:
+            return
+        if additive:
+            self.selectionModel().select(self.resultsModel.index(row, 0),
+                                         QItemSelectionModel.Select | QItemSelectionModel.Rows)
         else:
-            return 'Not set...'
+            self.selectRow(row)
 
-    def getSetupRunTime(self, workOrder):
+    def addRowFor(self, workOrder: 'WorkOrder'):
         """
-        Calculates the setup run time for the workOrder and returns it as a string. If none, returns placeholder text.
+        Adds row to results section for workOrder given.
+        Some data is calculated and filled in.
         """
-        return 'Not set...'
+        self.addRowsFor([workOrder])
 
-    def getTestRunTime(self, workOrder):
+    def addRowsFor(self, workOrders):
         """
-        Calculates the test run time for the workOrder and returns it as a string. If none, returns placeholder text.
+        Adds a row for each of the given work orders. Results are only recalculated, and the table only
+        repainted, once for the whole batch.
         """
-        return 'Not set...'
+        workOrders = list(workOrders)
+        if not workOrders:
+            return
 
-    def getCoatingRunTime(self, workOrder):
+        self.setUpdatesEnabled(False)
+        self.blockSignals(True)
+        try:
+            self.resultsModel.appendWorkOrders(workOrders)
+
+            machineNums = {workOrder.machineNum for workOrder in workOrders}
+            for machineNum in sorted(machineNums):
+                self.window.updateResults(self.window.machines[machineNum-1])
+        finally:
+            self.blockSignals(False)
+            self.setUpdatesEnabled(True)
+
+    def removeRowsFor(self, workOrders):
         """
-        Calculates the coating run time for the workOrder and returns it as a string. If none, returns placeholder text.
+        Removes the rows of all the given work orders, repainting the table once.
         """
-        return 'Not set...'
+        self.setUpdatesEnabled(False)
+        try:
+            self.resultsModel.removeWorkOrders(workOrders)
+        finally:
+            self.setUpdatesEnabled(True)
+
+    def selectedWorkOrders(self):
+        """
+        Returns the work orders of every row with a selected cell, in row order.
+        """
+        rows = sorted({index.row() for index in self.selectedIndexes()})
+        return [self.workOrderAt(row) for row in rows]
+
+    def contextMenuEvent(self, event):
+        """
+        Offers to auto-place the selected work orders, or all of them if none are selected.
+        """
+        workOrders = self.selectedWorkOrders() or \
+            [self.resultsModel.workOrders[number] for number in self.resultsModel.rows]
+        if not workOrders:
+            return
+        menu = QMenu(self)
+        menu.addAction("Auto-Place " + str(len(workOrders)) + " Work Order(s)...",
+                       lambda: self.window.autoPlaceWorkOrders(workOrders))
+        menu.addSeparator()
+        for machineNum in sorted({workOrder.machineNum for workOrder in workOrders}):
+            menu.addAction("Plan Run Order of Machine " + str(machineNum) + "...",
+                           lambda m=machineNum: self.window.showRunSequence(m))
+        menu.exec_(event.globalPos())
+
+    def openEditWODialog(self, workOrder):
+        """
+        Allows a user to edit a work order. Also, selects the relevant slice in the GUI
+        """
+        self.window.ensureSingleWorkOrder_r(self.rowOf(workOrder), 0)
+
+        # The dialog edits workOrder in place, so its location is kept to move it if it changed
+        oldMachineNum, oldPlanetNum = workOrder.machineNum, workOrder.planetNum
+        woDialog = wod.WorkOrderDialog(self.window, workOrder, editing=True)
+        result = woDialog.exec_()
+
+        if result == QDialog.Rejected:
+            return
+        else:
+            self.window.updateWorkOrder(workOrder, oldMachineNum, oldPlanetNum)
+
+    def updateRowInfo(self, workOrder):
+        """
+        Schedules an update of the information in the workOrder's associated row.
+        """
+        self.scheduler.scheduleRow(workOrder, ResultsModel.ALL_COLUMNS)
+
+    def updateTimes(self, machine):
+        """
+        Schedules an update of the time columns of every row of machine.
+        """
+        self.scheduler.scheduleMachine(machine, ResultsModel.TIME_COLUMNS)
 
     def setHSpacing(self):
         """
@@ -297,19 +462,5 @@ class TableView(QTableWidget):
         header.resizeSection(10, 5)
         header.setStretchLastSection(True)
 
-    def updateRowsFrom(self, row: int):
-        """
-        Gets workorders for row "row" onwards, and updates them with their new row number. updates mapping too.
-        """
-
-        if row <= self.rowCount():
-            oldWo = self.rowNumToWOMapping[row]
-
-            for newRow in range(row, self.rowCount()):
-                wo = self.rowNumToWOMapping[newRow+1]
-                self.rowNumToWOMapping[newRow] = wo
-                wo.rowNum = newRow
 
-            self.rowNumToWOMapping.pop(self.rowCount())
-            self.vHeaders.pop(self.vHeaders.index(oldWo.name))
-            self.updateButtons()
+instrument(ResultsModel, 'refreshCells')
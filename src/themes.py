@@ -0,0 +1,75 @@
+from PySide2.QtGui import QPalette, QColor, Qt
+
+TOOLTIP_STYLE = "QToolTip { color: #ffffff; background-color: #2a82da; border: 1px solid white; }"
+
+# Background colors of the results table's even and odd rows, per theme. 0 is light, 1 is dark
+ROW_COLORS = {
+    0: (QColor(180, 180, 180), QColor(150, 150, 150)),
+    1: (QColor(80, 80, 80), QColor(60, 60, 60)),
+}
+
+PALETTES = {}
+TABLE_PALETTES = {}
+
+
+def buildPalette(theme):
+    """
+    Returns a new application palette for theme. 0 is light, 1 is dark
+    """
+    palette = QPalette()
+    if theme == 0:
+        palette.setColor(QPalette.Window, QColor(180, 180, 180))
+        palette.setColor(QPalette.WindowText, Qt.black)
+        palette.setColor(QPalette.Base, QColor(140, 140, 140))
+        palette.setColor(QPalette.AlternateBase, QColor(180, 180, 180))
+        palette.setColor(QPalette.ToolTipBase, Qt.black)
+        palette.setColor(QPalette.ToolTipText, Qt.black)
+        palette.setColor(QPalette.Text, Qt.black)
+        palette.setColor(QPalette.Button, QColor(180, 180, 180))
+        palette.setColor(QPalette.ButtonText, Qt.black)
+        palette.setColor(QPalette.BrightText, Qt.red)
+        palette.setColor(QPalette.Link, QColor(42, 130, 218))
+        palette.setColor(QPalette.Highlight, QColor(42, 130, 218))
+        palette.setColor(QPalette.HighlightedText, Qt.white)
+        palette.setColor(QPalette.Disabled, QPalette.Text, QColor(60, 60, 60))
+        palette.setColor(QPalette.Disabled, QPalette.ButtonText, Qt.darkGray)
+    else:
+        palette.setColor(QPalette.Window, QColor(53, 53, 53))
+        palette.setColor(QPalette.WindowText, Qt.white)
+        palette.setColor(QPalette.Base, QColor(25, 25, 25))
+        palette.setColor(QPalette.AlternateBase, QColor(53, 53, 53))
+        palette.setColor(QPalette.ToolTipBase, Qt.white)
+        palette.setColor(QPalette.ToolTipText, Qt.white)
+        palette.setColor(QPalette.Text, Qt.white)
+        palette.setColor(QPalette.Button, QColor(53, 53, 53))
+        palette.setColor(QPalette.ButtonText, Qt.white)
+        palette.setColor(QPalette.BrightText, Qt.red)
+        palette.setColor(QPalette.Link, QColor(42, 130, 218))
+        palette.setColor(QPalette.Highlight, QColor(42, 130, 218))
+        palette.setColor(QPalette.HighlightedText, Qt.black)
+        palette.setColor(QPalette.Disabled, QPalette.Text, QColor(190, 190, 190))
+        palette.setColor(QPalette.Disabled, QPalette.ButtonText, Qt.darkGray)
+    return palette
+
+
+def getPalette(theme):
+    """
+    Returns the shared application palette of theme, creating it the first time.
+    """
+    if theme not in PALETTES:
+        PALETTES[theme] = buildPalette(theme)
+    return PALETTES[theme]
+
+
+def getTablePalette(theme):
+    """
+    Returns the shared palette of the results table for theme: the application palette, with the row colors as
+    the base and alternate base colors, so the view stripes the rows itself.
+    """
+    if theme not in TABLE_PALETTES:
+        palette = QPalette(getPalette(theme))
+        even, odd = ROW_COLORS[theme]
+        palette.setColor(QPalette.Base, even)
+        palette.setColor(QPalette.AlternateBase, odd)
+        TABLE_PALETTES[theme] = palette
+    return TABLE_PALETTES[theme]
@@ -0,0 +1,108 @@
+
+class MachineTimes:
+
+    COLUMNS = ('labor', 'machine', 'setup', 'test', 'coating')
+
+    def __init__(self, workOrders):
+        """
+        Holds every time column (in hours) for every work order of a machine, as lists in work order order.
+        A value of None means the time could not be calculated (i.e. its inputs are not set).
+        """
+        self.workOrders = list(workOrders)
+        self.rows = {id(workOrder): i for i, workOrder in enumerate(self.workOrders)}
+
+        n = len(self.workOrders)
+        self.labor = [None] * n
+        self.machine = [None] * n
+        self.setup = [None] * n
+        self.test = [None] * n
+        self.coating = [None] * n
+
+    def get(self, column, workOrder):
+        """
+        Returns the value of column for workOrder, or None if it was not calculated.
+        """
+        row = self.rows.get(id(workOrder))
+        if row is None:
+            return None
+        return getattr(self, column)[row]
+
+
+def parseTime(time):
+    """
+    Converts a "hh:mm:ss" string (as given by QTime.toString()) to seconds since midnight. None stays None.
+    """
+    if time is None:
+        return None
+    hours, minutes, seconds = time.split(':')
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
+
+def formatTime(secs):
+    """
+    Converts seconds since midnight to a "hh:mm:ss" string, as given by QTime.toString(). None stays None.
+    """
+    if secs is None:
+        return None
+    return '{:02d}:{:02d}:{:02d}'.format(secs // 3600, secs // 60 % 60, secs % 60)
+
+
+def getRunHours(machine):
+    """
+    Returns the hours between the machine's start and end time, or None if either one is not set.
+    Runs ending earlier in the day than they started cross midnight.
+    """
+    secs = machine.runSeconds()
+    if secs is None:
+        return None
+    return secs / 3600
+
+
+def getHandlingHours(machine):
+    """
+    Returns the hours of labor the whole machine run takes: the loading, setup and test runs, plus the load and
+    unload windows when their times are set. None if any of the three runs is not set.
+    """
+    if machine.loadingRun is None or machine.setupRun is None or machine.testRun is None:
+        return None
+    hours = machine.loadingRun + machine.setupRun + machine.testRun
+    for secs in (machine.loadSeconds(), machine.unloadSeconds()):
+        if secs is not None:
+            hours += secs / 3600
+    return hours
+
+
+def calculateTimes(machine):
+    """
+    Calculates all time columns for all of machine's work orders in one pass over the store's columns.
+    Each work order gets its share (pieces / machine total) of the machine's run, setup, test and coating hours,
+    and of its handling (labor) hours. The run parameters are the machine's totals (see Machine), as in the sequencer.
+    Returns a MachineTimes object.
+    """
+    times = MachineTimes(machine.workOrders)
+    totPcs = machine.totalPieces
+    if not totPcs:
+        return times
+    shares = [pcs / totPcs for pcs in machine.workOrders.pieces]
+
+    machineHours = {
+        'labor': getHandlingHours(machine),
+        'machine': getRunHours(machine),
+        'setup': machine.setupRun,
+        'test': machine.testRun,
+        'coating': machine.coatingRun,
+    }
+    for column, hours in machineHours.items():
+        if hours is not None:
+            setattr(times, column, [hours * share for share in shares])
+    return times
+
+
+def getTimes(machine):
+    """
+    Returns the MachineTimes of machine. They are only calculated again after one of the machine's parameters or
+    work orders changed.
+    """
+    if machine.calculated is None:
+        machine.calculated = calculateTimes(machine)
+    return machine.calculated
@@ -0,0 +1,111 @@
+"""
+Layout of the floor: its machines, and how many planets each one has.
+
+The layout is read from topology.json, next to app.py, or from the file given by the TIMEMGMT_TOPOLOGY
+environment variable:
+    {"machines": [{"name": "Machine 1", "planets": 5}, {"planets": 8}, ...]}
+or, when all machines have the same number of planets:
+    {"machines": 12, "planets": 5}
+Machines are numbered from 1 in the order they are listed, and named "Machine N" unless given a name.
+Without a file, the layout is 3 machines of 5 planets.
+"""
+import json
+import os
+
+ENV_VAR = 'TIMEMGMT_TOPOLOGY'
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'topology.json')
+DEFAULT_MACHINES = 3
+DEFAULT_PLANETS = 5
+
+# Machine and planet numbers are stored in signed byte columns of the WorkOrderStore
+MAX_MACHINES = 127
+MAX_PLANETS = 127
+
+
+class TopologyError(ValueError):
+    """
+    Raised when a topology file is not valid.
+    """
+
+
+class Topology:
+
+    def __init__(self, planetCounts, names=None):
+        """
+        Layout of machines numbered 1 to len(planetCounts). planetCounts[i] is the number of planets of machine
+        i + 1, names[i] its name.
+        """
+        self.planetCounts = list(planetCounts)
+        self.names = list(names) if names else ['Machine ' + str(n) for n in range(1, len(self.planetCounts) + 1)]
+
+    def __contains__(self, machineNum):
+        return 1 <= machineNum <= len(self.planetCounts)
+
+    def numMachines(self):
+        return len(self.planetCounts)
+
+    def machineNums(self):
+        return range(1, len(self.planetCounts) + 1)
+
+    def machineName(self, machineNum):
+        return self.names[machineNum - 1]
+
+    def planetCount(self, machineNum):
+        return self.planetCounts[machineNum - 1]
+
+    def planetNums(self, machineNum):
+        return range(1, self.planetCounts[machineNum - 1] + 1)
+
+    def hasPlanet(self, machineNum, planetNum):
+        return machineNum in self and 1 <= planetNum <= self.planetCounts[machineNum - 1]
+
+
+def defaultTopology():
+    return Topology([DEFAULT_PLANETS] * DEFAULT_MACHINES)
+
+
+def parseTopology(config):
+    """
+    Builds a Topology from a decoded topology file (see the module docstring).
+    """
+    if not isinstance(config, dict) or 'machines' not in config:
+        raise TopologyError('Topology must have a "machines" entry')
+
+    machines = config['machines']
+    if isinstance(machines, int) and not isinstance(machines, bool):
+        machines = [{} for _ in range(machines)]
+    if not isinstance(machines, list) or not machines:
+        raise TopologyError('"machines" must be a positive number, or a list of machines')
+    if len(machines) > MAX_MACHINES:
+        raise TopologyError('There can be at most ' + str(MAX_MACHINES) + ' machines')
+
+    planetCounts = []
+    names = []
+    for machineNum, machine in enumerate(machines, 1):
+        if not isinstance(machine, dict):
+            raise TopologyError('Machine ' + str(machineNum) + ' must be an object')
+        planets = machine.get('planets', config.get('planets', DEFAULT_PLANETS))
+        if not isinstance(planets, int) or isinstance(planets, bool) or planets < 1:
+            raise TopologyError('Machine ' + str(machineNum) + ' must have a positive number of planets')
+        if planets > MAX_PLANETS:
+            raise TopologyError('Machine ' + str(machineNum) + ' can have at most ' + str(MAX_PLANETS) + ' planets')
+        planetCounts.append(planets)
+        names.append(str(machine.get('name', 'Machine ' + str(machineNum))))
+    return Topology(planetCounts, names)
+
+
+def loadTopology(path=None):
+    """
+    Reads the topology at path, by default the one named by TIMEMGMT_TOPOLOGY, else topology.json next to app.py.
+    Returns the default topology if the default file doesn't exist.
+    """
+    if path is None:
+        path = os.environ.get(ENV_VAR) or DEFAULT_PATH
+        if path == DEFAULT_PATH and not os.path.exists(path):
+            return defaultTopology()
+    try:
+        with open(path) as f:
+            config = json.load(f)
+    except (OSError, ValueError) as e:
+        raise TopologyError('Could not read topology ' + path + ': ' + str(e))
+    return parseTopology(config)
@@ -0,0 +1,80 @@
+class PlanetWidgets:
+
+    def __init__(self, machineNum, planetNum, infoSection, planetBox, container):
+        """
+        Holds the widgets of one planet of one machine tab. The chart widgets are filled in once they are created.
+        """
+        self.machineNum = machineNum
+        self.planetNum = planetNum
+        self.infoSection = infoSection
+        self.planetBox = planetBox
+        self.container = container
+        self.planet = None
+        self.chart = None
+        self.chartView = None
+
+
+class WidgetRegistry:
+
+    def __init__(self, topology):
+        """
+        Keeps the widgets of every machine tab of topology, so they can be accessed directly.
+        A machine's tab is only created the first time it is needed (shown, or given planets or work orders), so
+        machines that are never used cost nothing but their empty page.
+        """
+        self.topology = topology
+        self.machines = {}  # machine number -> MachineTab, for the tabs created so far
+        self.planets = {}  # (machine number, planet number) -> PlanetWidgets
+
+        # Tabs are created by calling buildTab with the machine number, which returns its MachineTab.
+        # Charts are then created by calling buildCharts with the tab's planets.
+        self.buildTab = None
+        self.buildCharts = None
+        self.chartsBuilt = set()
+
+    def machineNums(self):
+        """
+        Returns the numbers of all machines of the topology.
+        """
+        return self.topology.machineNums()
+
+    def ensureTab(self, machineNum):
+        """
+        Creates the tab of machine machineNum, if it wasn't already. Returns it (None if there is no such machine).
+        """
+        if machineNum not in self.machines and machineNum in self.topology and self.buildTab:
+            tab = self.buildTab(machineNum)
+            self.machines[machineNum] = tab
+            for widgets in tab.planets:
+                self.planets[(machineNum, widgets.planetNum)] = widgets
+        return self.machines.get(machineNum)
+
+    def ensureCharts(self, machineNum):
+        """
+        Creates the charts of machine machineNum, and its tab first if needed, if they weren't already.
+        """
+        if machineNum not in self.chartsBuilt and self.ensureTab(machineNum) is not None and self.buildCharts:
+            self.chartsBuilt.add(machineNum)
+            self.buildCharts(self.planetsOf(machineNum))
+
+    def planet(self, machineNum, planetNum):
+        """
+        Returns the Planet of the given machine and planet numbers, creating the machine's charts if needed.
+        """
+        self.ensureCharts(machineNum)
+        return self.planets[(machineNum, planetNum)].planet
+
+    def planetsOf(self, machineNum):
+        """
+        Returns the PlanetWidgets of machine machineNum, ordered by planet number. Empty until the machine's tab is
+        created, and their planet is None until its charts are.
+        """
+        if machineNum not in self.machines:
+            return []
+        return [self.planets[(machineNum, planetNum)] for planetNum in self.topology.planetNums(machineNum)]
+
+    def allPlanets(self):
+        """
+        Returns the PlanetWidgets of every machine whose charts were created.
+        """
+        return [widgets for widgets in self.planets.values() if widgets.planet is not None]
@@ -1,19 +1,60 @@
 
+class Column:
+
+    def __init__(self, name, column):
+        """
+        Attribute of a WorkOrder stored in column of its WorkOrderStore. Before the work order is added to a
+        store, the value is kept in the work order itself.
+        """
+        self.name = name
+        self.column = column
+
+    def __get__(self, workOrder, owner):
+        if workOrder is None:
+            return self
+        if workOrder.store is None:
+            return workOrder.detached.get(self.name)
+        value = getattr(workOrder.store, self.column)[workOrder.position]
+        return None if value == -1 else value
+
+    def __set__(self, workOrder, value):
+        if workOrder.store is None:
+            workOrder.detached[self.name] = value
+        else:
+            getattr(workOrder.store, self.column)[workOrder.position] = -1 if value is None else value
+
+
 class WorkOrder:
 
+    __slots__ = ('store', 'position', 'detached', 'slice')
+
+    number = Column('number', 'numbers')
+    pieces = Column('pieces', 'pieces')
+    side = Column('side', 'sides')
+    planetNum = Column('planetNum', 'planetNums')
+    machineNum = Column('machineNum', 'machineNums')
+    yld = Column('yld', 'yields')
+    scrap = Column('scrap', 'scraps')
+
     def __init__(self):
         """
-        Instantiates a work order
+        Instantiates a work order. Its values are moved to a WorkOrderStore when it is added to one,
+        after which this object is only a view of its record in the store.
         """
-        self.name = None
-        self.pieces = None
-        self.side = None
-        self.planetNum = None
-        self.machineNum = None
+        self.store = None
+        self.position = None
+        self.detached = {}
         self.slice = None
-        self.rowNum = None
-        self.yld = None
-        self.scrap = None
+
+    @property
+    def name(self):
+        if self.number is None:
+            return None
+        return "WO #" + str(self.number)
+
+    @name.setter
+    def name(self, name):
+        self.number = int(name[4:])
 
     def setYield(self, yld):
         self.yld = yld
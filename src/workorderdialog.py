@@ -6,8 +6,6 @@ import gui.ui_planetConfigDialog as planetCD
 
 class WorkOrderDialog(QDialog):
 
-    NUMBER_TRACKER = 1
-
     def __init__(self, mainWindow, workOrder, editing=False):
         QDialog.__init__(self)
         self.ui = Ui_Dialog()
@@ -24,29 +22,29 @@ class WorkOrderDialog(QDialog):
         self.ui.numPieces.setMaximum(500)
         self.ui.numPieces.editingFinished.connect(lambda: self.ui.yldBox.setMaximum(self.ui.numPieces.value()))
 
-        self.ui.woNumber.setValue(WorkOrderDialog.NUMBER_TRACKER)
-        self.ui.woNumber.setMinimum(WorkOrderDialog.NUMBER_TRACKER)
+        self.ui.woNumber.setMinimum(1)
         self.ui.woNumber.setMaximum(500)
+        self.ui.woNumber.setValue(mainWindow.woIDs.peekNext())
 
-        self.ui.machineNum.addItems([
-            'Machine 1', 'Machine 2', 'Machine 3'
-        ])
-        self.ui.planetNum.addItems([
-            'Planet 1', 'Planet 2', 'Planet 3', 'Planet 4', 'Planet 5'
-        ])
+        # Machines and planets come from the topology. Their numbers are the combo box indexes + 1.
+        self.topology = mainWindow.topology
+        self.ui.machineNum.addItems([self.topology.machineName(n) for n in self.topology.machineNums()])
+        self.ui.machineNum.currentIndexChanged.connect(lambda index: self.fillPlanets(index + 1))
+        self.ui.machineNum.setCurrentIndex(min(mainWindow.ui.tabWidget.currentIndex(), self.topology.numMachines() - 1))
+        self.fillPlanets(self.ui.machineNum.currentIndex() + 1)
 
         self.workOrder = workOrder
         if workOrder.machineNum:
-            self.ui.woNumber.setValue(int(workOrder.name[4:]))
+            self.ui.woNumber.setValue(workOrder.number)
             self.ui.numPieces.setValue(workOrder.pieces)
             self.ui.side.setCurrentText("Side " + str(workOrder.side))
-            self.ui.machineNum.setCurrentText("Machine " + str(workOrder.machineNum))
-            self.ui.planetNum.setCurrentText("Planet " + str(workOrder.planetNum))
+            self.ui.machineNum.setCurrentIndex(workOrder.machineNum - 1)
+            self.ui.planetNum.setCurrentIndex(workOrder.planetNum - 1)
 
         self.editing = editing
         if editing:
             self.ui.woNumber.setDisabled(True)
-            self.ui.errorSection.setText("Warning: Editing Work Order #" + workOrder.name[4:])
+            self.ui.errorSection.setText("Warning: Editing Work Order #" + str(workOrder.number))
             self.ui.errorSection.show()
 
         self.ui.yldBox.setMinimum(-1)
@@ -58,6 +56,15 @@ class WorkOrderDialog(QDialog):
 
         self.mainWindow = mainWindow
 
+    def fillPlanets(self, machineNum):
+        """
+        Lists the planets of machine machineNum, keeping the selected planet number if that machine has it.
+        """
+        planetIndex = self.ui.planetNum.currentIndex()
+        self.ui.planetNum.clear()
+        self.ui.planetNum.addItems(['Planet ' + str(n) for n in self.topology.planetNums(machineNum)])
+        self.ui.planetNum.setCurrentIndex(min(max(planetIndex, 0), self.ui.planetNum.count() - 1))
+
     def accept(self):
         """
         Executes before the "OK" functionality
@@ -67,13 +74,10 @@ class WorkOrderDialog(QDialog):
         if not self.editing:
             errorList = []
 
-            wos = [int(tmp.name[4:]) for machine in self.mainWindow.machines for tmp in machine.workOrders]
-            if self.ui.woNumber.value() in wos:
+            if not self.mainWindow.woIDs.register(self.ui.woNumber.value()):
                 errorList.append('Work order with ID ' + str(self.ui.woNumber.value()) + ' already exists. ')
             else:
-                if self.ui.woNumber.value() == WorkOrderDialog.NUMBER_TRACKER:
-                    WorkOrderDialog.NUMBER_TRACKER += 1
-                wo.name = "WO #" + str(self.ui.woNumber.value())
+                wo.number = self.ui.woNumber.value()
 
             if errorList:
                 errors = "Please fix these errors:\n"
@@ -84,15 +88,15 @@ class WorkOrderDialog(QDialog):
 
             wo.pieces = self.ui.numPieces.value()
             wo.side = int(self.ui.side.currentText()[-1])
-            wo.machineNum = int(self.ui.machineNum.currentText()[-1])
-            wo.planetNum = int(self.ui.planetNum.currentText()[-1])
+            wo.machineNum = self.ui.machineNum.currentIndex() + 1
+            wo.planetNum = self.ui.planetNum.currentIndex() + 1
             if self.ui.yldBox.value() is not -1:
                 wo.setYield(self.ui.yldBox.value())
         else:
             wo.pieces = self.ui.numPieces.value()
             wo.side = int(self.ui.side.currentText()[-1])
-            wo.machineNum = int(self.ui.machineNum.currentText()[-1])
-            wo.planetNum = int(self.ui.planetNum.currentText()[-1])
+            wo.machineNum = self.ui.machineNum.currentIndex() + 1
+            wo.planetNum = self.ui.planetNum.currentIndex() + 1
             if self.ui.yldBox.value() is not -1:
                 wo.setYield(self.ui.yldBox.value())
             else:
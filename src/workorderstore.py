@@ -0,0 +1,115 @@
+from array import array
+
+
+class WorkOrderStore:
+
+    COLUMNS = {
+        'numbers': 'l',
+        'pieces': 'l',
+        'sides': 'b',
+        'planetNums': 'b',
+        'machineNums': 'b',
+        'yields': 'l',  # -1 when not given
+        'scraps': 'l',  # -1 when not given
+    }
+
+    def __init__(self):
+        """
+        Stores work orders as compact columns, one array per attribute, with an index from work order number to
+        position. WorkOrder objects added to the store become views of their position in the columns.
+        """
+        for column, typecode in self.COLUMNS.items():
+            setattr(self, column, array(typecode))
+        self.views = []
+        self.index = {}
+
+    def __len__(self):
+        return len(self.views)
+
+    def __iter__(self):
+        return iter(list(self.views))
+
+    def __contains__(self, workOrder):
+        return workOrder.store is self
+
+    def get(self, number):
+        """
+        Returns the work order with the given number, or None if it isn't in this store.
+        """
+        position = self.index.get(number)
+        if position is None:
+            return None
+        return self.views[position]
+
+    def add(self, workOrder):
+        """
+        Appends workOrder's values to the columns, and makes workOrder a view of them.
+        """
+        values = workOrder.detached
+        self.numbers.append(values['number'])
+        self.pieces.append(values['pieces'])
+        self.sides.append(values['side'])
+        self.planetNums.append(values['planetNum'])
+        self.machineNums.append(values['machineNum'])
+        self.yields.append(-1 if values.get('yld') is None else values['yld'])
+        self.scraps.append(-1 if values.get('scrap') is None else values['scrap'])
+
+        workOrder.store = self
+        workOrder.position = len(self.views)
+        workOrder.detached = None
+        self.index[values['number']] = workOrder.position
+        self.views.append(workOrder)
+
+    def remove(self, workOrder):
+        """
+        Removes workOrder in O(1) by moving the last record into its position. workOrder keeps its values.
+        """
+        self.detach(workOrder)
+        position = workOrder.position
+        last = len(self.views) - 1
+
+        if position != last:
+            moved = self.views[last]
+            for column in self.COLUMNS:
+                values = getattr(self, column)
+                values[position] = values[last]
+            self.views[position] = moved
+            moved.position = position
+            self.index[self.numbers[position]] = position
+
+        for column in self.COLUMNS:
+            getattr(self, column).pop()
+        self.views.pop()
+        workOrder.store = None
+        workOrder.position = None
+
+    def clear(self):
+        """
+        Removes all work orders. They all keep their values.
+        """
+        for workOrder in self.views:
+            self.detach(workOrder)
+            workOrder.store = None
+            workOrder.position = None
+        for column, typecode in self.COLUMNS.items():
+            setattr(self, column, array(typecode))
+        self.views = []
+        self.index = {}
+
+    def detach(self, workOrder):
+        """
+        Copies workOrder's values back into it, and removes it from the index.
+        """
+        position = workOrder.position
+        yld = self.yields[position]
+        scrap = self.scraps[position]
+        workOrder.detached = {
+            'number': self.numbers[position],
+            'pieces': self.pieces[position],
+            'side': self.sides[position],
+            'planetNum': self.planetNums[position],
+            'machineNum': self.machineNums[position],
+            'yld': None if yld == -1 else yld,
+            'scrap': None if scrap == -1 else scrap,
+        }
+        del self.index[self.numbers[position]]
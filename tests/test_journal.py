@@ -0,0 +1,126 @@
+import os
+import tempfile
+import unittest
+
+import src.journal as journal
+from src.machine import Machine
+from src.workorder import WorkOrder
+
+
+def makeWorkOrder(number, pieces, side, machineNum, planetNum, yld=None):
+    workOrder = WorkOrder()
+    workOrder.number = number
+    workOrder.pieces = pieces
+    workOrder.side = side
+    workOrder.machineNum = machineNum
+    workOrder.planetNum = planetNum
+    if yld is not None:
+        workOrder.setYield(yld)
+    return workOrder
+
+
+class TestJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.projectPath = os.path.join(self.directory.name, 'test.proj')
+        self.sessionsPath = journal.SESSIONS_PATH
+        journal.SESSIONS_PATH = os.path.join(self.directory.name, 'sessions')
+
+    def tearDown(self):
+        journal.SESSIONS_PATH = self.sessionsPath
+        self.directory.cleanup()
+
+    def record(self, log):
+        """
+        Writes one record of every type to log.
+        """
+        first = makeWorkOrder(1, 10, 1, 1, 2)
+        second = makeWorkOrder(2, 6, 2, 2, 1, yld=5)
+        log.setTechID(7)
+        log.setPlanet(0, 2, 20)
+        log.setPlanet(1, 1, 8)
+        log.addWorkOrder(first)
+        log.addWorkOrder(second)
+        first.pieces = 12
+        log.editWorkOrder(first)
+        log.deleteWorkOrder(second)
+        log.setTime(0, 'startTime', 8 * 3600)
+        machine = Machine()
+        machine.cdn = 3
+        machine.testRun = 1.5
+        log.setRunParameters(0, machine)
+
+    def testReplay(self):
+        log = journal.Journal(self.projectPath)
+        log.start({'techID': None})
+        self.record(log)
+
+        project = journal.recover(log.path)
+        self.assertEqual(project, log.project)
+        self.assertEqual(project['techID'], 7)
+        self.assertEqual(project[0]['workOrders'], {'WO #1': [12, 1, 2, None]})
+        self.assertEqual(project[0]['planets'], {2: 20})
+        self.assertEqual(project[0]['startTime'], '08:00:00')
+        self.assertEqual((project[0]['cdn'], project[0]['testRun'], project[0]['coatingRun']), (3, 1.5, None))
+        self.assertEqual(project[1]['workOrders'], {})
+        log.discard()
+
+    def testTornRecord(self):
+        log = journal.Journal(self.projectPath)
+        log.start({'techID': None})
+        self.record(log)
+        expected = journal.recover(log.path)
+
+        # A crash in the middle of writing a record leaves only part of it
+        record = bytes([journal.ADD_WO]) + journal.RECORDS[journal.ADD_WO].pack(0, 9, 1, 1, 3, -1)
+        log.file.write(record[:len(record) // 2])
+        log.file.flush()
+        self.assertEqual(journal.recover(log.path), expected)
+        log.discard()
+
+    def testCompaction(self):
+        compactEvery = journal.COMPACT_EVERY
+        journal.COMPACT_EVERY = 3
+        try:
+            log = journal.Journal(self.projectPath)
+            log.start({'techID': None})
+            self.record(log)
+            self.assertLess(log.records, 3)
+            self.assertEqual(journal.recover(log.path), log.project)
+            log.discard()
+        finally:
+            journal.COMPACT_EVERY = compactEvery
+
+    def testInstancesDontShareFiles(self):
+        first = journal.Journal(self.projectPath)
+        second = journal.Journal(self.projectPath)
+        first.start({'techID': None})
+        first.setTechID(5)
+        second.start({'techID': None})
+        self.assertNotEqual(first.path, second.path)
+
+        second.discard()
+        self.assertEqual(journal.recover(first.path)['techID'], 5)
+        self.assertEqual(journal.projectPathOf(first.path), self.projectPath)
+        self.assertEqual(journal.projectPathOf(second.path), self.projectPath)
+        first.discard()
+        self.assertFalse(os.path.exists(first.path))
+
+    def testUnclean(self):
+        log = journal.Journal(self.projectPath)
+        log.start({'techID': None})
+        self.assertEqual(journal.findUnclean(self.directory.name), [])  # This app is still running
+
+        # A journal no session lists was left by an app that is gone
+        log.file.close()
+        log.file = None
+        journal.OPEN_PATHS.discard(log.path)
+        journal.unregisterSession(log.path)
+        self.assertEqual(journal.findUnclean(self.directory.name), [os.path.abspath(log.path)])
+        journal.discardJournal(log.path)
+        self.assertEqual(journal.findUnclean(self.directory.name), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
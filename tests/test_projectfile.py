@@ -0,0 +1,106 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+import src.projectfile as projectfile
+
+
+def machineDict(**values):
+    """
+    Returns the project dict entry of a machine with nothing set but values.
+    """
+    machine = {key: None for key in projectfile.TIME_KEYS + ('cdn',) + projectfile.RUN_KEYS}
+    machine['planets'] = {}
+    machine['workOrders'] = {}
+    machine.update(values)
+    return machine
+
+
+PROJECT = {
+    'techID': 42,
+    0: machineDict(startTime='08:00:00', endTime='16:30:00', loadTime='07:30:00', unloadTime='17:00:00', cdn=7,
+                   testRun=1.5, coatingRun=3.0, loadingRun=0.5, setupRun=0.25,
+                   planets={1: 20, 2: None, 4: 12},
+                   workOrders={'WO #12': [10, 1, 1, None], 'WO #3': [5, 2, 4, 4]}),
+    2: machineDict(planets={1: None}),
+}
+
+
+class TestProjectFile(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'test.proj')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, data):
+        with open(self.path, 'wb') as f:
+            f.write(data)
+
+    def testRoundTrip(self):
+        projectfile.saveProject(self.path, PROJECT)
+        self.assertEqual(projectfile.loadProject(self.path), PROJECT)
+
+    def testPlanetNumbersAreKept(self):
+        projectfile.saveProject(self.path, PROJECT)
+        with projectfile.ProjectReader(self.path) as reader:
+            self.assertEqual(reader.version, projectfile.VERSION)
+            self.assertEqual(reader.savedMachines(), [0, 2])
+            self.assertEqual(list(reader.machine(0)['planets']), [1, 2, 4])
+            self.assertEqual(reader.workOrderCount(0), 2)
+
+    def testVersion2(self):
+        header = projectfile.HEADER.pack(projectfile.MAGIC, 2, 1, -1)
+        section = projectfile.SECTION.pack(projectfile.HEADER.size + projectfile.SECTION.size, 2, 1)
+        body = projectfile.MACHINE.pack(-1, -1, -1, -1, -1, *[float('nan')] * 4) + \
+            projectfile.PLANET_V2.pack(7) + projectfile.PLANET_V2.pack(-1) + \
+            projectfile.WORK_ORDER.pack(1, 7, 2, 1, -1)
+        self.write(header + section + body)
+
+        project = projectfile.loadProject(self.path)
+        self.assertEqual(project[0]['planets'], {1: 7, 2: None})
+        self.assertEqual(project[0]['workOrders'], {'WO #1': [7, 2, 1, None]})
+
+    def testTruncated(self):
+        projectfile.saveProject(self.path, PROJECT)
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        for size in range(len(data)):
+            self.write(data[:size])
+            with self.assertRaises(projectfile.ProjectFileError, msg='truncated to ' + str(size) + ' bytes'):
+                projectfile.loadProject(self.path)
+
+    def testEmpty(self):
+        self.write(b'')
+        with self.assertRaises(projectfile.ProjectFileError):
+            projectfile.loadProject(self.path)
+
+    def testUnsupportedVersion(self):
+        self.write(projectfile.HEADER.pack(projectfile.MAGIC, 99, 0, -1))
+        with self.assertRaises(projectfile.ProjectFileError):
+            projectfile.loadProject(self.path)
+
+    def testLegacy(self):
+        with open(self.path, 'wb') as f:
+            pickle.dump(PROJECT, f)
+        self.assertTrue(projectfile.isLegacy(self.path))
+        self.assertEqual(projectfile.loadProject(self.path), PROJECT)
+
+        projectfile.convertLegacy(self.path)
+        self.assertFalse(projectfile.isLegacy(self.path))
+        self.assertEqual(projectfile.loadProject(self.path), PROJECT)
+
+    def testBadLegacy(self):
+        missingKeys = {'techID': None, 0: {'workOrders': {}}}
+        for data in (b'\x80\x09garbage', b'\x80\x03cnosuchmodule\nThing\nq\x00.', pickle.dumps(missingKeys),
+                     pickle.dumps([1, 2, 3]), b'not a project at all'):
+            self.write(data)
+            with self.assertRaises(projectfile.ProjectFileError, msg=repr(data)):
+                projectfile.loadProject(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import random
+import unittest
+
+from src.rowindex import RowIndex
+
+
+class TestRowIndex(unittest.TestCase):
+
+    def check(self, index, rows):
+        """
+        Asserts that index holds the keys of rows, in that order.
+        """
+        self.assertEqual(len(index), len(rows))
+        self.assertEqual(list(index), rows)
+        for row, key in enumerate(rows):
+            self.assertIn(key, index)
+            self.assertEqual(index.row(key), row)
+            self.assertEqual(index.key(row), key)
+
+    def testAgainstList(self):
+        randomizer = random.Random(3)
+        index = RowIndex()
+        rows = []
+        nextKey = 0
+        for step in range(3000):
+            # Mostly appends first, then mostly removals, so the index both grows and compacts
+            if rows and randomizer.random() < (0.3 if step < 1500 else 0.8):
+                key = randomizer.choice(rows)
+                self.assertEqual(index.remove(key), rows.index(key))
+                rows.remove(key)
+                self.assertNotIn(key, index)
+            else:
+                index.append(nextKey)
+                rows.append(nextKey)
+                nextKey += 1
+            if step % 50 == 0:
+                self.check(index, rows)
+        self.check(index, rows)
+        self.assertLess(len(index.keys), 2 * len(rows) + RowIndex.COMPACT_MIN)
+
+    def testRemoveAll(self):
+        index = RowIndex()
+        for key in range(200):
+            index.append(key)
+        for key in range(200):
+            self.assertEqual(index.remove(key), 0)
+        self.check(index, [])
+
+    def testKeyOutOfRange(self):
+        index = RowIndex()
+        index.append('a')
+        for row in (-1, 1):
+            with self.assertRaises(IndexError):
+                index.key(row)
+
+    def testRebuild(self):
+        index = RowIndex()
+        for key in 'abcd':
+            index.append(key)
+        index.remove('b')
+        index.rebuild(['d', 'c', 'a'])
+        self.check(index, ['d', 'c', 'a'])
+
+
+if __name__ == '__main__':
+    unittest.main()
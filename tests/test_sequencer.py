@@ -0,0 +1,100 @@
+import itertools
+import random
+import unittest
+
+import src.sequencer as sequencer
+from src.machine import Machine
+from src.workorder import WorkOrder
+
+
+def makeMachine(workOrders):
+    """
+    Returns a machine with 5.5 hours of run parameters, running workOrders, given as (number, planet, side, pieces).
+    """
+    machine = Machine()
+    machine.loadTime = 0
+    machine.startTime = 1800
+    machine.endTime = 7200
+    machine.unloadTime = 9000
+    machine.loadingRun = 1
+    machine.setupRun = 0.5
+    machine.coatingRun = 2
+    machine.testRun = 1
+    for number, planetNum, side, pieces in workOrders:
+        workOrder = WorkOrder()
+        workOrder.number = number
+        workOrder.planetNum = planetNum
+        workOrder.side = side
+        workOrder.pieces = pieces
+        workOrder.machineNum = 1
+        machine.addWorkOrder(workOrder)
+    return machine
+
+
+def keys(runs):
+    return [(run.planetNum, run.side) for run in runs]
+
+
+def randomWorkOrders(randomizer, count):
+    numbers = randomizer.sample(range(1, 1000), count)
+    return [(number, randomizer.randint(1, 4), randomizer.randint(1, 2), randomizer.randint(1, 20))
+            for number in numbers]
+
+
+class TestSequencer(unittest.TestCase):
+
+    def testBaselineIsNumberOrder(self):
+        machine = makeMachine([(3, 1, 1, 5), (1, 1, 1, 5), (2, 2, 1, 5), (4, 1, 2, 5)])
+        report = sequencer.sequenceMachine(machine)
+        self.assertEqual(keys(report.naiveRuns), [(1, 1), (2, 1), (1, 1), (1, 2)])
+        self.assertEqual([workOrder.number for workOrder in report.naiveRuns[0].workOrders], [1])
+
+    def testBaselineHoursAreParameters(self):
+        randomizer = random.Random(1)
+        for count in range(1, 12):
+            report = sequencer.sequenceMachine(makeMachine(randomWorkOrders(randomizer, count)))
+            self.assertAlmostEqual(report.naiveHours, 1 + 0.5 + 1 + 0.5 + 2 + 0.5)
+
+    def testPlannedNeverWorse(self):
+        randomizer = random.Random(2)
+        for count in range(1, 30):
+            machine = makeMachine(randomWorkOrders(randomizer, count))
+            for improve in (False, True):
+                report = sequencer.sequenceMachine(machine, improve)
+                self.assertLessEqual(report.hours, report.naiveHours + 1e-9)
+                self.assertAlmostEqual(report.savedHours(), report.naiveHours - report.hours)
+                planned = sorted(workOrder.number for run in report.runs for workOrder in run.workOrders)
+                self.assertEqual(planned, sorted(workOrder.number for workOrder in machine.workOrders))
+
+    def testGroupedRuns(self):
+        machine = makeMachine([(1, 1, 1, 5), (2, 2, 1, 5), (3, 1, 1, 5), (4, 2, 1, 5)])
+        report = sequencer.sequenceMachine(machine)
+        self.assertEqual(sorted(keys(report.runs)), [(1, 1), (2, 1)])
+        self.assertLess(report.hours, report.naiveHours)
+
+    def testMatchesBestOrder(self):
+        randomizer = random.Random(4)
+        for _ in range(40):
+            machine = makeMachine(randomWorkOrders(randomizer, randomizer.randint(2, 8)))
+            report = sequencer.sequenceMachine(machine)
+            costs = sequencer.ChangeoverCosts(machine, report.naiveRuns)
+            runs = sequencer.groupRuns(sorted(machine.workOrders, key=lambda workOrder: workOrder.number))
+            best = min(costs.total(list(order)) for order in itertools.permutations(runs))
+            self.assertAlmostEqual(report.hours, best)
+
+    def testDeletionOrderDoesNotMatter(self):
+        workOrders = randomWorkOrders(random.Random(5), 10)
+        first = makeMachine(workOrders)
+        second = makeMachine(workOrders[::-1])
+        for machine in (first, second):
+            for workOrder in [workOrder for workOrder in machine.workOrders if workOrder.number % 2]:
+                machine.removeWorkOrder(workOrder)
+        firstReport = sequencer.sequenceMachine(first)
+        secondReport = sequencer.sequenceMachine(second)
+        self.assertEqual(keys(firstReport.naiveRuns), keys(secondReport.naiveRuns))
+        self.assertEqual(keys(firstReport.runs), keys(secondReport.runs))
+        self.assertAlmostEqual(firstReport.hours, secondReport.hours)
+
+
+if __name__ == '__main__':
+    unittest.main()